@@ -1,6 +1,8 @@
 import io
 import os
 import traceback
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 
 import pydantic
 import yaml
@@ -28,6 +30,8 @@ from app.routes.wallet import credentials as wallet_credentials
 from app.routes.wallet import dids as wallet_dids
 from app.routes.wallet import jws as wallet_jws
 from app.routes.wallet import sd_jws as wallet_sd_jws
+from app.services.event_handling.sse import WaypointClient
+from app.services.trust_registry.client import TrustRegistryClient
 from app.util.extract_validation_error import extract_validation_error_msg
 from shared.constants import PROJECT_VERSION
 from shared.exceptions import CloudApiValueError
@@ -94,6 +98,15 @@ def acapy_cloud_description(role: str) -> str:
         return default_docs_description
 
 
+@asynccontextmanager
+async def app_lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    yield
+
+    logger.debug("Closing shared HTTP clients")
+    await WaypointClient.close()
+    await TrustRegistryClient.close()
+
+
 def create_app() -> FastAPI:
     application = FastAPI(
         root_path=ROOT_PATH,
@@ -103,6 +116,7 @@ def create_app() -> FastAPI:
         debug=debug,
         redoc_url=None,
         docs_url=None,
+        lifespan=app_lifespan,
     )
 
     for route in routes_for_role(ROLE):
@@ -30,7 +30,7 @@ from app.models.tenants import (
 from app.services.onboarding.issuer import handle_issuer_wallet_settings
 from app.services.onboarding.tenants import handle_tenant_update, onboard_tenant
 from app.services.trust_registry.actors import (
-    fetch_actor_by_id,
+    fetch_actor_by_id_uncached,
     register_actor,
     remove_actor_by_id,
 )
@@ -283,7 +283,7 @@ async def delete_tenant_by_id(
         # in the trust registry, especially if the tenant does not have
         # a public did.
         bound_logger.debug("Retrieving tenant from trust registry")
-        actor = await fetch_actor_by_id(wallet_id)
+        actor = await fetch_actor_by_id_uncached(wallet_id)
 
         # Remove actor if found
         if actor:
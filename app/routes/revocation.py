@@ -1,8 +1,12 @@
 from aries_cloudcontroller import IssuerCredRevRecordSchemaAnonCreds
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.dependencies.acapy_clients import client_from_auth
-from app.dependencies.auth import AcaPyAuth, acapy_auth_from_header
+from app.dependencies.auth import (
+    AcaPyAuth,
+    acapy_auth_from_header,
+    get_acapy_auth_verified,
+)
 from app.exceptions import CloudApiException, handle_acapy_call
 from app.models.issuer import (
     ClearPendingRevocationsRequest,
@@ -14,7 +18,7 @@ from app.models.issuer import (
 )
 from app.models.revocation import RevRegWalletUpdatedResult
 from app.services import revocation_registry
-from app.util.retry_method import coroutine_with_retry_until_value
+from app.services.event_handling.wait_for_state import wait_for_transaction_acked
 from shared.constants import PUBLISH_REVOCATIONS_TIMEOUT
 from shared.log_config import get_logger
 
@@ -63,6 +67,7 @@ async def revoke_credential(
             controller=aries_controller,
             credential_exchange_id=body.credential_exchange_id,
             auto_publish_to_ledger=body.auto_publish_on_ledger,
+            wallet_id=_event_wallet_id(auth),
         )
 
     bound_logger.debug("Successfully revoked credential.")
@@ -198,7 +203,9 @@ async def publish_revocations(
             return RevokedResponse()
 
         endorser_transaction_ids = (
-            [txn.transaction_id for txn in result.txn] if result.txn else []
+            [txn.transaction_id for txn in result.txn if txn.transaction_id]
+            if result.txn
+            else []
         )
         for endorser_transaction_id in endorser_transaction_ids:
             bound_logger.debug(
@@ -207,11 +214,10 @@ async def publish_revocations(
             )
             try:
                 # Wait for transaction to be acknowledged and written to the ledger
-                await coroutine_with_retry_until_value(
-                    coroutine_func=aries_controller.endorse_transaction.get_transaction,
-                    args=(endorser_transaction_id,),
-                    field_name="state",
-                    expected_value="transaction_acked",
+                await wait_for_transaction_acked(
+                    aries_controller,
+                    wallet_id=_event_wallet_id(auth),
+                    transaction_id=endorser_transaction_id,
                     logger=bound_logger,
                     max_attempts=PUBLISH_REVOCATIONS_TIMEOUT,
                     retry_delay=1,
@@ -377,3 +383,15 @@ async def fix_revocation_registry_entry_state(
 
     bound_logger.debug("Successfully fixed revocation registry entry state.")
     return response
+
+
+def _event_wallet_id(auth: AcaPyAuth) -> str | None:
+    """Wallet id whose events to await, or None to poll ACA-Py instead.
+
+    The token is verified by ACA-Py, not by this route. It is only decoded here to
+    find the wallet's event stream.
+    """
+    try:
+        return get_acapy_auth_verified(auth).wallet_id
+    except HTTPException:
+        return None
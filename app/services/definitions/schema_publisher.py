@@ -9,12 +9,13 @@ from aries_cloudcontroller import (
 
 from app.exceptions import CloudApiException, handle_acapy_call
 from app.models.definitions import CredentialSchema
+from app.services.event_handling.wait_for_state import wait_for_transaction_acked
 from app.services.trust_registry.schemas import register_schema
 from app.util.definitions import (
     anoncreds_credential_schema,
     anoncreds_schema_from_acapy,
 )
-from app.util.retry_method import coroutine_with_retry_until_value
+from shared.constants import GOVERNANCE_LABEL
 from shared.log_config import Logger
 
 
@@ -81,11 +82,11 @@ class SchemaPublisher:
                 )
 
             try:
-                await coroutine_with_retry_until_value(
-                    coroutine_func=self._controller.endorse_transaction.get_transaction,
-                    args=(transaction_id,),
-                    field_name="state",
-                    expected_value="transaction_acked",
+                # AnonCreds schemas are only created by the governance agent
+                await wait_for_transaction_acked(
+                    self._controller,
+                    wallet_id=GOVERNANCE_LABEL,
+                    transaction_id=transaction_id,
                     logger=self._logger,
                     max_attempts=max_retries,
                     retry_delay=retry_sleep_duration,
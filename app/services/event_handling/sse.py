@@ -1,12 +1,14 @@
+import asyncio
+import os
 from collections.abc import AsyncGenerator
 from typing import Any
 
 from fastapi import Request
-from httpx import HTTPError, Response, Timeout
+from httpx import HTTPError, Limits, Response, Timeout
 
-from shared.constants import WAYPOINT_URL
 from shared.log_config import get_logger
 from shared.util.rich_async_client import RichAsyncClient
+from shared.util.sharding import waypoint_url
 
 logger = get_logger(__name__)
 SSE_PING_PERIOD = 15
@@ -14,15 +16,78 @@ SSE_PING_PERIOD = 15
 default_timeout = Timeout(SSE_PING_PERIOD, read=3600.0)  # 1 hour read timeout
 event_timeout = Timeout(SSE_PING_PERIOD, read=180)  # 3 minute timeout
 
+# Connection pool of the client to waypoint, shared by all SSE requests
+WAYPOINT_HTTP2 = os.getenv("WAYPOINT_HTTP2", "true").lower() == "true"
+WAYPOINT_MAX_CONNECTIONS = (
+    int(os.getenv("WAYPOINT_MAX_CONNECTIONS", "0")) or None
+)  # Unlimited by default: over HTTP/1.1, each open stream holds a connection
+WAYPOINT_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("WAYPOINT_MAX_KEEPALIVE_CONNECTIONS", "100")
+)
+WAYPOINT_KEEPALIVE_EXPIRY = float(os.getenv("WAYPOINT_KEEPALIVE_EXPIRY", "60"))
+# Seconds between checks whether the client disconnected, while no chunk arrives
+DISCONNECT_CHECK_INTERVAL = 1.0
 
-async def yield_lines_with_disconnect_check(
-    request: Request, response: Response
-) -> AsyncGenerator[str, None]:
-    async for line in response.aiter_lines():
-        if await request.is_disconnected():
-            logger.bind(body=request).debug("SSE Client disconnected.")
-            break  # Client has disconnected, stop sending events
-        yield line + "\n"
+
+class WaypointClient:
+    """Long-lived streaming client to waypoint, shared by all SSE requests.
+
+    Connections are kept alive and reused between requests, so a stream does not
+    pay for a new connection and TLS handshake. With HTTP/2 (negotiated over TLS),
+    concurrent streams are multiplexed over the same connection.
+    """
+
+    _client: RichAsyncClient | None = None
+
+    @classmethod
+    def get(cls) -> RichAsyncClient:
+        if cls._client is None or cls._client.is_closed:
+            cls._client = RichAsyncClient(
+                name="Waypoint",
+                timeout=event_timeout,
+                http2=WAYPOINT_HTTP2,
+                limits=Limits(
+                    max_connections=WAYPOINT_MAX_CONNECTIONS,
+                    max_keepalive_connections=WAYPOINT_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=WAYPOINT_KEEPALIVE_EXPIRY,
+                ),
+            )
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+
+async def passthrough_stream(
+    response: Response, request: Request
+) -> AsyncGenerator[bytes, None]:
+    """Forward the upstream event stream as raw chunks, without decoding lines.
+
+    Stops as soon as the client disconnects, so that the upstream stream is closed.
+    The StreamingResponse can't be relied on for that: it only listens for
+    `http.disconnect` on servers with ASGI spec version < 2.4.
+    """
+    chunks = response.aiter_raw()
+    while True:
+        next_chunk = asyncio.ensure_future(anext(chunks))
+        try:
+            while not next_chunk.done():
+                if await request.is_disconnected():
+                    logger.debug("SSE client disconnected, closing upstream stream")
+                    return
+                await asyncio.wait({next_chunk}, timeout=DISCONNECT_CHECK_INTERVAL)
+        finally:
+            if not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.gather(next_chunk, return_exceptions=True)
+        try:
+            chunk = next_chunk.result()
+        except StopAsyncIteration:
+            return
+        yield chunk
 
 
 async def sse_subscribe_event_with_field_and_state(
@@ -35,11 +100,11 @@ async def sse_subscribe_event_with_field_and_state(
     field_id: str,
     desired_state: str,
     look_back: int = 60,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """Subscribe to server-side events for a specific wallet ID and topic.
 
     Args:
-        request: The request object.
+        request: The client's request, to stop streaming when it disconnects.
         group_id: The group to which the wallet belongs.
         wallet_id: The ID of the wallet subscribing to the events.
         topic: The topic to which the wallet is subscribing.
@@ -49,7 +114,7 @@ async def sse_subscribe_event_with_field_and_state(
         look_back: The number of seconds to look back for events before subscribing.
 
     Returns:
-        AsyncGenerator[str, None]: A generator that yields the events.
+        AsyncGenerator[bytes, None]: A generator that yields the raw event stream.
 
     """
     bound_logger = logger.bind(
@@ -69,17 +134,21 @@ async def sse_subscribe_event_with_field_and_state(
         params["look_back"] = look_back
 
     try:
-        async with RichAsyncClient(timeout=event_timeout) as client:
-            bound_logger.debug(
-                "Connecting stream to /sse/wallet_id/topic/field/field_id/desired_state"
-            )
-            async with client.stream(
-                "GET",
-                f"{WAYPOINT_URL}/sse/{wallet_id}/{topic}/{field}/{field_id}/{desired_state}",
-                params=params,
-            ) as response:
-                async for line in yield_lines_with_disconnect_check(request, response):
-                    yield line
+        bound_logger.debug(
+            "Connecting stream to /sse/wallet_id/topic/field/field_id/desired_state"
+        )
+        async with WaypointClient.get().stream(
+            "GET",
+            f"{waypoint_url(wallet_id)}/sse/{wallet_id}/{topic}/{field}/{field_id}/{desired_state}",
+            params=params,
+            # Raw chunks are forwarded as is, so they must not be compressed
+            headers={"Accept-Encoding": "identity"},
+        ) as response:
+            async for chunk in passthrough_stream(response, request):
+                yield chunk
+    except asyncio.CancelledError:
+        bound_logger.debug("SSE client disconnected")
+        raise
     except HTTPError as e:
         bound_logger.error("Caught HTTPError while handling SSE subscription: {}.", e)
         raise e
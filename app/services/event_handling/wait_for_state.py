@@ -0,0 +1,142 @@
+import asyncio
+import math
+import time
+from typing import Any
+
+from aries_cloudcontroller import AcaPyClient
+from httpx import HTTPError
+
+from app.services.event_handling.sse import WaypointClient
+from app.util.retry_method import coroutine_with_retry_until_value
+from shared.log_config import Logger, get_logger
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from shared.util.sharding import waypoint_url
+
+logger = get_logger(__name__)
+
+# Seconds to look back for events published just before waiting started
+WAIT_LOOK_BACK = 15
+# Seconds to wait before reopening a stream that closed without the event,
+# doubling while streams keep closing early
+RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 5
+
+
+async def wait_for_state(
+    *,
+    wallet_id: str,
+    topic: str,
+    field: str,
+    field_id: str,
+    desired_state: str,
+    max_wait: float,
+    group_id: str | None = None,
+) -> CloudApiWebhookEventGeneric:
+    """Wait for a state event of a wallet, from waypoint's stream of state events.
+
+    This lets internal flows await an event instead of polling ACA-Py. Waypoint
+    closes a stream without an event after its own SSE timeout, so the stream is
+    reopened, looking back to when waiting started, until `max_wait` seconds have
+    passed. Streams that close early are reopened with an increasing delay.
+
+    Raises:
+        HTTPError: If waypoint could not be reached.
+        TimeoutError: If the event did not arrive within `max_wait` seconds.
+
+    """
+    bound_logger = logger.bind(
+        body={
+            "wallet_id": wallet_id,
+            "topic": topic,
+            field: field_id,
+            "desired_state": desired_state,
+        }
+    )
+    url = (
+        f"{waypoint_url(wallet_id)}/sse/{wallet_id}/{topic}/{field}/{field_id}"
+        f"/{desired_state}"
+    )
+    started = time.monotonic()
+    deadline = started + max_wait
+    delay = RECONNECT_DELAY
+
+    while True:
+        opened = time.monotonic()
+        params: dict[str, Any] = {
+            "look_back": WAIT_LOOK_BACK + math.ceil(time.monotonic() - started)
+        }
+        if group_id:
+            params["group_id"] = group_id
+
+        bound_logger.debug("Waiting for state event")
+        async with WaypointClient.get().stream("GET", url, params=params) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    bound_logger.debug("Received state event")
+                    return CloudApiWebhookEventGeneric.model_validate_json(
+                        line.removeprefix("data:").strip()
+                    )
+
+        now = time.monotonic()
+        if now - opened >= MAX_RECONNECT_DELAY:
+            delay = RECONNECT_DELAY  # Closed after a while, e.g. the SSE timeout
+        if now + delay >= deadline:
+            bound_logger.info("No state event within {} seconds", max_wait)
+            raise TimeoutError
+        bound_logger.trace("Stream closed without event, reconnecting in {}s", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+
+async def wait_for_transaction_acked(
+    controller: AcaPyClient,
+    *,
+    wallet_id: str | None,
+    transaction_id: str,
+    logger: Logger,  # pylint: disable=redefined-outer-name
+    max_attempts: int,
+    retry_delay: int,
+) -> None:
+    """Wait for an endorser transaction to be acknowledged.
+
+    The `transaction-acked` event is awaited for as long as polling would have
+    taken. ACA-Py is then checked once, in case the event was missed. If waypoint
+    can't be reached, or the wallet id is not known, ACA-Py is polled instead.
+
+    Raises:
+        TimeoutError: If the transaction was not acknowledged in time.
+
+    """
+    if wallet_id is None:
+        logger.debug("Wallet id unknown, polling ACA-Py for transaction state")
+    else:
+        max_wait = max_attempts * retry_delay
+        try:
+            async with asyncio.timeout(max_wait):
+                await wait_for_state(
+                    wallet_id=wallet_id,
+                    topic="endorsements",
+                    field="transaction_id",
+                    field_id=transaction_id,
+                    desired_state="transaction-acked",
+                    max_wait=max_wait,
+                )
+            return
+        except TimeoutError:
+            logger.warning("No acked event for transaction, checking ACA-Py")
+            max_attempts = 1
+        except HTTPError as e:
+            logger.warning(
+                "Could not wait for transaction event ({}), polling ACA-Py", e
+            )
+
+    await coroutine_with_retry_until_value(
+        coroutine_func=controller.endorse_transaction.get_transaction,
+        args=(transaction_id,),
+        field_name="state",
+        expected_value="transaction_acked",
+        logger=logger,
+        max_attempts=max_attempts,
+        retry_delay=retry_delay,
+    )
@@ -16,7 +16,10 @@ from app.exceptions import (
 from app.models.tenants import OnboardResult, UpdateTenantRequest
 from app.services.onboarding.issuer import onboard_issuer
 from app.services.onboarding.verifier import onboard_verifier
-from app.services.trust_registry.actors import fetch_actor_by_id, update_actor
+from app.services.trust_registry.actors import (
+    fetch_actor_by_id_uncached,
+    update_actor,
+)
 from shared.log_config import get_logger
 from shared.models.trustregistry import TrustRegistryRole
 
@@ -36,7 +39,7 @@ async def handle_tenant_update(
     new_image_url = update_request.image_url
 
     # See if this wallet belongs to an actor
-    actor = await fetch_actor_by_id(wallet_id)
+    actor = await fetch_actor_by_id_uncached(wallet_id)
     if not actor and new_roles:
         bound_logger.info(
             "Bad request: Tenant not found in trust registry. "
@@ -12,6 +12,7 @@ from aries_cloudcontroller import (
     RevokeRequestSchemaAnonCreds,
     TxnOrPublishRevocationsResult,
 )
+from httpx import HTTPError
 
 from app.exceptions import (
     CloudApiException,
@@ -19,6 +20,7 @@ from app.exceptions import (
     handle_model_with_validation,
 )
 from app.models.issuer import ClearPendingRevocationsResult, RevokedResponse
+from app.services.event_handling.wait_for_state import wait_for_state
 from app.util.credentials import strip_protocol_prefix
 from app.util.retry_method import coroutine_with_retry
 from shared.log_config import get_logger
@@ -30,6 +32,7 @@ async def revoke_credential(
     controller: AcaPyClient,
     credential_exchange_id: str,
     auto_publish_to_ledger: bool = False,
+    wallet_id: str | None = None,
 ) -> RevokedResponse:
     """Revoke an issued credential
 
@@ -38,6 +41,8 @@ async def revoke_credential(
         credential_exchange_id (str): The credential exchange ID.
         auto_publish_to_ledger (bool): (True) publish revocation to ledger immediately,
             or (default, False) mark it pending
+        wallet_id (str | None): The issuer's wallet id, to await the revoked event
+            instead of polling. ACA-Py is polled when None.
 
     Raises:
         Exception: When the credential could not be revoked
@@ -78,6 +83,27 @@ async def revoke_credential(
         revoked = False
         max_tries = 5
         retry_delay = 1
+        if wallet_id is not None:
+            # Await the revoked event, then fetch the record once for its ids
+            max_wait = max_tries * retry_delay
+            try:
+                async with asyncio.timeout(max_wait):
+                    await wait_for_state(
+                        wallet_id=wallet_id,
+                        topic="issuer_cred_rev",
+                        field="cred_ex_id",
+                        field_id=strip_protocol_prefix(credential_exchange_id),
+                        desired_state="revoked",
+                        max_wait=max_wait,
+                    )
+                max_tries = 1
+            except TimeoutError:
+                bound_logger.warning("No revoked event for credential, checking ACA-Py")
+                max_tries = 1
+            except HTTPError as e:
+                bound_logger.warning(
+                    "Could not wait for revoked event ({}), polling ACA-Py", e
+                )
         n_try = 0
         while not revoked and n_try < max_tries:
             n_try += 1
@@ -401,7 +427,9 @@ async def wait_for_active_registry(
     active_registries: list[str] = []
     sleep_duration = 0.0  # First sleep should be 0
 
-    # we want both active registries ready before trying to publish revocations to it
+    # we want both active registries ready before trying to publish revocations to it.
+    # Polled rather than awaited with wait_for_state: a waypoint wait is released by
+    # the first matching event, and both registries match the same cred def id.
     while len(active_registries) < 2:
         await asyncio.sleep(sleep_duration)
         active_registries = await get_created_active_registries(controller, cred_def_id)
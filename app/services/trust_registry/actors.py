@@ -1,8 +1,9 @@
 from app.exceptions import TrustRegistryException
+from app.services.trust_registry.cache import actor_cache
+from app.services.trust_registry.client import TrustRegistryClient
 from shared.constants import TRUST_REGISTRY_URL
 from shared.log_config import get_logger
 from shared.models.trustregistry import Actor, TrustRegistryRole
-from shared.util.rich_async_client import RichAsyncClient
 
 logger = get_logger(__name__)
 
@@ -19,10 +20,11 @@ async def register_actor(actor: Actor) -> None:
     """
     bound_logger = logger.bind(body={"actor": actor})
     bound_logger.debug("Registering actor on trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actor_response = await client.post(
-            f"{TRUST_REGISTRY_URL}/registry/actors", json=actor.model_dump()
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actor_response = await client.post(
+        f"{TRUST_REGISTRY_URL}/registry/actors", json=actor.model_dump()
+    )
+    actor_cache.clear()
 
     if actor_response.status_code == 422:
         bound_logger.error(
@@ -50,11 +52,12 @@ async def register_actor(actor: Actor) -> None:
 async def update_actor(actor: Actor) -> None:
     bound_logger = logger.bind(body={"actor": actor})
     bound_logger.info("Updating actor on trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        update_response = await client.put(
-            f"{TRUST_REGISTRY_URL}/registry/actors/{actor.id}",
-            json=actor.model_dump(),
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    update_response = await client.put(
+        f"{TRUST_REGISTRY_URL}/registry/actors/{actor.id}",
+        json=actor.model_dump(),
+    )
+    actor_cache.clear()
 
     if update_response.status_code == 422:
         bound_logger.error(
@@ -88,8 +91,8 @@ async def fetch_all_actors() -> list[Actor]:
 
     """
     logger.debug("Fetching all actors from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actors_response = await client.get(f"{TRUST_REGISTRY_URL}/registry/actors")
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actors_response = await client.get(f"{TRUST_REGISTRY_URL}/registry/actors")
 
     if actors_response.is_error:
         logger.error(
@@ -112,6 +115,7 @@ async def fetch_all_actors() -> list[Actor]:
     return actors
 
 
+@actor_cache.cached
 async def fetch_actor_by_did(did: str) -> Actor | None:
     """Retrieve actor by did from trust registry
 
@@ -127,10 +131,8 @@ async def fetch_actor_by_did(did: str) -> Actor | None:
     """
     bound_logger = logger.bind(body={"did": did})
     bound_logger.debug("Fetching actor by DID from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actor_response = await client.get(
-            f"{TRUST_REGISTRY_URL}/registry/actors/did/{did}"
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actor_response = await client.get(f"{TRUST_REGISTRY_URL}/registry/actors/did/{did}")
 
     if actor_response.status_code == 404:
         bound_logger.info("Bad request: Actor with did not found.")
@@ -150,8 +152,18 @@ async def fetch_actor_by_did(did: str) -> Actor | None:
     return Actor.model_validate(actor_response.json())
 
 
+@actor_cache.cached
 async def fetch_actor_by_id(actor_id: str) -> Actor | None:
-    """Retrieve actor by id from trust registry
+    """Retrieve actor by id from trust registry, through the actor cache
+
+    The result may be stale for up to the cache TTL. Read-modify-write flows must
+    use `fetch_actor_by_id_uncached` instead.
+    """
+    return await fetch_actor_by_id_uncached(actor_id)
+
+
+async def fetch_actor_by_id_uncached(actor_id: str) -> Actor | None:
+    """Retrieve actor by id from trust registry, bypassing the actor cache
 
     Args:
         actor_id (str): Identifier of the actor to retrieve
@@ -165,10 +177,10 @@ async def fetch_actor_by_id(actor_id: str) -> Actor | None:
     """
     bound_logger = logger.bind(body={"actor_id": actor_id})
     bound_logger.debug("Fetching actor by ID from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actor_response = await client.get(
-            f"{TRUST_REGISTRY_URL}/registry/actors/{actor_id}"
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actor_response = await client.get(
+        f"{TRUST_REGISTRY_URL}/registry/actors/{actor_id}"
+    )
 
     if actor_response.status_code == 404:
         bound_logger.info("Bad request: actor with id not found.")
@@ -188,6 +200,7 @@ async def fetch_actor_by_id(actor_id: str) -> Actor | None:
     return Actor.model_validate(actor_response.json())
 
 
+@actor_cache.cached
 async def fetch_actor_by_name(actor_name: str) -> Actor | None:
     """Retrieve actor by name from trust registry
 
@@ -203,10 +216,10 @@ async def fetch_actor_by_name(actor_name: str) -> Actor | None:
     """
     bound_logger = logger.bind(body={"actor_id": actor_name})
     bound_logger.debug("Fetching actor by NAME from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actor_response = await client.get(
-            f"{TRUST_REGISTRY_URL}/registry/actors/name/{actor_name}"
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actor_response = await client.get(
+        f"{TRUST_REGISTRY_URL}/registry/actors/name/{actor_name}"
+    )
 
     if actor_response.status_code == 404:
         bound_logger.info("Bad request: Actor with name not found in registry.")
@@ -241,8 +254,10 @@ async def fetch_actors_with_role(role: TrustRegistryRole) -> list[Actor]:
     """
     bound_logger = logger.bind(body={"role": role})
     bound_logger.debug("Fetching all actors with requested role from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actors_response = await client.get(f"{TRUST_REGISTRY_URL}/registry/actors")
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actors_response = await client.get(
+        f"{TRUST_REGISTRY_URL}/registry/actors", params={"role": role}
+    )
 
     if actors_response.is_error:
         bound_logger.error(
@@ -278,10 +293,11 @@ async def remove_actor_by_id(actor_id: str) -> None:
     """
     bound_logger = logger.bind(body={"actor_id": actor_id})
     bound_logger.info("Removing actor from trust registry")
-    async with RichAsyncClient(raise_status_error=False) as client:
-        remove_response = await client.delete(
-            f"{TRUST_REGISTRY_URL}/registry/actors/{actor_id}"
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    remove_response = await client.delete(
+        f"{TRUST_REGISTRY_URL}/registry/actors/{actor_id}"
+    )
+    actor_cache.clear()
 
     if remove_response.status_code == 404:
         bound_logger.info(
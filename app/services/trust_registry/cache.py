@@ -0,0 +1,110 @@
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from functools import wraps
+from typing import Any, ParamSpec, TypeVar
+
+from pydantic import BaseModel
+
+from shared.log_config import get_logger
+
+logger = get_logger(__name__)
+
+# Actors and schemas are written through this app, which invalidates its own cache.
+# Other replicas (e.g. tenant-web vs multitenant-web) are not invalidated, and see a
+# write after at most the TTL (or the negative TTL, for a newly registered entry).
+TRUST_REGISTRY_CACHE_TTL = float(os.getenv("TRUST_REGISTRY_CACHE_TTL", "10"))
+TRUST_REGISTRY_CACHE_NEGATIVE_TTL = float(
+    os.getenv("TRUST_REGISTRY_CACHE_NEGATIVE_TTL", "2")
+)  # Shorter, so a newly onboarded issuer is not rejected for long
+TRUST_REGISTRY_CACHE_MAX_SIZE = int(os.getenv("TRUST_REGISTRY_CACHE_MAX_SIZE", "1024"))
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class TtlLruCache:
+    """Bounded in-memory cache, evicting the least recently used entry when full.
+
+    Entries expire after `ttl` seconds. Empty results (`None`, `False`, `[]`) are
+    cached for `negative_ttl` seconds instead. A TTL of 0 disables caching.
+
+    Models are stored and returned as copies, so that callers can't change the
+    cached entries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_size: int = TRUST_REGISTRY_CACHE_MAX_SIZE,
+        ttl: float = TRUST_REGISTRY_CACHE_TTL,
+        negative_ttl: float = TRUST_REGISTRY_CACHE_NEGATIVE_TTL,
+    ) -> None:
+        """Initialize an empty cache."""
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Return whether the key is cached, and its value."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, _copy(value)
+
+    def set(self, key: Hashable, value: object) -> None:
+        ttl = self.ttl if value else self.negative_ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, _copy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def cached(self, func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        """Read-through cache of a coroutine function, keyed on its arguments.
+
+        List arguments are keyed as tuples. Errors are not cached.
+        """
+
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            key = (
+                func.__name__,
+                *(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+                *sorted(kwargs.items()),
+            )
+            hit, value = self.get(key)
+            if hit:
+                logger.trace("Trust registry {} cache hit: {}", self.name, key)
+                return value
+            value = await func(*args, **kwargs)
+            self.set(key, value)
+            return value
+
+        return wrapper
+
+
+def _copy(value: object) -> object:
+    """Copy models, and lists of them. Other cached values are immutable."""
+    if isinstance(value, BaseModel):
+        return value.model_copy(deep=True)
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+actor_cache = TtlLruCache("actor")
+schema_cache = TtlLruCache("schema")
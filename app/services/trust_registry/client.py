@@ -0,0 +1,60 @@
+import os
+
+from httpx import AsyncHTTPTransport, Limits
+
+from shared.util.rich_async_client import RichAsyncClient, ssl_context
+
+# Connection pool to the trust registry, shared by all trust registry calls
+TRUST_REGISTRY_HTTP2 = os.getenv("TRUST_REGISTRY_HTTP2", "true").lower() == "true"
+TRUST_REGISTRY_MAX_CONNECTIONS = int(os.getenv("TRUST_REGISTRY_MAX_CONNECTIONS", "100"))
+TRUST_REGISTRY_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("TRUST_REGISTRY_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+TRUST_REGISTRY_KEEPALIVE_EXPIRY = float(
+    os.getenv("TRUST_REGISTRY_KEEPALIVE_EXPIRY", "60")
+)
+
+
+class TrustRegistryClient:
+    """Long-lived client to the trust registry, shared by all trust registry calls.
+
+    Connections are kept alive and reused between calls, so a lookup does not pay
+    for a new connection and TLS handshake. With HTTP/2 (negotiated over TLS),
+    concurrent calls are multiplexed over the same connection.
+
+    Callers that check status codes themselves get a client that doesn't raise on
+    4xx and 5xx responses. Both clients send their requests through the same
+    connection pool.
+    """
+
+    _transport: AsyncHTTPTransport | None = None
+    _clients: dict[bool, RichAsyncClient] = {}  # noqa: RUF012 (keyed on raise_status_error)
+
+    @classmethod
+    def get(cls, *, raise_status_error: bool = True) -> RichAsyncClient:
+        if cls._transport is None:
+            cls._transport = AsyncHTTPTransport(
+                verify=ssl_context,
+                http2=TRUST_REGISTRY_HTTP2,
+                limits=Limits(
+                    max_connections=TRUST_REGISTRY_MAX_CONNECTIONS,
+                    max_keepalive_connections=TRUST_REGISTRY_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=TRUST_REGISTRY_KEEPALIVE_EXPIRY,
+                ),
+            )
+        client = cls._clients.get(raise_status_error)
+        if client is None:
+            client = cls._clients[raise_status_error] = RichAsyncClient(
+                name="Trust Registry",
+                transport=cls._transport,
+                raise_status_error=raise_status_error,
+            )
+        return client
+
+    @classmethod
+    async def close(cls) -> None:
+        # The clients share the transport, so closing it closes their connections
+        cls._clients.clear()
+        if cls._transport is not None:
+            await cls._transport.aclose()
+            cls._transport = None
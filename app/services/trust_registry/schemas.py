@@ -1,10 +1,11 @@
 from fastapi import HTTPException
 
 from app.exceptions import TrustRegistryException
+from app.services.trust_registry.cache import schema_cache
+from app.services.trust_registry.client import TrustRegistryClient
 from shared.constants import TRUST_REGISTRY_URL
 from shared.log_config import get_logger
 from shared.models.trustregistry import Schema
-from shared.util.rich_async_client import RichAsyncClient
 
 logger = get_logger(__name__)
 
@@ -21,25 +22,27 @@ async def register_schema(schema_id: str) -> None:
     """
     bound_logger = logger.bind(body={"schema_id": schema_id})
     bound_logger.debug("Registering schema on trust registry")
-    async with RichAsyncClient() as client:
-        try:
-            await client.post(
-                f"{TRUST_REGISTRY_URL}/registry/schemas", json={"schema_id": schema_id}
-            )
-        except HTTPException as e:
-            bound_logger.error(
-                "Error registering schema. Got status code {} with message `{}`.",
-                e.status_code,
-                e.detail,
-            )
-            raise TrustRegistryException(
-                f"Error registering schema `{schema_id}`. Error: `{e.detail}`.",
-                e.status_code,
-            ) from e
+    client = TrustRegistryClient.get()
+    try:
+        await client.post(
+            f"{TRUST_REGISTRY_URL}/registry/schemas", json={"schema_id": schema_id}
+        )
+    except HTTPException as e:
+        bound_logger.error(
+            "Error registering schema. Got status code {} with message `{}`.",
+            e.status_code,
+            e.detail,
+        )
+        raise TrustRegistryException(
+            f"Error registering schema `{schema_id}`. Error: `{e.detail}`.",
+            e.status_code,
+        ) from e
+    schema_cache.clear()
 
     bound_logger.debug("Successfully registered schema on trust registry.")
 
 
+@schema_cache.cached
 async def fetch_schemas() -> list[Schema]:
     """Retrieve all schemas from the trust registry
 
@@ -51,24 +54,25 @@ async def fetch_schemas() -> list[Schema]:
 
     """
     logger.debug("Fetching all schemas from trust registry")
-    async with RichAsyncClient() as client:
-        try:
-            schemas_res = await client.get(f"{TRUST_REGISTRY_URL}/registry/schemas")
-        except HTTPException as e:
-            logger.error(
-                "Error fetching schemas. Got status code {} with message `{}`.",
-                e.status_code,
-                e.detail,
-            )
-            raise TrustRegistryException(
-                f"Unable to fetch schemas: `{e.detail}`.", e.status_code
-            ) from e
+    client = TrustRegistryClient.get()
+    try:
+        schemas_res = await client.get(f"{TRUST_REGISTRY_URL}/registry/schemas")
+    except HTTPException as e:
+        logger.error(
+            "Error fetching schemas. Got status code {} with message `{}`.",
+            e.status_code,
+            e.detail,
+        )
+        raise TrustRegistryException(
+            f"Unable to fetch schemas: `{e.detail}`.", e.status_code
+        ) from e
 
     result = [Schema.model_validate(schema) for schema in schemas_res.json()]
     logger.debug("Successfully fetched schemas from trust registry.")
     return result
 
 
+@schema_cache.cached
 async def get_schema_by_id(schema_id: str) -> Schema | None:
     """Retrieve a schemas from the trust registry
 
@@ -82,25 +86,25 @@ async def get_schema_by_id(schema_id: str) -> Schema | None:
     bound_logger = logger.bind(body={"schema_id": schema_id})
     bound_logger.debug("Fetching schema from trust registry")
 
-    async with RichAsyncClient() as client:
-        try:
-            schema_response = await client.get(
-                f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}"
+    client = TrustRegistryClient.get()
+    try:
+        schema_response = await client.get(
+            f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}"
+        )
+    except HTTPException as e:
+        if e.status_code == 404:
+            bound_logger.info("Bad request: Schema with id not found.")
+            return None
+        else:
+            bound_logger.error(
+                "Error fetching schema. Got status code {} with message `{}`.",
+                e.status_code,
+                e.detail,
             )
-        except HTTPException as e:
-            if e.status_code == 404:
-                bound_logger.info("Bad request: Schema with id not found.")
-                return None
-            else:
-                bound_logger.error(
-                    "Error fetching schema. Got status code {} with message `{}`.",
-                    e.status_code,
-                    e.detail,
-                )
-                raise TrustRegistryException(
-                    f"Unable to fetch schema: `{e.detail}`.",
-                    e.status_code,
-                ) from e
+            raise TrustRegistryException(
+                f"Unable to fetch schema: `{e.detail}`.",
+                e.status_code,
+            ) from e
 
     result = Schema.model_validate(schema_response.json())
     logger.debug("Successfully fetched schema from trust registry.")
@@ -119,18 +123,19 @@ async def remove_schema_by_id(schema_id: str) -> None:
     """
     bound_logger = logger.bind(body={"schema_id": schema_id})
     bound_logger.info("Removing schema from trust registry")
-    async with RichAsyncClient() as client:
-        try:
-            await client.delete(f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}")
-        except HTTPException as e:
-            bound_logger.error(
-                "Error removing schema. Got status code {} with message `{}`.",
-                e.status_code,
-                e.detail,
-            )
-            raise TrustRegistryException(
-                f"Error removing schema from trust registry: `{e.detail}`.",
-                e.status_code,
-            ) from e
+    client = TrustRegistryClient.get()
+    try:
+        await client.delete(f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}")
+    except HTTPException as e:
+        bound_logger.error(
+            "Error removing schema. Got status code {} with message `{}`.",
+            e.status_code,
+            e.detail,
+        )
+        raise TrustRegistryException(
+            f"Error removing schema from trust registry: `{e.detail}`.",
+            e.status_code,
+        ) from e
+    schema_cache.clear()
 
     bound_logger.debug("Successfully removed schema from trust registry.")
@@ -1,9 +1,9 @@
 from app.exceptions import TrustRegistryException
 from app.services.trust_registry.actors import fetch_actor_by_id
+from app.services.trust_registry.client import TrustRegistryClient
 from shared.constants import TRUST_REGISTRY_URL
 from shared.log_config import get_logger
 from shared.models.trustregistry import TrustRegistryRole
-from shared.util.rich_async_client import RichAsyncClient
 
 logger = get_logger(__name__)
 
@@ -51,10 +51,10 @@ async def assert_actor_name(actor_name: str) -> bool:
     bound_logger = logger.bind(body={"actor_name": actor_name})
     bound_logger.debug("Fetching actor by name from trust registry")
 
-    async with RichAsyncClient(raise_status_error=False) as client:
-        actor_response = await client.get(
-            f"{TRUST_REGISTRY_URL}/registry/actors/name/{actor_name}"
-        )
+    client = TrustRegistryClient.get(raise_status_error=False)
+    actor_response = await client.get(
+        f"{TRUST_REGISTRY_URL}/registry/actors/name/{actor_name}"
+    )
 
     if actor_response.status_code == 404:
         return False
@@ -1,12 +1,14 @@
 from fastapi import HTTPException
 
+from app.services.trust_registry.cache import schema_cache
+from app.services.trust_registry.client import TrustRegistryClient
 from shared.constants import TRUST_REGISTRY_URL
 from shared.log_config import get_logger
-from shared.util.rich_async_client import RichAsyncClient
 
 logger = get_logger(__name__)
 
 
+@schema_cache.cached
 async def registry_has_schema(schema_id: str) -> bool:
     """Check whether the trust registry has a schema registered
 
@@ -24,10 +26,10 @@ async def registry_has_schema(schema_id: str) -> bool:
     bound_logger.debug(
         "Asserting if schema is registered. Fetching schema by ID from trust registry"
     )
+    client = TrustRegistryClient.get()
     try:
-        async with RichAsyncClient() as client:
-            bound_logger.debug("Fetch schema from trust registry")
-            await client.get(f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}")
+        bound_logger.debug("Fetch schema from trust registry")
+        await client.get(f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}")
     except HTTPException as http_err:
         if http_err.status_code == 404:
             bound_logger.info("Schema id not registered in trust registry.")
@@ -40,3 +42,44 @@ async def registry_has_schema(schema_id: str) -> bool:
 
     bound_logger.debug("Schema exists in registry.")
     return True
+
+
+@schema_cache.cached
+async def registry_has_schemas(schema_ids: list[str]) -> bool:
+    """Check whether the trust registry has all of the schemas registered
+
+    Args:
+        schema_ids (List[str]): the schema ids to check
+
+    Raises:
+        HTTPException: If an error occurred while checking the schemas
+
+    Returns:
+        bool: whether all of the schemas exist in the trust registry
+
+    """
+    bound_logger = logger.bind(body={"schema_ids": schema_ids})
+    bound_logger.debug("Asserting if schemas are registered in trust registry")
+    client = TrustRegistryClient.get()
+    try:
+        response = await client.post(
+            f"{TRUST_REGISTRY_URL}/registry/schemas/exists",
+            json={"schema_ids": schema_ids},
+        )
+    except HTTPException as http_err:
+        bound_logger.error(
+            "Something went wrong when checking schemas in trust registry."
+        )
+        raise http_err
+
+    missing_ids = [
+        schema_id for schema_id, exists in response.json().items() if not exists
+    ]
+    if missing_ids:
+        bound_logger.info(
+            "Schema ids not registered in trust registry: {}.", missing_ids
+        )
+        return False
+
+    bound_logger.debug("Schemas exist in registry.")
+    return True
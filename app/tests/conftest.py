@@ -1,5 +1,6 @@
 import pytest
 
+from app.services.trust_registry.cache import actor_cache, schema_cache
 from app.tests.fixtures.dids import register_issuer_key_ed25519
 from app.tests.fixtures.member_acapy_clients import (
     acme_acapy_client,
@@ -95,3 +96,10 @@ __all__ = [
 @pytest.fixture(scope="session")
 def anyio_backend() -> tuple[str, dict[str, bool]]:
     return ("asyncio", {"use_uvloop": True})
+
+
+@pytest.fixture(autouse=True)
+def clear_trust_registry_caches() -> None:
+    # Trust registry lookups cached by one test must not leak into the next
+    actor_cache.clear()
+    schema_cache.clear()
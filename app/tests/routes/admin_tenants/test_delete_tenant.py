@@ -22,7 +22,7 @@ async def test_delete_tenant_by_id_success(group_id):
             "app.routes.admin.tenants.get_wallet_and_assert_valid_group",
             return_value=AsyncMock(),
         ) as mock_assert_valid_group,
-        patch("app.routes.admin.tenants.fetch_actor_by_id", return_value=None),
+        patch("app.routes.admin.tenants.fetch_actor_by_id_uncached", return_value=None),
         patch("app.routes.admin.tenants.remove_actor_by_id", return_value=AsyncMock()),
         patch(
             "app.routes.admin.tenants.get_tenant_admin_controller"
@@ -64,7 +64,8 @@ async def test_delete_tenant_by_id_success_actor(group_id):
             return_value=AsyncMock(),
         ) as mock_assert_valid_group,
         patch(
-            "app.routes.admin.tenants.fetch_actor_by_id", return_value=AsyncMock()
+            "app.routes.admin.tenants.fetch_actor_by_id_uncached",
+            return_value=AsyncMock(),
         ) as mock_fetch_actor,
         patch(
             "app.routes.admin.tenants.remove_actor_by_id", return_value=AsyncMock()
@@ -23,7 +23,7 @@ async def test_post_wallet_auth_token_success(group_id):
             "app.routes.admin.tenants.get_wallet_and_assert_valid_group",
             return_value=AsyncMock(),
         ) as mock_assert_valid_group,
-        patch("app.routes.admin.tenants.fetch_actor_by_id", return_value=None),
+        patch("app.routes.admin.tenants.fetch_actor_by_id_uncached", return_value=None),
         patch("app.routes.admin.tenants.remove_actor_by_id", return_value=AsyncMock()),
         patch(
             "app.routes.admin.tenants.get_tenant_admin_controller"
@@ -1,12 +1,25 @@
 from unittest.mock import AsyncMock, patch
 
+import jwt
 import pytest
 from aries_cloudcontroller import TxnOrPublishRevocationsResult
 
+from app.dependencies.auth import AcaPyAuth
+from app.dependencies.role import Role
 from app.exceptions.cloudapi_exception import CloudApiException
 from app.models.issuer import PublishRevocationsRequest
 from app.routes.revocation import publish_revocations
 from app.tests.util.models.dummy_txn_record_publish import txn_record
+from shared.constants import ACAPY_MULTITENANT_JWT_SECRET
+
+mock_auth = AcaPyAuth(
+    role=Role.TENANT,
+    token=jwt.encode(
+        {"wallet_id": "issuer_wallet_id"},
+        ACAPY_MULTITENANT_JWT_SECRET,
+        algorithm="HS256",
+    ),
+)
 
 
 @pytest.mark.anyio
@@ -14,7 +27,17 @@ from app.tests.util.models.dummy_txn_record_publish import txn_record
     "publish_revocation_response",
     [None, TxnOrPublishRevocationsResult(txn=[txn_record])],
 )
-async def test_publish_revocations_success(publish_revocation_response):
+@pytest.mark.parametrize(
+    "auth, expected_wallet_id",
+    [
+        (mock_auth, "issuer_wallet_id"),
+        # Not verifiable here: ACA-Py verifies the token, and ACA-Py is polled
+        (AcaPyAuth(role=Role.TENANT, token="opaque"), None),
+    ],
+)
+async def test_publish_revocations_success(
+    publish_revocation_response, auth, expected_wallet_id
+):
     mock_aries_controller = AsyncMock()
     mock_publish_revocations = AsyncMock(return_value=publish_revocation_response)
 
@@ -27,7 +50,7 @@ async def test_publish_revocations_success(publish_revocation_response):
             mock_publish_revocations,
         ),
         patch(
-            "app.routes.revocation.coroutine_with_retry_until_value",
+            "app.routes.revocation.wait_for_transaction_acked",
             mock_get_transaction,
         ),
     ):
@@ -39,13 +62,16 @@ async def test_publish_revocations_success(publish_revocation_response):
             revocation_registry_credential_map={}
         )
 
-        await publish_revocations(publish_request=publish_request, auth="mocked_auth")
+        await publish_revocations(publish_request=publish_request, auth=auth)
 
         mock_publish_revocations.assert_awaited_once_with(
             controller=mock_aries_controller, revocation_registry_credential_map={}
         )
         if publish_revocation_response:
             mock_get_transaction.assert_awaited_once()
+            assert mock_get_transaction.call_args.kwargs["wallet_id"] == (
+                expected_wallet_id
+            )
 
 
 @pytest.mark.anyio
@@ -83,7 +109,7 @@ async def test_publish_revocations_fail_acapy_error(
             revocation_registry_credential_map={}
         )
 
-        await publish_revocations(publish_request=publish_request, auth="mocked_auth")
+        await publish_revocations(publish_request=publish_request, auth=mock_auth)
 
     assert exc.value.status_code == expected_status_code
 
@@ -106,7 +132,7 @@ async def test_publish_revocations_fail_timeout():
             mock_publish_revocations,
         ),
         patch(
-            "app.routes.revocation.coroutine_with_retry_until_value",
+            "app.routes.revocation.wait_for_transaction_acked",
             AsyncMock(side_effect=TimeoutError()),
         ),
     ):
@@ -118,6 +144,6 @@ async def test_publish_revocations_fail_timeout():
             revocation_registry_credential_map={}
         )
 
-        await publish_revocations(publish_request=publish_request, auth="mocked_auth")
+        await publish_revocations(publish_request=publish_request, auth=mock_auth)
 
     assert exc.value.status_code == 504
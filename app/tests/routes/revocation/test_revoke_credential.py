@@ -1,12 +1,24 @@
 from unittest.mock import AsyncMock, patch
 
+import jwt
 import pytest
 
+from app.dependencies.auth import AcaPyAuth
+from app.dependencies.role import Role
 from app.exceptions.cloudapi_exception import CloudApiException
 from app.models.issuer import RevokeCredential
 from app.routes.revocation import revoke_credential
+from shared.constants import ACAPY_MULTITENANT_JWT_SECRET
 
 credential_exchange_id = "v2-db9d7025-b276-4c32-ae38-fbad41864112"
+mock_auth = AcaPyAuth(
+    role=Role.TENANT,
+    token=jwt.encode(
+        {"wallet_id": "issuer_wallet_id"},
+        ACAPY_MULTITENANT_JWT_SECRET,
+        algorithm="HS256",
+    ),
+)
 
 
 @pytest.mark.anyio
@@ -29,12 +41,13 @@ async def test_revoke_credential_success(auto_publish_to_ledger):
             auto_publish_on_ledger=auto_publish_to_ledger,
         )
 
-        await revoke_credential(body=request_body, auth="mocked_auth")
+        await revoke_credential(body=request_body, auth=mock_auth)
 
         mock_revoke_credential.assert_awaited_once_with(
             controller=mock_aries_controller,
             credential_exchange_id=credential_exchange_id,
             auto_publish_to_ledger=auto_publish_to_ledger,
+            wallet_id="issuer_wallet_id",
         )
 
 
@@ -73,6 +86,6 @@ async def test_revoke_credential_fail_acapy_error(
             auto_publish_on_ledger=False,
         )
 
-        await revoke_credential(body=request_body, auth="mocked_auth")
+        await revoke_credential(body=request_body, auth=mock_auth)
 
     assert exc.value.status_code == expected_status_code
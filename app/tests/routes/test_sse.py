@@ -12,11 +12,6 @@ field_id = "some_field_id"
 state = "some_state"
 
 
-@pytest.fixture()
-def mock_request() -> Mock:
-    return Mock()
-
-
 @pytest.fixture()
 def mock_auth() -> Mock:
     return Mock()
@@ -31,13 +26,13 @@ def mock_verify_wallet_access() -> Generator[AsyncMock, None, None]:
 @pytest.mark.anyio
 @pytest.mark.parametrize("group_id", [None, "some_group"])
 async def test_get_sse_subscribe_event_with_field_and_state(
-    mock_request,  # pylint: disable=redefined-outer-name
     mock_auth,  # pylint: disable=redefined-outer-name
     mock_verify_wallet_access,  # pylint: disable=redefined-outer-name
     group_id: str | None,
 ):
     # Mock sse_subscribe_event_with_field_and_state function to not actually attempt to connect to an SSE stream
     sse_subscribe_event_with_field_and_state_mock = Mock()
+    mock_request = Mock()
 
     with patch(
         "app.routes.sse.sse_subscribe_event_with_field_and_state",
@@ -160,7 +160,7 @@ async def test_publish_anoncreds_schema_timeout_error(publisher):
             return_value=mock_result,
         ),
         patch(
-            "app.services.definitions.schema_publisher.coroutine_with_retry_until_value",
+            "app.services.definitions.schema_publisher.wait_for_transaction_acked",
             side_effect=TimeoutError,
         ),
     ):
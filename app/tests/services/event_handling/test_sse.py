@@ -1,14 +1,15 @@
+import asyncio
 from collections.abc import AsyncGenerator, Generator
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from fastapi import Request
 from httpx import HTTPError, Response
 
 from app.services.event_handling.sse import (
+    WaypointClient,
+    passthrough_stream,
     sse_subscribe_event_with_field_and_state,
-    yield_lines_with_disconnect_check,
 )
 from shared.constants import WAYPOINT_URL
 from shared.util.rich_async_client import RichAsyncClient
@@ -23,41 +24,34 @@ state = "some_state"
 stream_exception_msg = "Stream method exception"
 
 
-line1 = "data: test\n"
-line2 = "\n"
-line3 = "data: done\n"
-lines_list = [line1, line2, line3]
+# Chunks are not aligned with events
+chunk1 = b"data: te"
+chunk2 = b"st\n\ndata: done\n"
+chunk3 = b"\n"
+chunks_list = [chunk1, chunk2, chunk3]
 
 
-# Fixture for async generator lines
+# Fixture for async generator chunks
 @pytest.fixture
-def async_lines() -> AsyncGenerator[str, Any]:
-    async def _lines() -> AsyncGenerator[str, Any]:
-        yield line1
-        yield line2
-        yield line3
+def async_chunks() -> AsyncGenerator[bytes, Any]:
+    async def _chunks() -> AsyncGenerator[bytes, Any]:
+        yield chunk1
+        yield chunk2
+        yield chunk3
 
-    return _lines
+    return _chunks
 
 
 # Fixture for the mock response
 @pytest.fixture
 def response_mock(
-    async_lines: AsyncGenerator[str, Any],  # pylint: disable=redefined-outer-name
+    async_chunks: AsyncGenerator[bytes, Any],  # pylint: disable=redefined-outer-name
 ) -> AsyncMock:
     response = AsyncMock(spec=Response)
-    response.aiter_lines.return_value = async_lines()
+    response.aiter_raw.return_value = async_chunks()
     return response
 
 
-# Fixture for the mock request
-@pytest.fixture
-def mock_request() -> AsyncMock:
-    request = AsyncMock(spec=Request)
-    request.is_disconnected.return_value = False
-    return request
-
-
 # Fixture to create and configure the async context manager mock
 @pytest.fixture
 def configured_async_context_manager_mock(
@@ -79,66 +73,78 @@ def exception_async_context_manager_mock(
     return configured_async_context_manager_mock
 
 
-# Patching the yield_lines_with_disconnect_check globally for all tests
+# Patching the passthrough_stream globally for all tests
 @pytest.fixture(autouse=True)
-def patch_yield_lines_with_disconnect_check(
-    async_lines,  # pylint: disable=redefined-outer-name
+def patch_passthrough_stream(
+    async_chunks,  # pylint: disable=redefined-outer-name
 ) -> Generator[AsyncMock, Any, None]:
     with patch(
-        "app.services.event_handling.sse.yield_lines_with_disconnect_check",
-        return_value=async_lines(),
+        "app.services.event_handling.sse.passthrough_stream",
+        return_value=async_chunks(),
     ) as mocked_yield:
         yield mocked_yield
 
 
+@pytest.fixture
+def request_mock() -> Mock:
+    request = Mock()
+    request.is_disconnected = AsyncMock(return_value=False)
+    return request
+
+
 @pytest.mark.anyio
-async def test_yield_lines_with_disconnect_check_success(
+async def test_passthrough_stream(
     response_mock,  # pylint: disable=redefined-outer-name
-    mock_request,  # pylint: disable=redefined-outer-name
+    request_mock,  # pylint: disable=redefined-outer-name
 ):
-    # Execute yield_lines_with_disconnect_check and collect results
-    results = [
-        line
-        async for line in yield_lines_with_disconnect_check(mock_request, response_mock)
-    ]
-    # Assert that all lines were yielded correctly
-    assert results == [line1 + "\n", line2 + "\n", line3 + "\n"]
+    results = [chunk async for chunk in passthrough_stream(response_mock, request_mock)]
+
+    # Chunks are forwarded unchanged
+    assert results == chunks_list
+    response_mock.aiter_lines.assert_not_called()
 
 
 @pytest.mark.anyio
-async def test_yield_lines_with_disconnect_check_disconnects(
-    response_mock,  # pylint: disable=redefined-outer-name
-    mock_request,  # pylint: disable=redefined-outer-name
+async def test_passthrough_stream_stops_on_disconnect(
+    request_mock,  # pylint: disable=redefined-outer-name
 ):
-    # Override the mock request to simulate a disconnection after the first yield
-    mock_request.is_disconnected.side_effect = [False, True]
+    cancelled = asyncio.Event()
 
-    # Execute yield_lines_with_disconnect_check and collect results
-    results = [
-        line
-        async for line in yield_lines_with_disconnect_check(mock_request, response_mock)
-    ]
-    # Assert that only the first line was yielded before disconnection
-    assert results == [line1 + "\n"]
+    async def chunks() -> AsyncGenerator[bytes, Any]:
+        yield chunk1
+        try:
+            await asyncio.sleep(60)  # No more chunks until the next ping
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        yield chunk2
+
+    response = AsyncMock(spec=Response)
+    response.aiter_raw.return_value = chunks()
+    request_mock.is_disconnected.side_effect = [False, False, True]
+
+    with patch("app.services.event_handling.sse.DISCONNECT_CHECK_INTERVAL", 0.01):
+        results = [chunk async for chunk in passthrough_stream(response, request_mock)]
+
+    # The stream ends while waiting for a chunk, which is no longer awaited
+    assert results == [chunk1]
+    assert cancelled.is_set()
+    assert request_mock.is_disconnected.await_count == 3
 
 
 @pytest.mark.anyio
 async def test_sse_subscribe_event_with_field_and_state_exception(
     exception_async_context_manager_mock,  # pylint: disable=redefined-outer-name
-    mock_request,  # pylint: disable=redefined-outer-name
 ):
     # Patch the stream method of RichAsyncClient to use our prepared context manager mock
     with patch(
         "shared.util.rich_async_client.RichAsyncClient.stream",
         return_value=exception_async_context_manager_mock,
     ):
-        mock_request = AsyncMock(spec=Request)
-        mock_request.is_disconnected.return_value = False
-
         # Execute the function and handle the exception
         with pytest.raises(HTTPError) as e:
             async for _ in sse_subscribe_event_with_field_and_state(
-                request=mock_request,
+                request=Mock(),
                 group_id=None,
                 wallet_id=wallet_id,
                 topic=topic,
@@ -156,8 +162,8 @@ async def test_sse_subscribe_event_with_field_and_state_exception(
 @pytest.mark.parametrize("group_id", [None, "some_group"])
 async def test_sse_subscribe_event_with_field_and_state_success(
     configured_async_context_manager_mock,  # pylint: disable=redefined-outer-name
-    mock_request,  # pylint: disable=redefined-outer-name
-    patch_yield_lines_with_disconnect_check,  # pylint: disable=redefined-outer-name
+    patch_passthrough_stream,  # pylint: disable=redefined-outer-name
+    request_mock,  # pylint: disable=redefined-outer-name
     group_id: str | None,
 ):
     expected_params = {"look_back": 60}
@@ -173,7 +179,7 @@ async def test_sse_subscribe_event_with_field_and_state_success(
         results = [
             line
             async for line in sse_subscribe_event_with_field_and_state(
-                request=mock_request,
+                request=request_mock,
                 group_id=group_id,
                 wallet_id=wallet_id,
                 topic=topic,
@@ -183,10 +189,13 @@ async def test_sse_subscribe_event_with_field_and_state_success(
             )
         ]
 
-        # Verify the collected lines
-        assert results == lines_list
-        # Ensure the patched yield_lines_with_disconnect_check was called
-        patch_yield_lines_with_disconnect_check.assert_called()
+        # Verify the collected chunks
+        assert results == chunks_list
+        # Ensure the patched passthrough_stream was called
+        patch_passthrough_stream.assert_called_once_with(
+            configured_async_context_manager_mock.__aenter__.return_value,
+            request_mock,
+        )
 
         # Additionally, assert that the stream was opened with the correct parameters
         configured_async_context_manager_mock.__aenter__.assert_called()
@@ -195,4 +204,19 @@ async def test_sse_subscribe_event_with_field_and_state_success(
             "GET",
             f"{WAYPOINT_URL}/sse/{wallet_id}/{topic}/{field}/{field_id}/{state}",
             params=expected_params,
+            headers={"Accept-Encoding": "identity"},
         )
+
+
+@pytest.mark.anyio
+async def test_waypoint_client_is_shared():
+    client = WaypointClient.get()
+    assert WaypointClient.get() is client
+
+    await WaypointClient.close()
+    assert client.is_closed
+
+    # A new client is created after the shared one was closed
+    new_client = WaypointClient.get()
+    assert new_client is not client
+    await WaypointClient.close()
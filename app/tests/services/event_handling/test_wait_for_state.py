@@ -0,0 +1,192 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from httpx import ConnectError
+
+from app.services.event_handling.wait_for_state import (
+    wait_for_state,
+    wait_for_transaction_acked,
+)
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+
+wallet_id = "some_wallet"
+transaction_id = "some_transaction_id"
+
+acked_event = CloudApiWebhookEventGeneric(
+    wallet_id=wallet_id,
+    topic="endorsements",
+    origin="multitenant",
+    payload={"transaction_id": transaction_id, "state": "transaction-acked"},
+)
+
+
+def stream_response(lines: list[str]) -> MagicMock:
+    async def aiter_lines() -> AsyncGenerator[str, None]:
+        for line in lines:
+            yield line
+
+    response = Mock()
+    response.aiter_lines = aiter_lines
+    stream = MagicMock()
+    stream.__aenter__ = AsyncMock(return_value=response)
+    stream.__aexit__ = AsyncMock(return_value=False)
+    return stream
+
+
+@pytest.fixture
+def mock_client() -> Mock:
+    client = Mock()
+    with patch(
+        "app.services.event_handling.wait_for_state.WaypointClient.get",
+        return_value=client,
+    ):
+        yield client
+
+
+@pytest.mark.anyio
+async def test_wait_for_state(mock_client):  # pylint: disable=redefined-outer-name
+    mock_client.stream.side_effect = [
+        # Waypoint closes the stream without an event after its SSE timeout
+        stream_response([": ping", ""]),
+        stream_response([": ping", f"data: {acked_event.model_dump_json()}"]),
+    ]
+
+    event = await wait_for_state(
+        wallet_id=wallet_id,
+        topic="endorsements",
+        field="transaction_id",
+        field_id=transaction_id,
+        desired_state="transaction-acked",
+        max_wait=10,
+        group_id="some_group",
+    )
+
+    assert event == acked_event
+    assert mock_client.stream.call_count == 2
+    args, kwargs = mock_client.stream.call_args
+    assert args[1].endswith(
+        f"/sse/{wallet_id}/endorsements/transaction_id/{transaction_id}"
+        "/transaction-acked"
+    )
+    assert kwargs["params"]["group_id"] == "some_group"
+    assert kwargs["params"]["look_back"] >= 15
+
+
+@pytest.mark.anyio
+async def test_wait_for_state_backs_off_until_deadline(mock_client):  # pylint: disable=redefined-outer-name
+    # Waypoint keeps closing the stream straight away
+    mock_client.stream.side_effect = lambda *_, **__: stream_response([])
+    sleeps = []
+
+    async def sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    with (
+        patch("app.services.event_handling.wait_for_state.asyncio.sleep", sleep),
+        patch(
+            "app.services.event_handling.wait_for_state.time.monotonic",
+            side_effect=lambda: sum(sleeps),
+        ),
+        pytest.raises(TimeoutError),
+    ):
+        await wait_for_state(
+            wallet_id=wallet_id,
+            topic="endorsements",
+            field="transaction_id",
+            field_id=transaction_id,
+            desired_state="transaction-acked",
+            max_wait=20,
+        )
+
+    assert sleeps == [0.5, 1, 2, 4, 5, 5]
+    assert mock_client.stream.call_count == 7
+
+
+@pytest.mark.anyio
+async def test_wait_for_transaction_acked_from_event():
+    controller = AsyncMock()
+
+    with (
+        patch(
+            "app.services.event_handling.wait_for_state.wait_for_state",
+            AsyncMock(return_value=acked_event),
+        ),
+        patch(
+            "app.services.event_handling.wait_for_state.coroutine_with_retry_until_value"
+        ) as mock_poll,
+    ):
+        await wait_for_transaction_acked(
+            controller,
+            wallet_id=wallet_id,
+            transaction_id=transaction_id,
+            logger=Mock(),
+            max_attempts=5,
+            retry_delay=1,
+        )
+
+    mock_poll.assert_not_called()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error,expected_attempts",
+    [
+        # No event in time: ACA-Py is checked once, in case the event was missed
+        (None, 1),
+        # Waypoint unavailable: ACA-Py is polled instead
+        (ConnectError("Connection refused"), 5),
+    ],
+)
+async def test_wait_for_transaction_acked_falls_back_to_polling(
+    error, expected_attempts
+):
+    async def wait(**_) -> CloudApiWebhookEventGeneric:
+        if error:
+            raise error
+        await asyncio.sleep(1)
+        return acked_event
+
+    with (
+        patch("app.services.event_handling.wait_for_state.wait_for_state", wait),
+        patch(
+            "app.services.event_handling.wait_for_state.coroutine_with_retry_until_value",
+            AsyncMock(),
+        ) as mock_poll,
+    ):
+        await wait_for_transaction_acked(
+            AsyncMock(),
+            wallet_id=wallet_id,
+            transaction_id=transaction_id,
+            logger=Mock(),
+            max_attempts=5,
+            retry_delay=0.01,
+        )
+
+    mock_poll.assert_awaited_once()
+    assert mock_poll.call_args.kwargs["max_attempts"] == expected_attempts
+
+
+@pytest.mark.anyio
+async def test_wait_for_transaction_acked_without_wallet_id():
+    with (
+        patch(
+            "app.services.event_handling.wait_for_state.wait_for_state", AsyncMock()
+        ) as mock_wait,
+        patch(
+            "app.services.event_handling.wait_for_state.coroutine_with_retry_until_value",
+            AsyncMock(),
+        ) as mock_poll,
+    ):
+        await wait_for_transaction_acked(
+            AsyncMock(),
+            wallet_id=None,
+            transaction_id=transaction_id,
+            logger=Mock(),
+            max_attempts=5,
+            retry_delay=0.01,
+        )
+
+    mock_wait.assert_not_called()
+    assert mock_poll.call_args.kwargs["max_attempts"] == 5
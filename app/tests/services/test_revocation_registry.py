@@ -16,6 +16,7 @@ from aries_cloudcontroller import (
     RevRegResultSchemaAnonCreds,
     RevRegsCreatedSchemaAnonCreds,
 )
+from httpx import ConnectError
 
 import app.services.revocation_registry as test_module
 from app.exceptions import CloudApiException
@@ -578,6 +579,50 @@ async def test_revoke_credential_auto_publish_timeout(
     assert mock_sleep.call_count == 4
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "error,expected_tries",
+    [
+        # Revoked event received: the record is fetched once for its ids
+        (None, 1),
+        # No event in time: ACA-Py is checked once, in case the event was missed
+        (TimeoutError(), 1),
+        # Waypoint unavailable: ACA-Py is polled instead
+        (ConnectError("Connection refused"), 5),
+    ],
+)
+async def test_revoke_credential_auto_publish_awaits_event(
+    mock_agent_controller: AcaPyClient, error, expected_tries
+):
+    anoncreds_revocation = mock_agent_controller.anoncreds_revocation
+    anoncreds_revocation.get_cred_rev_record = AsyncMock(
+        return_value=MagicMock(result=MagicMock(state="not-revoked"))
+    )
+
+    with (
+        patch(
+            "app.services.revocation_registry.wait_for_state",
+            AsyncMock(side_effect=error),
+        ) as mock_wait,
+        patch("app.services.revocation_registry.asyncio.sleep"),
+        pytest.raises(CloudApiException, match="Could not assert that revocation"),
+    ):
+        await test_module.revoke_credential(
+            controller=mock_agent_controller,
+            credential_exchange_id=f"v2-{cred_ex_id}",
+            auto_publish_to_ledger=True,
+            wallet_id="issuer_wallet_id",
+        )
+
+    mock_wait.assert_awaited_once()
+    assert mock_wait.call_args.kwargs["wallet_id"] == "issuer_wallet_id"
+    assert mock_wait.call_args.kwargs["topic"] == "issuer_cred_rev"
+    assert mock_wait.call_args.kwargs["field"] == "cred_ex_id"
+    assert mock_wait.call_args.kwargs["field_id"] == cred_ex_id
+    assert mock_wait.call_args.kwargs["desired_state"] == "revoked"
+    assert anoncreds_revocation.get_cred_rev_record.call_count == expected_tries
+
+
 @pytest.mark.anyio
 async def test_revoke_credential_no_result_returned(
     mock_agent_controller: AcaPyClient,
@@ -21,6 +21,7 @@ from app.services.trust_registry.actors import (
     remove_actor_by_id,
     update_actor,
 )
+from app.services.trust_registry.cache import actor_cache, schema_cache
 from app.services.trust_registry.schemas import register_schema, remove_schema_by_id
 from app.services.trust_registry.util.actor import actor_has_role, assert_actor_name
 from app.services.trust_registry.util.issuer import assert_valid_issuer
@@ -31,6 +32,14 @@ from shared.models.trustregistry import Actor
 sample_did = "did:cheqd:testnet:39be08a4-8971-43ee-8a10-821ad52f24c6"
 
 
+@pytest.fixture(autouse=True)
+def disable_trust_registry_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    # These tests change the mocked response between calls for the same key
+    for cache in (actor_cache, schema_cache):
+        monkeypatch.setattr(cache, "ttl", 0)
+        monkeypatch.setattr(cache, "negative_ttl", 0)
+
+
 @pytest.mark.anyio
 async def test_assert_valid_issuer(
     mocker: MockerFixture,
@@ -39,8 +48,8 @@ async def test_assert_valid_issuer(
     actors_path = f"{service_path}.actors"
     schema_path = f"{service_path}.util.schema"
 
-    patch_client_actors = mocker.patch(f"{actors_path}.RichAsyncClient")
-    patch_client_schema = mocker.patch(f"{schema_path}.RichAsyncClient")
+    patch_client_actors = mocker.patch(f"{actors_path}.TrustRegistryClient")
+    patch_client_schema = mocker.patch(f"{schema_path}.TrustRegistryClient")
 
     actor = Actor(id="actor-id", roles=["issuer"], did=sample_did, name="abc")
     schema_id = "a_schema_id"
@@ -49,7 +58,7 @@ async def test_assert_valid_issuer(
     mocked_client_get_did = Mock()
     response_actor_by_did = Response(200, json=actor.model_dump())
     mocked_client_get_did.get = AsyncMock(return_value=response_actor_by_did)
-    patch_client_actors.return_value.__aenter__.return_value = mocked_client_get_did
+    patch_client_actors.get.return_value = mocked_client_get_did
 
     mocked_client_get_schema = Mock()
     response_schema = Response(
@@ -57,7 +66,7 @@ async def test_assert_valid_issuer(
         json={"id": schema_id, "did": sample_did, "version": "1.0", "name": "name"},
     )
     mocked_client_get_schema.get = AsyncMock(return_value=response_schema)
-    patch_client_schema.return_value.__aenter__.return_value = mocked_client_get_schema
+    patch_client_schema.get.return_value = mocked_client_get_schema
 
     # Valid issuer and schema
     await assert_valid_issuer(did=sample_did, schema_id=schema_id)
@@ -65,7 +74,7 @@ async def test_assert_valid_issuer(
     # Schema is not registered in registry
     not_found_response = HTTPException(status_code=404)
     mocked_client_get_schema.get = AsyncMock(side_effect=not_found_response)
-    patch_client_schema.return_value.__aenter__.return_value = mocked_client_get_schema
+    patch_client_schema.get.return_value = mocked_client_get_schema
     with pytest.raises(
         TrustRegistryException,
         match=f"Schema with id {schema_id} is not registered in trust registry.",
@@ -552,7 +561,7 @@ async def test_get_issuers(
     await get_issuers()
 
     mock_async_client.get.assert_called_once_with(
-        f"{TRUST_REGISTRY_URL}/registry/actors"
+        f"{TRUST_REGISTRY_URL}/registry/actors", params={"role": "issuer"}
     )
 
 
@@ -577,5 +586,5 @@ async def test_get_verifiers(
 
     await get_verifiers()
     mock_async_client.get.assert_called_once_with(
-        f"{TRUST_REGISTRY_URL}/registry/actors"
+        f"{TRUST_REGISTRY_URL}/registry/actors", params={"role": "verifier"}
     )
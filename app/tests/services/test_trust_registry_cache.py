@@ -0,0 +1,210 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from httpx import Response
+
+from app.exceptions import TrustRegistryException
+from app.services.trust_registry.actors import (
+    fetch_actor_by_did,
+    fetch_actor_by_id,
+    fetch_actor_by_id_uncached,
+    remove_actor_by_id,
+    update_actor,
+)
+from app.services.trust_registry.cache import TtlLruCache
+from app.services.trust_registry.schemas import fetch_schemas, register_schema
+from app.services.trust_registry.util.schema import (
+    registry_has_schema,
+    registry_has_schemas,
+)
+from shared.models.trustregistry import Actor, Schema
+
+did = "did:cheqd:testnet:39be08a4-8971-43ee-8a10-821ad52f24c6"
+actor = Actor(id="actor-id", roles=["issuer"], did=did, name="abc")
+schema = Schema(id="did:2:name:1.0", did="did", name="name", version="1.0")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TtlLruCache("test", max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_cache_expires_entries():
+    cache = TtlLruCache("test", ttl=10, negative_ttl=2)
+
+    with patch("app.services.trust_registry.cache.time.monotonic", return_value=0):
+        cache.set("found", "value")
+        cache.set("not_found", None)
+
+    with patch("app.services.trust_registry.cache.time.monotonic", return_value=5):
+        assert cache.get("found") == (True, "value")
+        assert cache.get("not_found") == (False, None)
+
+    with patch("app.services.trust_registry.cache.time.monotonic", return_value=10):
+        assert cache.get("found") == (False, None)
+
+
+def test_cache_disabled():
+    cache = TtlLruCache("test", ttl=0, negative_ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") == (False, None)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.actors"], indirect=True
+)
+async def test_fetch_actor_by_did_cached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(
+        return_value=Response(200, json=actor.model_dump())
+    )
+
+    assert await fetch_actor_by_did(did) == actor
+    assert await fetch_actor_by_did(did) == actor
+    mock_async_client.get.assert_awaited_once()
+
+    # Writes invalidate the cache
+    mock_async_client.put = AsyncMock(return_value=Response(200))
+    await update_actor(actor)
+    assert await fetch_actor_by_did(did) == actor
+    assert mock_async_client.get.await_count == 2
+
+    mock_async_client.delete = AsyncMock(return_value=Response(200))
+    mock_async_client.get = AsyncMock(return_value=Response(404))
+    await remove_actor_by_id(actor.id)
+    assert await fetch_actor_by_did(did) is None
+    assert await fetch_actor_by_did(did) is None  # Negative result is cached too
+    mock_async_client.get.assert_awaited_once()
+
+
+def test_cache_returns_copies():
+    cache = TtlLruCache("test")
+    cached_actor = actor.model_copy(deep=True)
+    cache.set("actor", cached_actor)
+    cache.set("schemas", [schema])
+
+    # Changing the stored or a returned value does not change the cache
+    cached_actor.name = "changed"
+    _, first = cache.get("actor")
+    first.roles.append("verifier")
+    _, schemas = cache.get("schemas")
+    assert schemas[0] is not schema
+    schemas.clear()
+
+    assert cache.get("actor") == (True, actor)
+    assert cache.get("schemas") == (True, [schema])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.actors"], indirect=True
+)
+async def test_fetch_actor_by_did_returns_copies(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(
+        return_value=Response(200, json=actor.model_dump())
+    )
+
+    fetched = await fetch_actor_by_did(did)
+    assert fetched is not None
+    fetched.roles.append("verifier")
+
+    assert await fetch_actor_by_did(did) == actor
+    mock_async_client.get.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.actors"], indirect=True
+)
+async def test_fetch_actor_by_id_uncached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(return_value=Response(404))
+    assert await fetch_actor_by_id(actor.id) is None  # Not found is now cached
+
+    mock_async_client.get = AsyncMock(
+        return_value=Response(200, json=actor.model_dump())
+    )
+    assert await fetch_actor_by_id(actor.id) is None
+    assert await fetch_actor_by_id_uncached(actor.id) == actor
+    mock_async_client.get.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.actors"], indirect=True
+)
+async def test_fetch_actor_by_did_error_not_cached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(return_value=Response(500))
+    with pytest.raises(TrustRegistryException):
+        await fetch_actor_by_did(did)
+
+    mock_async_client.get = AsyncMock(
+        return_value=Response(200, json=actor.model_dump())
+    )
+    assert await fetch_actor_by_did(did) == actor
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.schemas"], indirect=True
+)
+async def test_fetch_schemas_cached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(
+        return_value=Response(200, json=[schema.model_dump()])
+    )
+
+    assert await fetch_schemas() == [schema]
+    assert await fetch_schemas() == [schema]
+    mock_async_client.get.assert_awaited_once()
+
+    mock_async_client.post = AsyncMock(return_value=Response(200))
+    await register_schema(schema.id)
+    assert await fetch_schemas() == [schema]
+    assert mock_async_client.get.await_count == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.util.schema"], indirect=True
+)
+async def test_registry_has_schema_cached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.get = AsyncMock(return_value=Response(200))
+
+    assert await registry_has_schema(schema.id) is True
+    assert await registry_has_schema(schema.id) is True
+    mock_async_client.get.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "mock_async_client", ["app.services.trust_registry.util.schema"], indirect=True
+)
+async def test_registry_has_schemas_cached(
+    mock_async_client: Mock,  # pylint: disable=redefined-outer-name
+):
+    mock_async_client.post = AsyncMock(
+        return_value=Response(200, json={schema.id: True})
+    )
+
+    assert await registry_has_schemas([schema.id]) is True
+    assert await registry_has_schemas([schema.id]) is True
+    mock_async_client.post.assert_awaited_once()
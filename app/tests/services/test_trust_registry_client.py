@@ -0,0 +1,23 @@
+import pytest
+
+from app.services.trust_registry.client import TrustRegistryClient
+
+
+@pytest.mark.anyio
+async def test_trust_registry_client_is_shared():
+    client = TrustRegistryClient.get()
+    assert TrustRegistryClient.get() is client
+    assert client.raise_status_error is True
+
+    lenient_client = TrustRegistryClient.get(raise_status_error=False)
+    assert lenient_client.raise_status_error is False
+    # Both clients send requests through the same connection pool
+    assert lenient_client._transport is client._transport  # pylint: disable=protected-access
+
+    await TrustRegistryClient.close()
+
+    # A new client is created after the shared one was closed
+    new_client = TrustRegistryClient.get()
+    assert new_client is not client
+    assert new_client._transport is not client._transport  # pylint: disable=protected-access
+    await TrustRegistryClient.close()
@@ -13,6 +13,7 @@ from httpx import Response
 
 from app.exceptions import CloudApiException
 from app.routes.verifier import AcceptProofRequest, SendProofRequest
+from app.services.trust_registry.cache import actor_cache
 from app.tests.services.verifier.utils import (
     anoncreds_pres_spec,
     sample_anoncreds_proof_request,
@@ -26,6 +27,7 @@ from app.util.acapy_verifier_utils import (
     get_schema_ids,
     is_verifier,
 )
+from shared.constants import TRUST_REGISTRY_URL
 from shared.models.presentation_exchange import PresentationExchange
 from shared.models.trustregistry import Actor
 
@@ -54,34 +56,34 @@ pres_exchange = PresentationExchange(
 
 @pytest.mark.anyio
 @pytest.mark.parametrize(
-    "mock_async_client", ["app.services.trust_registry.schemas"], indirect=True
+    "mock_async_client", ["app.services.trust_registry.util.schema"], indirect=True
 )
 async def test_are_valid_schemas(mock_async_client: Mock):
-    # schemas are valid
-    schemas = [
-        {
-            "did": "9L2b2nqUFmY1rVMWwVVZ9y",
-            "name": "test_schema",
-            "version": "100.72.97",
-            "id": "9L2b2nqUFmY1rVMWwVVZ9y:2:test_schema:100.72.97",
-        },
-        {
-            "did": "9L2b2nqUFmY1rVMWwVVZ9y",
-            "name": "test_schema_alt",
-            "version": "53.86.35",
-            "id": "9L2b2nqUFmY1rVMWwVVZ9y:2:test_schema_alt:53.86.35",
-        },
+    schema_ids = [
+        "9L2b2nqUFmY1rVMWwVVZ9y:2:test_schema:100.72.97",
+        "9L2b2nqUFmY1rVMWwVVZ9y:2:test_schema_alt:53.86.35",
     ]
-    schema_ids = [schema["id"] for schema in schemas]
 
-    mock_async_client.get = AsyncMock(return_value=Response(200, json=schemas))
+    # schemas are valid
+    mock_async_client.post = AsyncMock(
+        return_value=Response(200, json=dict.fromkeys(schema_ids, True))
+    )
 
     assert await are_valid_schemas(schema_ids=schema_ids) is True
+    mock_async_client.post.assert_awaited_once_with(
+        f"{TRUST_REGISTRY_URL}/registry/schemas/exists",
+        json={"schema_ids": schema_ids},
+    )
 
     # has invalid schema
-    assert (
-        await are_valid_schemas(schema_ids=["SomeRandomDid:2:test_schema:0.3"]) is False
+    invalid_schema_id = "SomeRandomDid:2:test_schema:0.3"
+    mock_async_client.post = AsyncMock(
+        return_value=Response(200, json={invalid_schema_id: False})
     )
+    assert await are_valid_schemas(schema_ids=[invalid_schema_id]) is False
+
+    # no schemas
+    assert await are_valid_schemas(schema_ids=[]) is False
 
 
 @pytest.mark.anyio
@@ -159,7 +161,8 @@ async def test_get_actor(mock_async_client: Mock):
 
     assert await get_actor(did=sample_actor.did) == sample_actor
 
-    # no actor
+    # no actor (after the cached actor was removed)
+    actor_cache.clear()
     mock_async_client.get = AsyncMock(return_value=Response(404, json={}))
 
     with pytest.raises(
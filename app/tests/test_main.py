@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pydantic
 import pytest
@@ -12,6 +12,7 @@ from app.main import (
     acapy_cloud_description,
     acapy_cloud_docs_description,
     app,
+    app_lifespan,
     create_app,
     default_docs_description,
     read_openapi_yaml,
@@ -37,6 +38,24 @@ def test_create_app():
             assert route in routes
 
 
+@pytest.mark.anyio
+async def test_app_lifespan_closes_shared_clients():
+    with (
+        patch(
+            "app.main.WaypointClient.close", new_callable=AsyncMock
+        ) as mock_close_waypoint,
+        patch(
+            "app.main.TrustRegistryClient.close", new_callable=AsyncMock
+        ) as mock_close_trust_registry,
+    ):
+        async with app_lifespan(app):
+            mock_close_waypoint.assert_not_called()
+            mock_close_trust_registry.assert_not_called()
+
+        mock_close_waypoint.assert_awaited_once()
+        mock_close_trust_registry.assert_awaited_once()
+
+
 @pytest.mark.parametrize(
     "role, expected",
     [
@@ -4,7 +4,7 @@ from app.exceptions import CloudApiException, handle_acapy_call
 from app.models.verifier import AcceptProofRequest, SendProofRequest
 from app.services.acapy_wallet import assert_public_did
 from app.services.trust_registry.actors import fetch_actor_by_did, fetch_actor_by_name
-from app.services.trust_registry.schemas import fetch_schemas
+from app.services.trust_registry.util.schema import registry_has_schemas
 from app.services.verifier.acapy_verifier_v2 import VerifierV2
 from app.util.did import ed25519_verkey_to_did_key
 from app.util.tenants import get_wallet_label_from_controller
@@ -169,13 +169,7 @@ async def are_valid_schemas(schema_ids: list[str]) -> bool:
     if not schema_ids:
         return False
 
-    schemas_from_tr = await fetch_schemas()
-    schemas_ids_from_tr = [schema.id for schema in schemas_from_tr]
-
-    for schema_id in schema_ids:
-        if schema_id not in schemas_ids_from_tr:
-            return False
-    return True
+    return await registry_has_schemas(schema_ids)
 
 
 def is_verifier(actor: Actor) -> bool:
@@ -36,6 +36,14 @@ TRUST_REGISTRY_FASTAPI_ENDPOINT = os.getenv(
 )  # governance-trust-registry
 
 WAYPOINT_URL = os.getenv("WAYPOINT_URL", f"{URL}:3011")
+# Sharded waypoint: each of WAYPOINT_SHARDS replicas serves a slice of the wallets
+WAYPOINT_SHARDS = int(os.getenv("WAYPOINT_SHARDS", "0"))  # 0 disables sharding
+WAYPOINT_SHARD_URL = os.getenv(
+    "WAYPOINT_SHARD_URL", ""
+)  # URL template of a shard, e.g. http://waypoint-{shard}:3010
+WAYPOINT_PARTITION_PREFIX_LENGTH = int(
+    os.getenv("WAYPOINT_PARTITION_PREFIX_LENGTH", "1")
+)  # hex digits of the wallet id in the partition token (16 ** length partitions)
 
 ACAPY_MULTITENANT_JWT_SECRET = os.getenv("ACAPY_MULTITENANT_JWT_SECRET", "jwtSecret")
 
@@ -47,9 +55,6 @@ RESOLVER_URL = os.getenv("RESOLVER_URL", "http://did-resolver:8080/1.0/identifie
 SSE_TIMEOUT = int(
     os.getenv("SSE_TIMEOUT", "30")
 )  # maximum duration of an SSE connection
-DISCONNECT_CHECK_PERIOD = float(
-    os.getenv("DISCONNECT_CHECK_PERIOD", "0.2")
-)  # period in seconds to check for disconnection
 SSE_LOOK_BACK = int(
     os.getenv("SSE_LOOK_BACK", "60")
 )  # number of seconds to look back for events
@@ -68,6 +73,18 @@ NATS_SUBJECT = os.getenv("NATS_SUBJECT", "cloudapi.aries.events")
 NATS_STREAM = os.getenv("NATS_STREAM", "cloudapi_aries_events")
 NATS_STATE_STREAM = os.getenv("NATS_STATE_STREAM", "cloudapi_aries_state_monitoring")
 NATS_STATE_SUBJECT = os.getenv("NATS_STATE_SUBJECT", "cloudapi.aries.state_monitoring")
+NATS_STATE_INDEX_STREAM = os.getenv(
+    "NATS_STATE_INDEX_STREAM", "cloudapi_aries_state_index"
+)
+NATS_STATE_INDEX_SUBJECT = os.getenv(
+    "NATS_STATE_INDEX_SUBJECT", "cloudapi.aries.state_index"
+)
+NATS_STATE_PARTITION_STREAM = os.getenv(
+    "NATS_STATE_PARTITION_STREAM", "cloudapi_aries_state_partition"
+)
+NATS_STATE_PARTITION_SUBJECT = os.getenv(
+    "NATS_STATE_PARTITION_SUBJECT", "cloudapi.aries.state_partition"
+)
 NATS_CREDS_FILE = os.getenv("NATS_CREDS_FILE", "")
 
 # S3
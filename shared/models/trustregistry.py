@@ -99,3 +99,35 @@ class Schema(BaseModel):
         return values
 
     model_config = ConfigDict(validate_assignment=True, from_attributes=True)
+
+
+class RegistryChanges(BaseModel):
+    """Changes to the registry after a version, up to and including `version`.
+
+    Actors and schemas that were inserted or updated are listed with their current
+    values, and those that were deleted by id.
+    """
+
+    version: int
+    actors: list[Actor]
+    deleted_actor_ids: list[str]
+    schemas: list[Schema]
+    deleted_schema_ids: list[str]
+
+
+class BulkConflict(BaseModel):
+    """An item of a bulk request that was not created, by its index in the request."""
+
+    index: int
+    detail: str
+
+
+class BulkActorsResult(BaseModel):
+    created: list[Actor]
+    conflicts: list[BulkConflict]
+
+
+class BulkSchemasResult(BaseModel):
+    created: list[Schema]
+    conflicts: list[BulkConflict]
+    failed: list[BulkConflict] = []  # Schema ids that could not be resolved
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+import pytest
+
+from shared.util.sharding import (
+    jump_consistent_hash,
+    partition_shard,
+    shard_partitions,
+    wallet_partition,
+    wallet_shard,
+    waypoint_url,
+)
+
+wallet_id = "4e0c70fb-f2ad-4f59-81f3-93d8d6b8b0a1"
+
+
+def test_jump_consistent_hash():
+    keys = range(10_000)
+    assignments = {key: jump_consistent_hash(key, 4) for key in keys}
+    assert set(assignments.values()) == {0, 1, 2, 3}
+
+    # Adding a bucket only moves keys to the new bucket
+    for key, bucket in assignments.items():
+        assert jump_consistent_hash(key, 5) in (bucket, 4)
+
+    assert jump_consistent_hash(1234, 1) == 0
+    with pytest.raises(ValueError):
+        jump_consistent_hash(1234, 0)
+
+
+@pytest.mark.parametrize(
+    "wallet,prefix_length,expected",
+    [
+        (wallet_id, 1, "4"),
+        (wallet_id, 2, "4e"),
+        ("admin", 2, "ad"),
+        ("admin", 3, None),
+        ("", 1, None),
+    ],
+)
+def test_wallet_partition(wallet, prefix_length, expected):
+    assert wallet_partition(wallet, prefix_length) == expected
+
+
+@pytest.mark.parametrize("shards", [1, 3, 16])
+def test_shard_partitions_cover_all_partitions_once(shards):
+    owned = [shard_partitions(shard, shards, 2) for shard in range(shards)]
+    all_partitions = [partition for partitions in owned for partition in partitions]
+
+    assert len(all_partitions) == len(set(all_partitions)) == 256
+    for shard, partitions in enumerate(owned):
+        assert all(partition_shard(p, shards) == shard for p in partitions)
+
+
+def test_wallet_shard():
+    assert wallet_shard(wallet_id, 0) is None
+    assert wallet_shard("governance", 4) is None
+    assert wallet_shard(wallet_id, 4) == partition_shard(wallet_partition(wallet_id), 4)
+
+
+@patch("shared.util.sharding.WAYPOINT_URL", "http://waypoint:3010")
+def test_waypoint_url():
+    with patch("shared.util.sharding.WAYPOINT_SHARDS", 0):
+        assert waypoint_url(wallet_id) == "http://waypoint:3010"
+
+    with (
+        patch("shared.util.sharding.WAYPOINT_SHARDS", 4),
+        patch("shared.util.sharding.WAYPOINT_SHARD_URL", "http://waypoint-{shard}"),
+    ):
+        shard = wallet_shard(wallet_id, 4)
+        assert waypoint_url(wallet_id) == f"http://waypoint-{shard}"
+        # Wallets without a partition go to any replica
+        assert waypoint_url("governance") == "http://waypoint:3010"
@@ -0,0 +1,78 @@
+import string
+import zlib
+from itertools import product
+
+from shared.constants import (
+    WAYPOINT_PARTITION_PREFIX_LENGTH,
+    WAYPOINT_SHARD_URL,
+    WAYPOINT_SHARDS,
+    WAYPOINT_URL,
+)
+
+HEX_DIGITS = string.hexdigits[:16]  # Wallet ids are lowercase UUIDs
+
+
+def jump_consistent_hash(key: int, num_buckets: int) -> int:
+    """Map a key to one of `num_buckets` buckets (Lamping & Veach).
+
+    When the number of buckets changes from n to n+1, only 1/(n+1) of the keys
+    move to another bucket.
+    """
+    if num_buckets < 1:
+        raise ValueError("num_buckets must be at least 1")
+
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, next_bucket = -1, 0
+    while next_bucket < num_buckets:
+        bucket = next_bucket
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        next_bucket = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def wallet_partition(
+    wallet_id: str, prefix_length: int = WAYPOINT_PARTITION_PREFIX_LENGTH
+) -> str | None:
+    """Return the partition token of a wallet: the first hex digits of its id.
+
+    Wallets whose id does not start with hex digits (e.g. `admin`) have no
+    partition, and are not sharded.
+    """
+    prefix = wallet_id[:prefix_length]
+    if len(prefix) < prefix_length or not all(c in HEX_DIGITS for c in prefix):
+        return None
+    return prefix
+
+
+def partition_shard(partition: str, shards: int = WAYPOINT_SHARDS) -> int:
+    """Return the shard that owns a partition."""
+    return jump_consistent_hash(zlib.crc32(partition.encode()), shards)
+
+
+def shard_partitions(
+    shard: int,
+    shards: int = WAYPOINT_SHARDS,
+    prefix_length: int = WAYPOINT_PARTITION_PREFIX_LENGTH,
+) -> list[str]:
+    """Return all partition tokens owned by a shard."""
+    return [
+        partition
+        for partition in map("".join, product(HEX_DIGITS, repeat=prefix_length))
+        if partition_shard(partition, shards) == shard
+    ]
+
+
+def wallet_shard(wallet_id: str, shards: int = WAYPOINT_SHARDS) -> int | None:
+    """Return the shard that owns a wallet, or None if it isn't sharded."""
+    if shards < 1:
+        return None
+    partition = wallet_partition(wallet_id)
+    return partition_shard(partition, shards) if partition is not None else None
+
+
+def waypoint_url(wallet_id: str) -> str:
+    """Return the URL of the waypoint replica that serves a wallet."""
+    shard = wallet_shard(wallet_id, WAYPOINT_SHARDS)
+    if shard is None or not WAYPOINT_SHARD_URL:
+        return WAYPOINT_URL
+    return WAYPOINT_SHARD_URL.format(shard=shard)
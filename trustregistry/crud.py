@@ -1,46 +1,114 @@
-from sqlalchemy import ScalarResult, delete, select, update
+import os
+from collections.abc import AsyncGenerator
+from datetime import timedelta
+
+from sqlalchemy import ScalarResult, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.log_config import get_logger
-from shared.models.trustregistry import Actor, Schema
+from shared.models.trustregistry import Actor, RegistryChanges, Schema
 from trustregistry import db
+from trustregistry.snapshot import RegistrySnapshot, registry_cache
 
 logger = get_logger(__name__)
 
+# Rows per query when listing actors and schemas
+PAGE_SIZE = int(os.getenv("TRUST_REGISTRY_PAGE_SIZE", "1000"))
+# Rows per INSERT statement when creating actors or schemas in bulk
+BULK_INSERT_SIZE = int(os.getenv("TRUST_REGISTRY_BULK_INSERT_SIZE", "1000"))
+
 
 async def get_actors(
-    db_session: AsyncSession, skip: int = 0, limit: int = 1000
+    db_session: AsyncSession,
+    *,
+    after: str | None = None,
+    limit: int = PAGE_SIZE,
+    role: str | None = None,
+    did_prefix: str | None = None,
+    snapshot: RegistrySnapshot | None = None,
 ) -> list[db.Actor]:
-    logger.info("Querying all actors from database (limit = {})", limit)
+    """Query a page of actors, ordered by id, starting after the `after` cursor.
 
-    query = select(db.Actor).offset(skip).limit(limit)
-    result = await db_session.scalars(query)
-    actors = result.all()
-
-    if actors:
-        num_rows = len(actors)
-        logger.debug("Successfully retrieved `{}` actors from database.", num_rows)
-        if num_rows == limit:
-            logger.warning(
-                "The number of actors returned is equal to limit used in the query."
-            )
-    else:
-        logger.warning("No actors retrieved from database.")
+    Reads from `snapshot` when given, otherwise from the current snapshot, if any.
+    """
+    bound_logger = logger.bind(
+        body={"after": after, "limit": limit, "role": role, "did_prefix": did_prefix}
+    )
+    bound_logger.info("Querying actors")
 
-    return list(actors)
+    snapshot = snapshot or registry_cache.snapshot
+    if snapshot is not None:
+        actors = snapshot.actors_page(
+            after=after, limit=limit, role=role, did_prefix=did_prefix
+        )
+        bound_logger.debug("Retrieved `{}` actors from snapshot.", len(actors))
+        return actors
+
+    query = select(db.Actor)
+    if after is not None:
+        query = query.where(db.ACTOR_ID_ORDER > after)
+    if role:
+        query = query.where(db.Actor.roles.contains([role]))
+    if did_prefix:
+        query = query.where(db.Actor.did.startswith(did_prefix, autoescape=True))
+    query = query.order_by(db.ACTOR_ID_ORDER).limit(limit)
+
+    result = await db_session.scalars(query)
+    actors = list(result.all())
+
+    bound_logger.debug("Retrieved `{}` actors from database.", len(actors))
+    return actors
+
+
+async def stream_actors(
+    db_session: AsyncSession,
+    *,
+    after: str | None = None,
+    page_size: int = PAGE_SIZE,
+    role: str | None = None,
+    did_prefix: str | None = None,
+    snapshot: RegistrySnapshot | None = None,
+) -> AsyncGenerator[db.Actor, None]:
+    """Yield all matching actors after the `after` cursor, a page at a time.
+
+    All pages are read from the same snapshot: `snapshot` when given, otherwise the
+    current one when the stream starts.
+    """
+    snapshot = snapshot or registry_cache.snapshot
+    while True:
+        actors = await get_actors(
+            db_session,
+            after=after,
+            limit=page_size,
+            role=role,
+            did_prefix=did_prefix,
+            snapshot=snapshot,
+        )
+        # Don't keep the actors of previous pages in the session's identity map
+        db_session.expunge_all()
+        for actor in actors:
+            yield actor
+        if len(actors) < page_size:
+            return
+        after = actors[-1].id
 
 
 async def get_actor_by_did(db_session: AsyncSession, actor_did: str) -> db.Actor:
     bound_logger = logger.bind(body={"actor_did": actor_did})
     bound_logger.info("Querying actor by DID")
 
-    query = select(db.Actor).where(db.Actor.did == actor_did)
-    result = await db_session.scalars(query)
-    actor = result.first()
+    snapshot = registry_cache.snapshot
+    if snapshot is not None:
+        actor = snapshot.actors_by_did.get(actor_did)
+    else:
+        query = select(db.Actor).where(db.Actor.did == actor_did)
+        result = await db_session.scalars(query)
+        actor = result.first()
 
     if actor:
-        bound_logger.debug("Successfully retrieved actor from database.")
+        bound_logger.debug("Successfully retrieved actor.")
     else:
         bound_logger.info("Actor DID not found.")
         raise ActorDoesNotExistError
@@ -52,12 +120,16 @@ async def get_actor_by_id(db_session: AsyncSession, actor_id: str) -> db.Actor:
     bound_logger = logger.bind(body={"actor_id": actor_id})
     bound_logger.info("Querying actor by ID")
 
-    query = select(db.Actor).where(db.Actor.id == actor_id)
-    result = await db_session.scalars(query)
-    actor = result.first()
+    snapshot = registry_cache.snapshot
+    if snapshot is not None:
+        actor = snapshot.actors_by_id.get(actor_id)
+    else:
+        query = select(db.Actor).where(db.Actor.id == actor_id)
+        result = await db_session.scalars(query)
+        actor = result.first()
 
     if actor:
-        bound_logger.debug("Successfully retrieved actor from database.")
+        bound_logger.debug("Successfully retrieved actor.")
     else:
         bound_logger.info("Actor ID not found.")
         raise ActorDoesNotExistError
@@ -69,12 +141,16 @@ async def get_actor_by_name(db_session: AsyncSession, actor_name: str) -> db.Act
     bound_logger = logger.bind(body={"actor_name": actor_name})
     bound_logger.info("Query actor by name")
 
-    query = select(db.Actor).where(db.Actor.name == actor_name)
-    result = await db_session.scalars(query)
-    actor = result.one_or_none()
+    snapshot = registry_cache.snapshot
+    if snapshot is not None:
+        actor = snapshot.actors_by_name.get(actor_name)
+    else:
+        query = select(db.Actor).where(db.Actor.name == actor_name)
+        result = await db_session.scalars(query)
+        actor = result.one_or_none()
 
     if actor:
-        bound_logger.debug("Successfully retrieved actor from database")
+        bound_logger.debug("Successfully retrieved actor")
     else:
         bound_logger.info("Actor name not found")
         raise ActorDoesNotExistError
@@ -82,6 +158,99 @@ async def get_actor_by_name(db_session: AsyncSession, actor_name: str) -> db.Act
     return actor
 
 
+async def create_actors(
+    db_session: AsyncSession, actors: list[Actor]
+) -> tuple[list[db.Actor], dict[int, str]]:
+    """Insert actors in one transaction, skipping those that conflict.
+
+    Returns the created actors, and the conflict message of each skipped actor by
+    its index in `actors`. An actor that conflicts with an earlier one in `actors`
+    is skipped too.
+    """
+    bound_logger = logger.bind(body={"count": len(actors)})
+    bound_logger.info("Try to create actors in database")
+
+    conflicts: dict[int, str] = {}
+    new_actors: dict[int, Actor] = {}  # By index in `actors`
+    seen: dict[str, set[str | None]] = {
+        field: set() for field in ACTOR_UNIQUE_CONSTRAINTS.values()
+    }
+    for index, actor in enumerate(actors):
+        field = _conflicting_field(actor, seen)
+        if field:
+            conflicts[index] = actor_conflict_message(actor, field)
+            continue
+        for field, values in seen.items():
+            values.add(getattr(actor, field))
+        new_actors[index] = actor
+
+    try:
+        created: list[db.Actor] = []
+        rows = [actor.model_dump() for actor in new_actors.values()]
+        for start in range(0, len(rows), BULK_INSERT_SIZE):
+            result = await db_session.scalars(
+                insert(db.Actor)
+                .values(rows[start : start + BULK_INSERT_SIZE])
+                .on_conflict_do_nothing()
+                .returning(db.Actor)
+            )
+            created.extend(result.all())
+
+        created_ids = {db_actor.id for db_actor in created}
+        skipped = {
+            index: actor
+            for index, actor in new_actors.items()
+            if actor.id not in created_ids
+        }
+        if skipped:
+            # Find which unique column each skipped actor conflicts on
+            existing_rows = await db_session.execute(
+                select(
+                    db.Actor.id,
+                    db.Actor.name,
+                    db.Actor.didcomm_invitation,
+                    db.Actor.did,
+                ).where(
+                    or_(
+                        *(
+                            getattr(db.Actor, field).in_(
+                                [getattr(actor, field) for actor in skipped.values()]
+                            )
+                            for field in ACTOR_UNIQUE_CONSTRAINTS.values()
+                        )
+                    )
+                )
+            )
+            existing: dict[str, set[str | None]] = {
+                field: set() for field in ACTOR_UNIQUE_CONSTRAINTS.values()
+            }
+            for row in existing_rows:
+                for field, values in existing.items():
+                    values.add(getattr(row, field))
+            for index, actor in skipped.items():
+                field = _conflicting_field(actor, existing)
+                conflicts[index] = (
+                    actor_conflict_message(actor, field)
+                    if field
+                    else "Bad request: Unique constraint violated"
+                )
+
+        await db_session.commit()
+        await registry_cache.refresh()
+
+    except Exception as e:
+        await db_session.rollback()
+        bound_logger.exception("Something went wrong during bulk actor creation.")
+        raise e
+
+    bound_logger.debug(
+        "Added `{}` actors to database, skipped `{}` conflicting actors.",
+        len(created),
+        len(conflicts),
+    )
+    return created, dict(sorted(conflicts.items()))
+
+
 async def create_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
     bound_logger = logger.bind(body={"actor": actor})
     bound_logger.info("Try to create actor in database")
@@ -91,7 +260,7 @@ async def create_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
         db_actor = db.Actor(**actor.model_dump())
         db_session.add(db_actor)
         await db_session.commit()
-        await db_session.refresh(db_actor)
+        await registry_cache.refresh()
 
         bound_logger.debug("Successfully added actor to database.")
         return db_actor
@@ -100,45 +269,19 @@ async def create_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
         await db_session.rollback()
         constraint_violation = str(e.orig).lower()
 
-        if "actors_pkey" in constraint_violation:
-            bound_logger.info(
-                "Bad request: An actor with ID already exists in database."
-            )
-            raise ActorAlreadyExistsError(
-                f"Bad request: An actor with ID: `{actor.id}` already exists in database."
-            ) from e
-
-        elif "ix_actors_name" in constraint_violation:
-            bound_logger.info(
-                "Bad request: An actor with name already exists in database."
-            )
-            raise ActorAlreadyExistsError(
-                f"Bad request: An actor with name: `{actor.name}` already exists in database."
-            ) from e
-
-        elif "ix_actors_didcomm_invitation" in constraint_violation:
-            bound_logger.info(
-                "Bad request: An actor with DIDComm invitation already exists in database."
-            )
-            raise ActorAlreadyExistsError(
-                "Bad request: An actor with DIDComm invitation already exists in database."
-            ) from e
-
-        elif "ix_actors_did" in constraint_violation:
-            bound_logger.info(
-                "Bad request: An actor with DID already exists in database."
-            )
-            raise ActorAlreadyExistsError(
-                f"Bad request: An actor with DID: `{actor.did}` already exists in database."
-            ) from e
+        for constraint, field in ACTOR_UNIQUE_CONSTRAINTS.items():
+            if constraint in constraint_violation:
+                bound_logger.info(
+                    "Bad request: An actor with {} already exists in database.", field
+                )
+                raise ActorAlreadyExistsError(
+                    actor_conflict_message(actor, field)
+                ) from e
 
-        else:
-            bound_logger.error(
-                "Unexpected constraint violation: {}", constraint_violation
-            )
-            raise ActorAlreadyExistsError(
-                f"Bad request: Unique constraint violated - {constraint_violation}"
-            ) from e
+        bound_logger.error("Unexpected constraint violation: {}", constraint_violation)
+        raise ActorAlreadyExistsError(
+            f"Bad request: Unique constraint violated - {constraint_violation}"
+        ) from e
 
     except Exception as e:
         bound_logger.exception("Something went wrong during actor creation.")
@@ -147,20 +290,18 @@ async def create_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
 
 async def delete_actor(db_session: AsyncSession, actor_id: str) -> db.Actor:
     bound_logger = logger.bind(body={"actor_id": actor_id})
-    bound_logger.info("Delete actor from database. First assert actor ID exists")
+    bound_logger.info("Delete actor from database")
 
-    query = select(db.Actor).where(db.Actor.id == actor_id)
-    result = await db_session.scalars(query)
+    query_delete = delete(db.Actor).where(db.Actor.id == actor_id).returning(db.Actor)
+    result: ScalarResult[db.Actor] = await db_session.scalars(query_delete)
     db_actor = result.one_or_none()
 
     if not db_actor:
         bound_logger.info("Requested actor ID to delete does not exist in database.")
         raise ActorDoesNotExistError
 
-    bound_logger.debug("Deleting actor")
-    query_delete = delete(db.Actor).where(db.Actor.id == actor_id)
-    await db_session.execute(query_delete)
     await db_session.commit()
+    await registry_cache.refresh()
 
     bound_logger.debug("Successfully deleted actor ID.")
     return db_actor
@@ -168,17 +309,8 @@ async def delete_actor(db_session: AsyncSession, actor_id: str) -> db.Actor:
 
 async def update_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
     bound_logger = logger.bind(body={"actor": actor})
-    bound_logger.info("Update actor in database. First assert actor ID exists")
-
-    query = select(db.Actor).where(db.Actor.id == actor.id)
-    result = await db_session.scalars(query)
-    db_actor = result.one_or_none()
+    bound_logger.info("Update actor in database")
 
-    if not db_actor:
-        bound_logger.info("Requested actor ID to update does not exist in database.")
-        raise ActorDoesNotExistError
-
-    bound_logger.debug("Updating actor")
     update_query = (
         update(db.Actor)
         .where(db.Actor.id == actor.id)
@@ -187,56 +319,125 @@ async def update_actor(db_session: AsyncSession, actor: Actor) -> db.Actor:
             roles=actor.roles,
             didcomm_invitation=actor.didcomm_invitation,
             did=actor.did,
-            image_url=actor.image_url if actor.image_url else db_actor.image_url,
+            # Keep the current image URL, if no new one is given
+            image_url=actor.image_url or db.Actor.image_url,
         )
         .returning(db.Actor)
     )
+    result: ScalarResult[db.Actor] = await db_session.scalars(update_query)
+    updated_actor = result.one_or_none()
 
-    update_result: ScalarResult[db.Actor] = await db_session.scalars(update_query)
-    await db_session.commit()
-
-    updated_actor = update_result.first()
-
-    if not updated_actor:  # pragma: no cover - should never happen
-        bound_logger.error("Failed to update actor. Deleted before update complete?")
+    if not updated_actor:
+        bound_logger.info("Requested actor ID to update does not exist in database.")
         raise ActorDoesNotExistError
 
+    await db_session.commit()
+    await registry_cache.refresh()
+
     bound_logger.debug("Successfully updated actor.")
     return updated_actor
 
 
 async def get_schemas(
-    db_session: AsyncSession, skip: int = 0, limit: int = 1000
+    db_session: AsyncSession,
+    *,
+    after: str | None = None,
+    limit: int = PAGE_SIZE,
+    did_prefix: str | None = None,
+    name: str | None = None,
+    version: str | None = None,
+    snapshot: RegistrySnapshot | None = None,
 ) -> list[db.Schema]:
-    logger.info("Querying all schemas from database (limit = {})", limit)
+    """Query a page of schemas, ordered by id, starting after the `after` cursor.
+
+    Reads from `snapshot` when given, otherwise from the current snapshot, if any.
+    """
+    bound_logger = logger.bind(
+        body={
+            "after": after,
+            "limit": limit,
+            "did_prefix": did_prefix,
+            "name": name,
+            "version": version,
+        }
+    )
+    bound_logger.info("Querying schemas")
 
-    query = select(db.Schema).offset(skip).limit(limit)
-    result = await db_session.scalars(query)
-    schemas = result.all()
-
-    if schemas:
-        num_rows = len(schemas)
-        logger.debug("Successfully retrieved `{}` schemas from database.", num_rows)
-        if num_rows == limit:
-            logger.warning(
-                "The number of schemas returned is equal to limit used in the query."
-            )
-    else:
-        logger.warning("No schemas retrieved from database.")
+    snapshot = snapshot or registry_cache.snapshot
+    if snapshot is not None:
+        schemas = snapshot.schemas_page(
+            after=after, limit=limit, did_prefix=did_prefix, name=name, version=version
+        )
+        bound_logger.debug("Retrieved `{}` schemas from snapshot.", len(schemas))
+        return schemas
+
+    query = select(db.Schema)
+    if after is not None:
+        query = query.where(db.SCHEMA_ID_ORDER > after)
+    if did_prefix:
+        query = query.where(db.Schema.did.startswith(did_prefix, autoescape=True))
+    if name:
+        query = query.where(db.Schema.name == name)
+    if version:
+        query = query.where(db.Schema.version == version)
+    query = query.order_by(db.SCHEMA_ID_ORDER).limit(limit)
 
-    return list(schemas)
+    result = await db_session.scalars(query)
+    schemas = list(result.all())
+
+    bound_logger.debug("Retrieved `{}` schemas from database.", len(schemas))
+    return schemas
+
+
+async def stream_schemas(
+    db_session: AsyncSession,
+    *,
+    after: str | None = None,
+    page_size: int = PAGE_SIZE,
+    did_prefix: str | None = None,
+    name: str | None = None,
+    version: str | None = None,
+    snapshot: RegistrySnapshot | None = None,
+) -> AsyncGenerator[db.Schema, None]:
+    """Yield all matching schemas after the `after` cursor, a page at a time.
+
+    All pages are read from the same snapshot: `snapshot` when given, otherwise the
+    current one when the stream starts.
+    """
+    snapshot = snapshot or registry_cache.snapshot
+    while True:
+        schemas = await get_schemas(
+            db_session,
+            after=after,
+            limit=page_size,
+            did_prefix=did_prefix,
+            name=name,
+            version=version,
+            snapshot=snapshot,
+        )
+        # Don't keep the schemas of previous pages in the session's identity map
+        db_session.expunge_all()
+        for schema in schemas:
+            yield schema
+        if len(schemas) < page_size:
+            return
+        after = schemas[-1].id
 
 
 async def get_schema_by_id(db_session: AsyncSession, schema_id: str) -> db.Schema:
     bound_logger = logger.bind(body={"schema_id": schema_id})
     bound_logger.info("Querying schema by ID")
 
-    query = select(db.Schema).where(db.Schema.id == schema_id)
-    result = await db_session.scalars(query)
-    schema = result.first()
+    snapshot = registry_cache.snapshot
+    if snapshot is not None:
+        schema = snapshot.schemas_by_id.get(schema_id)
+    else:
+        query = select(db.Schema).where(db.Schema.id == schema_id)
+        result = await db_session.scalars(query)
+        schema = result.first()
 
     if schema:
-        bound_logger.debug("Successfully retrieved schema from database.")
+        bound_logger.debug("Successfully retrieved schema.")
     else:
         bound_logger.info("Schema ID not found.")
         raise SchemaDoesNotExistError
@@ -244,6 +445,237 @@ async def get_schema_by_id(db_session: AsyncSession, schema_id: str) -> db.Schem
     return schema
 
 
+async def get_existing_schema_ids(
+    db_session: AsyncSession, schema_ids: list[str]
+) -> set[str]:
+    bound_logger = logger.bind(body={"schema_ids": schema_ids})
+    bound_logger.info("Querying which schema IDs exist")
+
+    snapshot = registry_cache.snapshot
+    if snapshot is not None:
+        existing_ids = snapshot.schemas_by_id.keys() & set(schema_ids)
+    else:
+        query = select(db.Schema.id).where(db.Schema.id.in_(schema_ids))
+        result = await db_session.scalars(query)
+        existing_ids = set(result.all())
+
+    bound_logger.debug(
+        "Found `{}` of `{}` schema IDs.", len(existing_ids), len(schema_ids)
+    )
+    return existing_ids
+
+
+async def read_snapshot(db_session: AsyncSession) -> RegistrySnapshot | None:
+    """Return the snapshot to serve a read of several queries from.
+
+    Pass it to every query of the read, so that they see the same registry version.
+    Without snapshot, the session reads from a single database snapshot instead.
+    """
+    snapshot = registry_cache.snapshot
+    if snapshot is None:
+        await db_session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+    return snapshot
+
+
+async def get_registry_version(
+    db_session: AsyncSession, snapshot: RegistrySnapshot | None = None
+) -> int:
+    """Return the registry version, which increases with every change to the registry."""
+    snapshot = snapshot or registry_cache.snapshot
+    if snapshot is not None:
+        return snapshot.version
+
+    version = await db_session.scalar(select(db.RegistryVersion.version))
+    return version or 0
+
+
+async def get_changes(db_session: AsyncSession, since: int) -> RegistryChanges:
+    """Return the actors and schemas that changed after the `since` version.
+
+    Raises `ChangesUnavailableError` when the changes can't be listed, because the
+    version is unknown, the changes since were pruned, or a table was truncated
+    since. The client has to fetch the whole registry instead.
+    """
+    bound_logger = logger.bind(body={"since": since})
+    bound_logger.info("Querying registry changes")
+
+    snapshot = registry_cache.snapshot
+    if snapshot is not None and snapshot.version >= since:
+        version = snapshot.version
+    else:  # The client may have synced with a replica that refreshed before us
+        snapshot = None
+        # Read the version, the changes and the changed rows at the same point in time
+        await db_session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        version = await db_session.scalar(select(db.RegistryVersion.version)) or 0
+
+    if not 0 <= since <= version:
+        bound_logger.info("Version `{}` is unknown, at version `{}`.", since, version)
+        raise ChangesUnavailableError
+
+    # Changes are committed in version order, so all changes up to the version exist
+    result = await db_session.execute(
+        select(db.RegistryChange.table_name, db.RegistryChange.entity_id)
+        .where(db.RegistryChange.version > since)
+        .where(db.RegistryChange.version <= version)
+        .distinct()
+    )
+    changed_ids: dict[str, set[str]] = {"actors": set(), "schemas": set()}
+    for table_name, entity_id in result:
+        if entity_id is None:
+            bound_logger.info("Table `{}` was truncated since.", table_name)
+            raise ChangesUnavailableError
+        changed_ids[table_name].add(entity_id)
+
+    # Read after the changes, so that changes pruned meanwhile are noticed
+    pruned_version = await db_session.scalar(select(db.RegistryVersion.pruned_version))
+    if since < (pruned_version or 0):
+        bound_logger.info("Changes up to `{}` were pruned.", pruned_version)
+        raise ChangesUnavailableError
+
+    if snapshot is not None:
+        actors = [
+            snapshot.actors_by_id[actor_id]
+            for actor_id in changed_ids["actors"]
+            if actor_id in snapshot.actors_by_id
+        ]
+        schemas = [
+            snapshot.schemas_by_id[schema_id]
+            for schema_id in changed_ids["schemas"]
+            if schema_id in snapshot.schemas_by_id
+        ]
+    else:
+        actors, schemas = [], []
+        if changed_ids["actors"]:
+            actors = list(
+                await db_session.scalars(
+                    select(db.Actor).where(db.Actor.id.in_(changed_ids["actors"]))
+                )
+            )
+        if changed_ids["schemas"]:
+            schemas = list(
+                await db_session.scalars(
+                    select(db.Schema).where(db.Schema.id.in_(changed_ids["schemas"]))
+                )
+            )
+
+    changes = RegistryChanges(
+        version=version,
+        actors=[
+            Actor.model_validate(actor)
+            for actor in sorted(actors, key=lambda actor: actor.id)
+        ],
+        deleted_actor_ids=sorted(
+            changed_ids["actors"] - {actor.id for actor in actors}
+        ),
+        schemas=[
+            Schema.model_validate(schema)
+            for schema in sorted(schemas, key=lambda schema: schema.id)
+        ],
+        deleted_schema_ids=sorted(
+            changed_ids["schemas"] - {schema.id for schema in schemas}
+        ),
+    )
+    bound_logger.debug(
+        "Retrieved `{}` actor and `{}` schema changes up to version `{}`.",
+        len(changed_ids["actors"]),
+        len(changed_ids["schemas"]),
+        version,
+    )
+    return changes
+
+
+async def prune_changes(db_session: AsyncSession, retention: timedelta) -> int:
+    """Delete the registry changes recorded longer than `retention` ago.
+
+    Changes are pruned up to a version, which is stored as `pruned_version`: changes
+    since an older version are no longer available. Returns the number of deleted
+    changes.
+    """
+    bound_logger = logger.bind(body={"retention": retention})
+    bound_logger.debug("Pruning registry changes")
+
+    pruned_version = await db_session.scalar(
+        select(func.max(db.RegistryChange.version)).where(
+            db.RegistryChange.created_at < func.now() - retention
+        )
+    )
+    if pruned_version is None:
+        return 0
+
+    result = await db_session.execute(
+        delete(db.RegistryChange).where(db.RegistryChange.version <= pruned_version)
+    )
+    deleted: int = result.rowcount  # type: ignore[attr-defined]
+    # Last, so that writers (which bump the version) wait for the row lock briefly
+    await db_session.execute(
+        update(db.RegistryVersion).values(
+            pruned_version=func.greatest(
+                db.RegistryVersion.pruned_version, pruned_version
+            )
+        )
+    )
+    await db_session.commit()
+
+    bound_logger.info(
+        "Pruned `{}` registry changes up to version `{}`.",
+        deleted,
+        pruned_version,
+    )
+    return deleted
+
+
+async def create_schemas(
+    db_session: AsyncSession, schemas: list[Schema]
+) -> tuple[list[db.Schema], dict[int, str]]:
+    """Insert schemas in one transaction, skipping those that already exist.
+
+    Returns the created schemas, and the conflict message of each skipped schema by
+    its index in `schemas`.
+    """
+    bound_logger = logger.bind(body={"count": len(schemas)})
+    bound_logger.info("Try to create schemas in database")
+
+    try:
+        created: list[db.Schema] = []
+        rows = [schema.model_dump() for schema in schemas]
+        for start in range(0, len(rows), BULK_INSERT_SIZE):
+            result = await db_session.scalars(
+                insert(db.Schema)
+                .values(rows[start : start + BULK_INSERT_SIZE])
+                .on_conflict_do_nothing()
+                .returning(db.Schema)
+            )
+            created.extend(result.all())
+
+        await db_session.commit()
+        await registry_cache.refresh()
+
+    except Exception as e:
+        await db_session.rollback()
+        bound_logger.exception("Something went wrong during bulk schema creation.")
+        raise e
+
+    # Duplicates within `schemas` are inserted once, for their first occurrence
+    created_ids = {db_schema.id for db_schema in created}
+    conflicts: dict[int, str] = {}
+    for index, schema in enumerate(schemas):
+        if schema.id in created_ids:
+            created_ids.remove(schema.id)
+        else:
+            conflicts[index] = "Schema already exists."
+
+    bound_logger.debug(
+        "Added `{}` schemas to database, skipped `{}` existing schemas.",
+        len(created),
+        len(conflicts),
+    )
+    return created, conflicts
+
+
 async def create_schema(db_session: AsyncSession, schema: Schema) -> db.Schema:
     bound_logger = logger.bind(body={"schema": schema})
     bound_logger.info("Try to create schema in database")
@@ -253,7 +685,7 @@ async def create_schema(db_session: AsyncSession, schema: Schema) -> db.Schema:
         db_schema = db.Schema(**schema.model_dump())
         db_session.add(db_schema)
         await db_session.commit()
-        await db_session.refresh(db_schema)
+        await registry_cache.refresh()
 
         bound_logger.debug("Successfully added schema to database.")
         return db_schema
@@ -274,17 +706,8 @@ async def update_schema(
     db_session: AsyncSession, schema: Schema, schema_id: str
 ) -> db.Schema:
     bound_logger = logger.bind(body={"schema": schema, "schema_id": schema_id})
-    bound_logger.info("Update schema in database. First assert schema ID exists")
+    bound_logger.info("Update schema in database")
 
-    query = select(db.Schema).where(db.Schema.id == schema_id)
-    result = await db_session.scalars(query)
-    db_schema = result.one_or_none()
-
-    if not db_schema:
-        bound_logger.info("Requested schema ID to update does not exist in database.")
-        raise SchemaDoesNotExistError
-
-    bound_logger.debug("Updating schema")
     update_query = (
         update(db.Schema)
         .where(db.Schema.id == schema_id)
@@ -295,41 +718,76 @@ async def update_schema(
         )
         .returning(db.Schema)
     )
+    result: ScalarResult[db.Schema] = await db_session.scalars(update_query)
+    updated_schema = result.one_or_none()
 
-    update_result: ScalarResult[db.Schema] = await db_session.scalars(update_query)
-    await db_session.commit()
-
-    updated_schema = update_result.first()
-
-    if not updated_schema:  # pragma: no cover - should never happen
-        bound_logger.error("Failed to update schema. Deleted before update complete?")
+    if not updated_schema:
+        bound_logger.info("Requested schema ID to update does not exist in database.")
         raise SchemaDoesNotExistError
 
+    await db_session.commit()
+    await registry_cache.refresh()
+
     bound_logger.debug("Successfully updated schema.")
     return updated_schema
 
 
 async def delete_schema(db_session: AsyncSession, schema_id: str) -> db.Schema:
     bound_logger = logger.bind(body={"schema_id": schema_id})
-    bound_logger.info("Delete schema from database. First assert schema ID exists")
+    bound_logger.info("Delete schema from database")
 
-    query = select(db.Schema).where(db.Schema.id == schema_id)
-    result = await db_session.scalars(query)
+    query_delete = (
+        delete(db.Schema).where(db.Schema.id == schema_id).returning(db.Schema)
+    )
+    result: ScalarResult[db.Schema] = await db_session.scalars(query_delete)
     db_schema = result.one_or_none()
 
     if not db_schema:
         bound_logger.info("Requested schema ID to delete does not exist in database.")
         raise SchemaDoesNotExistError
 
-    bound_logger.debug("Deleting schema")
-    query_delete = delete(db.Schema).where(db.Schema.id == schema_id)
-    await db_session.execute(query_delete)
     await db_session.commit()
+    await registry_cache.refresh()
 
     bound_logger.debug("Successfully deleted schema ID.")
     return db_schema
 
 
+# Unique constraints of actors, and their column. The DIDComm invitation index is
+# checked before the DID index, because the name of the latter is a prefix of it.
+ACTOR_UNIQUE_CONSTRAINTS = {
+    "actors_pkey": "id",
+    "ix_actors_name": "name",
+    "ix_actors_didcomm_invitation": "didcomm_invitation",
+    "ix_actors_did": "did",
+}
+
+
+def actor_conflict_message(actor: Actor, field: str) -> str:
+    if field == "id":
+        return (
+            f"Bad request: An actor with ID: `{actor.id}` already exists in database."
+        )
+    if field == "name":
+        return f"Bad request: An actor with name: `{actor.name}` already exists in database."
+    if field == "didcomm_invitation":
+        return (
+            "Bad request: An actor with DIDComm invitation already exists in database."
+        )
+    return f"Bad request: An actor with DID: `{actor.did}` already exists in database."
+
+
+def _conflicting_field(
+    actor: Actor, existing: dict[str, set[str | None]]
+) -> str | None:
+    """Return the first unique column of the actor with a value in `existing`."""
+    for field, values in existing.items():
+        value = getattr(actor, field)
+        if value is not None and value in values:
+            return field
+    return None
+
+
 # Exception classes
 class ActorAlreadyExistsError(Exception):
     """Raised when attempting to create an actor that already exists in the database."""
@@ -345,3 +803,7 @@ class SchemaAlreadyExistsError(Exception):
 
 class SchemaDoesNotExistError(Exception):
     """Raised when attempting to delete or update a schema that does not exist in the database."""
+
+
+class ChangesUnavailableError(Exception):
+    """Raised when the registry changes since a version can't be listed."""
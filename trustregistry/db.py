@@ -1,11 +1,12 @@
 from collections.abc import AsyncGenerator, Generator
+from datetime import datetime
 
-from sqlalchemy import String
+from sqlalchemy import BigInteger, DateTime, Identity, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from trustregistry.database import AsyncSessionLocal, Base, SessionLocal
-from trustregistry.list_type import StringList
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -39,10 +40,14 @@ def schema_id_gen(context) -> str:  # noqa: ANN001
 
 class Actor(Base):
     __tablename__ = "actors"
+    __table_args__ = (
+        # GIN index, for role containment queries (`roles @> ARRAY['issuer']`)
+        Index("ix_actors_roles", "roles", postgresql_using="gin"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True, unique=True)
     name: Mapped[str] = mapped_column(String, unique=True, index=True)
-    roles: Mapped[str] = mapped_column(StringList, index=True)
+    roles: Mapped[list[str]] = mapped_column(ARRAY(String))
     didcomm_invitation: Mapped[str | None] = mapped_column(
         String, unique=True, index=True
     )
@@ -64,3 +69,53 @@ class Schema(Base):
     did: Mapped[str] = mapped_column(String, index=True)
     name: Mapped[str] = mapped_column(String, index=True)
     version: Mapped[str] = mapped_column(String, index=True)
+
+
+# Ids are ordered bytewise ("C" collation), whatever the database collation, so
+# pages read from the database and from the in-memory snapshot are in the same order
+ACTOR_ID_ORDER = Actor.id.collate("C")
+SCHEMA_ID_ORDER = Schema.id.collate("C")
+Index("ix_actors_id_c", ACTOR_ID_ORDER)
+Index("ix_schemas_id_c", SCHEMA_ID_ORDER)
+
+
+class RegistryVersion(Base):
+    """Single row with the version of the registry.
+
+    Database triggers increment the version for every statement that changes actor
+    or schema rows, record the changed rows in `RegistryChange`, and notify the
+    `REGISTRY_CHANNEL` of the new version. Changes up to `pruned_version` were
+    deleted after their retention period.
+    """
+
+    __tablename__ = "registry_version"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False, default=1
+    )
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    pruned_version: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
+
+
+class RegistryChange(Base):
+    """An actor or schema that was inserted, updated or deleted at a version.
+
+    Written by database triggers. The `entity_id` is None when the whole table was
+    truncated.
+    """
+
+    __tablename__ = "registry_changes"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, index=True)
+    table_name: Mapped[str] = mapped_column(String)
+    entity_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+
+
+# Postgres NOTIFY channel of registry changes
+REGISTRY_CHANNEL = "trust_registry_changes"
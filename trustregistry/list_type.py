@@ -2,6 +2,7 @@ from sqlalchemy import TypeDecorator
 from sqlalchemy.sql.sqltypes import String
 
 
+# Former type of `actors.roles`, now a native array. Kept for the initial migration
 class StringList(TypeDecorator):  # pylint: disable=W0223
     impl = String
 
@@ -1,13 +1,15 @@
+import asyncio
 import os
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+import orjson
 from alembic import command
 from alembic.config import Config
 from alembic.migration import MigrationContext
 from alembic.script import ScriptDirectory
-from fastapi import Depends, FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
 from scalar_fastapi import get_scalar_api_reference
 from sqlalchemy import inspect
 from sqlalchemy.engine import Engine
@@ -15,11 +17,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.constants import PROJECT_VERSION
 from shared.log_config import get_logger
+from shared.models.trustregistry import Actor, RegistryChanges
 from shared.util.set_event_loop_policy import set_event_loop_policy
 from trustregistry import crud
 from trustregistry.database import async_engine, engine
 from trustregistry.db import get_async_db
 from trustregistry.registry import registry_actors, registry_schemas
+from trustregistry.registry.conditional import (
+    is_not_modified,
+    not_modified,
+    registry_etag,
+)
+from trustregistry.registry.pagination import json_array
+from trustregistry.retention import prune_changes_periodically
+from trustregistry.snapshot import (
+    TRUST_REGISTRY_SNAPSHOT,
+    RegistrySnapshot,
+    registry_cache,
+)
 
 set_event_loop_policy()
 
@@ -89,9 +104,16 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
         inspector = inspect(connection)
         table_names = inspector.get_table_names()
         logger.debug("TrustRegistry tables created: `{}`", table_names)
+
+    if TRUST_REGISTRY_SNAPSHOT:
+        await registry_cache.start()
+    prune_task = asyncio.create_task(prune_changes_periodically())
     # start-up logic is before the yield
     yield
     # shutdown logic after - properly close async engine
+    prune_task.cancel()
+    await asyncio.gather(prune_task, return_exceptions=True)
+    await registry_cache.stop()
     await async_engine.dispose()
     logger.info("Database connections closed")
 
@@ -123,16 +145,74 @@ async def scalar_html() -> HTMLResponse:
     )
 
 
+async def registry_json(
+    db_session: AsyncSession, snapshot: RegistrySnapshot | None
+) -> AsyncGenerator[bytes, None]:
+    """Encode all actors and schema ids as JSON, a page of rows at a time."""
+    yield b'{"actors":'
+    async for chunk in json_array(
+        crud.stream_actors(db_session, snapshot=snapshot), Actor
+    ):
+        yield chunk
+    yield b',"schemas":['
+    separator = b""
+    async for schema in crud.stream_schemas(db_session, snapshot=snapshot):
+        yield separator + orjson.dumps(schema.id)
+        separator = b","
+    yield b"]}"
+
+
 @app.get("/")
-async def root(db_session: AsyncSession = Depends(get_async_db)):  # noqa: ANN201
+async def root(
+    request: Request, db_session: AsyncSession = Depends(get_async_db)
+) -> Response:
     logger.debug("GET request received: Fetch actors and schemas from registry")
-    db_schemas = await crud.get_schemas(db_session)
-    db_actors = await crud.get_actors(db_session)
-    schemas_repr = [schema.id for schema in db_schemas]
-    logger.debug("Successfully fetched actors and schemas from registry.")
-    return {"actors": db_actors, "schemas": schemas_repr}
+    snapshot = await crud.read_snapshot(db_session)
+    etag = registry_etag(await crud.get_registry_version(db_session, snapshot))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    return StreamingResponse(
+        registry_json(db_session, snapshot),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+@app.get("/registry/version")
+async def registry_version(
+    db_session: AsyncSession = Depends(get_async_db),
+) -> dict[str, int]:
+    """Return the registry version, which increases with every change to the registry."""
+    return {"version": await crud.get_registry_version(db_session)}
+
+
+@app.get("/registry/changes")
+async def registry_changes(
+    since: int = Query(
+        ..., ge=0, description="Registry version the client is synced up to"
+    ),
+    db_session: AsyncSession = Depends(get_async_db),
+) -> RegistryChanges:
+    """Return the actors and schemas that changed since a registry version.
+
+    Apply the changes to a local copy of the registry, and pass the returned version
+    as `since` on the next call. When the changes are not available (410), fetch the
+    whole registry again.
+    """
+    logger.debug("GET request received: Fetch registry changes since {}", since)
+    try:
+        return await crud.get_changes(db_session, since)
+    except crud.ChangesUnavailableError as e:
+        raise HTTPException(
+            status_code=410,
+            detail=f"Changes since version {since} are not available.",
+        ) from e
 
 
 @app.get("/registry")
-async def registry(db_session: AsyncSession = Depends(get_async_db)):  # noqa: ANN201
-    return await root(db_session)
+async def registry(
+    request: Request,
+    db_session: AsyncSession = Depends(get_async_db),
+) -> Response:
+    return await root(request, db_session)
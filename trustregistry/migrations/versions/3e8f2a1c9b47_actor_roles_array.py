@@ -0,0 +1,51 @@
+"""Actor roles as array
+
+Revision ID: 3e8f2a1c9b47
+Revises: 5bcfb2c0bc05
+Create Date: 2026-10-17 10:12:41.504216
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8f2a1c9b47"
+down_revision: str | None = "5bcfb2c0bc05"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.drop_index(op.f("ix_actors_roles"), table_name="actors")
+    op.alter_column(
+        "actors",
+        "roles",
+        existing_type=sa.String(),
+        type_=postgresql.ARRAY(sa.String()),
+        existing_nullable=False,
+        postgresql_using="regexp_split_to_array(roles, '\\s*,\\s*')",
+    )
+    op.create_index(
+        op.f("ix_actors_roles"),
+        "actors",
+        ["roles"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_actors_roles"), table_name="actors")
+    op.alter_column(
+        "actors",
+        "roles",
+        existing_type=postgresql.ARRAY(sa.String()),
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using="array_to_string(roles, ',')",
+    )
+    op.create_index(op.f("ix_actors_roles"), "actors", ["roles"], unique=False)
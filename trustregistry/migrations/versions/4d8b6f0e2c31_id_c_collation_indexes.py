@@ -0,0 +1,29 @@
+"""Id indexes in C collation
+
+Revision ID: 4d8b6f0e2c31
+Revises: b71e3c0f4d92
+Create Date: 2026-10-17 16:48:09.226513
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4d8b6f0e2c31"
+down_revision: str | None = "b71e3c0f4d92"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Pages are ordered by id in "C" collation, which the primary keys can't serve
+    op.create_index("ix_actors_id_c", "actors", [sa.text('id COLLATE "C"')])
+    op.create_index("ix_schemas_id_c", "schemas", [sa.text('id COLLATE "C"')])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_schemas_id_c", table_name="schemas")
+    op.drop_index("ix_actors_id_c", table_name="actors")
@@ -0,0 +1,59 @@
+"""Registry version
+
+Revision ID: 9c4d7e2b5a18
+Revises: 3e8f2a1c9b47
+Create Date: 2026-10-17 11:02:17.831964
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4d7e2b5a18"
+down_revision: str | None = "3e8f2a1c9b47"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "registry_version",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO registry_version (id, version) VALUES (1, 0)")
+
+    # Bump the version on every write, and notify listeners once committed
+    op.execute(
+        """
+        CREATE FUNCTION bump_registry_version() RETURNS trigger AS $$
+        DECLARE
+            new_version bigint;
+        BEGIN
+            UPDATE registry_version SET version = version + 1 WHERE id = 1
+            RETURNING version INTO new_version;
+            PERFORM pg_notify('trust_registry_changes', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ("actors", "schemas"):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_bump_registry_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_registry_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in ("actors", "schemas"):
+        op.execute(f"DROP TRIGGER {table}_bump_registry_version ON {table}")
+    op.execute("DROP FUNCTION bump_registry_version()")
+    op.drop_table("registry_version")
@@ -0,0 +1,111 @@
+"""Registry changes
+
+Revision ID: b71e3c0f4d92
+Revises: 9c4d7e2b5a18
+Create Date: 2026-10-17 14:36:52.417208
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71e3c0f4d92"
+down_revision: str | None = "9c4d7e2b5a18"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("actors", "schemas")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "registry_changes",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_registry_changes_version"), "registry_changes", ["version"]
+    )
+
+    # Bump the version for every changed row, so each change can be recorded with
+    # its own version. A TRUNCATE is recorded without entity id.
+    op.execute(
+        """
+        CREATE FUNCTION record_registry_change() RETURNS trigger AS $$
+        DECLARE
+            new_version bigint;
+        BEGIN
+            UPDATE registry_version SET version = version + 1 WHERE id = 1
+            RETURNING version INTO new_version;
+            IF TG_LEVEL = 'STATEMENT' THEN
+                INSERT INTO registry_changes (version, table_name, entity_id)
+                VALUES (new_version, TG_TABLE_NAME, NULL);
+            ELSE
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    INSERT INTO registry_changes (version, table_name, entity_id)
+                    VALUES (new_version, TG_TABLE_NAME, OLD.id);
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.id <> OLD.id) THEN
+                    INSERT INTO registry_changes (version, table_name, entity_id)
+                    VALUES (new_version, TG_TABLE_NAME, NEW.id);
+                END IF;
+            END IF;
+            PERFORM pg_notify('trust_registry_changes', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_bump_registry_version ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_registry_change()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION record_registry_change()
+            """
+        )
+    op.execute("DROP FUNCTION bump_registry_version()")
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE FUNCTION bump_registry_version() RETURNS trigger AS $$
+        DECLARE
+            new_version bigint;
+        BEGIN
+            UPDATE registry_version SET version = version + 1 WHERE id = 1
+            RETURNING version INTO new_version;
+            PERFORM pg_notify('trust_registry_changes', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_record_registry_truncate ON {table}")
+        op.execute(f"DROP TRIGGER {table}_record_registry_change ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_bump_registry_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_registry_version()
+            """
+        )
+    op.execute("DROP FUNCTION record_registry_change()")
+    op.drop_index(op.f("ix_registry_changes_version"), table_name="registry_changes")
+    op.drop_table("registry_changes")
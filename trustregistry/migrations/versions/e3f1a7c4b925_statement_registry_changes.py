@@ -0,0 +1,157 @@
+"""Record registry changes per statement
+
+Revision ID: e3f1a7c4b925
+Revises: 4d8b6f0e2c31
+Create Date: 2026-10-17 17:21:44.613078
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f1a7c4b925"
+down_revision: str | None = "4d8b6f0e2c31"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("actors", "schemas")
+
+
+def upgrade() -> None:
+    op.add_column(
+        "registry_changes",
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_registry_changes_created_at"), "registry_changes", ["created_at"]
+    )
+    op.add_column(
+        "registry_version",
+        sa.Column(
+            "pruned_version", sa.BigInteger(), server_default="0", nullable=False
+        ),
+    )
+    # Changes made before they were recorded are not available either
+    op.execute(
+        """
+        UPDATE registry_version
+        SET pruned_version = COALESCE(
+            (SELECT MIN(version) - 1 FROM registry_changes), version
+        )
+        """
+    )
+
+    # Bump the version once per statement, and record all its changed rows at that
+    # version. A TRUNCATE is recorded without entity id. Statements that changed no
+    # rows are not recorded.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_registry_change() RETURNS trigger AS $$
+        DECLARE
+            new_version bigint;
+            changed_ids varchar[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(id) INTO changed_ids FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(id) INTO changed_ids FROM old_rows;
+            ELSIF TG_OP = 'UPDATE' THEN
+                SELECT array_agg(id) INTO changed_ids
+                FROM (SELECT id FROM old_rows UNION SELECT id FROM new_rows) AS ids;
+            ELSE
+                changed_ids := ARRAY[NULL];
+            END IF;
+            IF changed_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            UPDATE registry_version SET version = version + 1 WHERE id = 1
+            RETURNING version INTO new_version;
+            INSERT INTO registry_changes (version, table_name, entity_id)
+            SELECT new_version, TG_TABLE_NAME, entity_id
+            FROM unnest(changed_ids) AS entity_id;
+            PERFORM pg_notify('trust_registry_changes', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_record_registry_change ON {table}")
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_registry_change()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_update
+            AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_registry_change()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION record_registry_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_record_registry_delete ON {table}")
+        op.execute(f"DROP TRIGGER {table}_record_registry_update ON {table}")
+        op.execute(f"DROP TRIGGER {table}_record_registry_insert ON {table}")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION record_registry_change() RETURNS trigger AS $$
+        DECLARE
+            new_version bigint;
+        BEGIN
+            UPDATE registry_version SET version = version + 1 WHERE id = 1
+            RETURNING version INTO new_version;
+            IF TG_LEVEL = 'STATEMENT' THEN
+                INSERT INTO registry_changes (version, table_name, entity_id)
+                VALUES (new_version, TG_TABLE_NAME, NULL);
+            ELSE
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    INSERT INTO registry_changes (version, table_name, entity_id)
+                    VALUES (new_version, TG_TABLE_NAME, OLD.id);
+                END IF;
+                IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.id <> OLD.id) THEN
+                    INSERT INTO registry_changes (version, table_name, entity_id)
+                    VALUES (new_version, TG_TABLE_NAME, NEW.id);
+                END IF;
+            END IF;
+            PERFORM pg_notify('trust_registry_changes', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_record_registry_change
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_registry_change()
+            """
+        )
+    op.drop_column("registry_version", "pruned_version")
+    op.drop_index(op.f("ix_registry_changes_created_at"), table_name="registry_changes")
+    op.drop_column("registry_changes", "created_at")
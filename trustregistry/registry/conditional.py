@@ -0,0 +1,24 @@
+from fastapi import Request, Response
+
+
+def registry_etag(version: int) -> str:
+    """Strong ETag of a registry response, which changes with the registry version.
+
+    The version must be read before the response content, so the content is never
+    older than its ETag.
+    """
+    return f'"{version}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Whether the `If-None-Match` header of the request matches the ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison
+    etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in etags or etag in etags
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,43 @@
+import os
+from collections.abc import AsyncGenerator, AsyncIterable, Sequence
+from typing import Protocol
+
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+# Response header with the cursor of the next page, when there is one
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+# Items per bulk registration request
+MAX_BULK_SIZE = int(os.getenv("TRUST_REGISTRY_MAX_BULK_SIZE", "1000"))
+
+
+class Row(Protocol):
+    id: str
+
+
+async def json_array(
+    rows: AsyncIterable[Row], model: type[BaseModel]
+) -> AsyncGenerator[bytes, None]:
+    """Encode database rows as a JSON array of `model`, one row at a time."""
+    separator = b"["
+    async for row in rows:
+        yield separator + model.model_validate(row).model_dump_json().encode()
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def stream_json_array(
+    rows: AsyncIterable[Row], model: type[BaseModel]
+) -> StreamingResponse:
+    """Stream all rows, so memory use doesn't grow with the size of the registry."""
+    return StreamingResponse(json_array(rows, model), media_type="application/json")
+
+
+def json_page(rows: Sequence[Row], model: type[BaseModel], limit: int) -> JSONResponse:
+    """Return a page of rows, with the cursor of the next page if it may exist."""
+    headers = {NEXT_CURSOR_HEADER: rows[-1].id} if len(rows) == limit else None
+    return JSONResponse(
+        [model.model_validate(row).model_dump(mode="json") for row in rows],
+        headers=headers,
+    )
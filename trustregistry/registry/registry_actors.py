@@ -1,25 +1,86 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.log_config import get_logger
-from shared.models.trustregistry import Actor
+from shared.models.trustregistry import (
+    Actor,
+    BulkActorsResult,
+    BulkConflict,
+    TrustRegistryRole,
+)
 from trustregistry import crud
 from trustregistry.db import get_async_db
+from trustregistry.registry.conditional import (
+    is_not_modified,
+    not_modified,
+    registry_etag,
+)
+from trustregistry.registry.pagination import (
+    MAX_BULK_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    json_page,
+    stream_json_array,
+)
 
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/registry/actors", tags=["actor"])
 
 
-@router.get("")
-async def get_actors(db_session: AsyncSession = Depends(get_async_db)) -> list[Actor]:
-    logger.debug("GET request received: Fetch all actors")
-    db_actors = await crud.get_actors(db_session)
-
-    # Convert database models to pydantic models
-    result = [Actor(**actor.__dict__) for actor in db_actors]
-    return result
+@router.get("", response_model=list[Actor])
+async def get_actors(
+    request: Request,
+    role: TrustRegistryRole | None = Query(None),
+    did_prefix: str | None = Query(None),
+    after: str | None = Query(
+        None, description="Only return actors with an id after this cursor"
+    ),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Return a page of at most `limit` actors, with the cursor of the "
+        f"next page in the `{NEXT_CURSOR_HEADER}` header. All actors are returned "
+        "when omitted",
+    ),
+    db_session: AsyncSession = Depends(get_async_db),
+) -> Response:
+    bound_logger = logger.bind(
+        body={"role": role, "did_prefix": did_prefix, "after": after, "limit": limit}
+    )
+    bound_logger.debug("GET request received: Fetch actors")
+    snapshot = await crud.read_snapshot(db_session)
+    etag = registry_etag(await crud.get_registry_version(db_session, snapshot))
+    if is_not_modified(request, etag):
+        bound_logger.debug("Actors not modified")
+        return not_modified(etag)
+
+    response: Response
+    if limit is None:
+        response = stream_json_array(
+            crud.stream_actors(
+                db_session,
+                after=after,
+                role=role,
+                did_prefix=did_prefix,
+                snapshot=snapshot,
+            ),
+            Actor,
+        )
+    else:
+        db_actors = await crud.get_actors(
+            db_session,
+            after=after,
+            limit=limit,
+            role=role,
+            did_prefix=did_prefix,
+            snapshot=snapshot,
+        )
+        response = json_page(db_actors, Actor, limit)
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.post("")
@@ -40,6 +101,40 @@ async def register_actor(
     return created_actor
 
 
+@router.post("/bulk")
+async def register_actors(
+    actors: list[Actor], db_session: AsyncSession = Depends(get_async_db)
+) -> BulkActorsResult:
+    """Register actors in a single transaction.
+
+    Actors that conflict with an existing actor, or with an earlier actor in the
+    request, are reported as conflicts by their index in the request. At most
+    `TRUST_REGISTRY_MAX_BULK_SIZE` actors can be registered per request.
+    """
+    bound_logger = logger.bind(body={"count": len(actors)})
+    bound_logger.debug("POST request received: Register actors")
+    if len(actors) > MAX_BULK_SIZE:
+        bound_logger.info("Bad request: Too many actors.")
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_SIZE} actors can be registered at once.",
+        )
+
+    try:
+        created, conflicts = await crud.create_actors(db_session, actors=actors)
+    except Exception as e:
+        bound_logger.error("Something went wrong during bulk actor creation.")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    return BulkActorsResult(
+        created=[Actor.model_validate(actor) for actor in created],
+        conflicts=[
+            BulkConflict(index=index, detail=detail)
+            for index, detail in conflicts.items()
+        ],
+    )
+
+
 @router.put("/{actor_id}")
 async def update_actor(
     actor_id: str, actor: Actor, db_session: AsyncSession = Depends(get_async_db)
@@ -1,16 +1,36 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.params import Depends
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from shared.log_config import get_logger
-from shared.models.trustregistry import Schema
+from shared.models.trustregistry import BulkConflict, BulkSchemasResult, Schema
 from shared.util.resolve_cheqd_resources import resolve_cheqd_schema
 from trustregistry import crud
 from trustregistry.db import get_async_db
+from trustregistry.registry.conditional import (
+    is_not_modified,
+    not_modified,
+    registry_etag,
+)
+from trustregistry.registry.pagination import (
+    MAX_BULK_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    json_page,
+    stream_json_array,
+)
 
 logger = get_logger(__name__)
 
+# Concurrent did:cheqd schema resolutions per bulk registration request
+CHEQD_RESOLVE_CONCURRENCY = int(
+    os.getenv("TRUST_REGISTRY_CHEQD_RESOLVE_CONCURRENCY", "10")
+)
+
 router = APIRouter(prefix="/registry/schemas", tags=["schema"])
 
 
@@ -18,16 +38,73 @@ class SchemaID(BaseModel):
     schema_id: str = Field(..., examples=["WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0"])
 
 
-@router.get("")
+class SchemaIDs(BaseModel):
+    schema_ids: list[str] = Field(
+        ..., examples=[["WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0"]]
+    )
+
+
+@router.get("", response_model=list[Schema])
 async def get_schemas(
+    request: Request,
+    did_prefix: str | None = Query(None),
+    name: str | None = Query(None),
+    version: str | None = Query(None),
+    after: str | None = Query(
+        None, description="Only return schemas with an id after this cursor"
+    ),
+    limit: int | None = Query(
+        None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Return a page of at most `limit` schemas, with the cursor of the "
+        f"next page in the `{NEXT_CURSOR_HEADER}` header. All schemas are returned "
+        "when omitted",
+    ),
     db_session: AsyncSession = Depends(get_async_db),  # type: ignore
-) -> list[Schema]:
-    logger.debug("GET request received: Fetch all schemas")
-    db_schemas = await crud.get_schemas(db_session)
+) -> Response:
+    bound_logger = logger.bind(
+        body={
+            "did_prefix": did_prefix,
+            "name": name,
+            "version": version,
+            "after": after,
+            "limit": limit,
+        }
+    )
+    bound_logger.debug("GET request received: Fetch schemas")
+    snapshot = await crud.read_snapshot(db_session)
+    etag = registry_etag(await crud.get_registry_version(db_session, snapshot))
+    if is_not_modified(request, etag):
+        bound_logger.debug("Schemas not modified")
+        return not_modified(etag)
 
-    # Convert database models to pydantic models
-    result = [Schema(**schema.__dict__) for schema in db_schemas]
-    return result
+    response: Response
+    if limit is None:
+        response = stream_json_array(
+            crud.stream_schemas(
+                db_session,
+                after=after,
+                did_prefix=did_prefix,
+                name=name,
+                version=version,
+                snapshot=snapshot,
+            ),
+            Schema,
+        )
+    else:
+        db_schemas = await crud.get_schemas(
+            db_session,
+            after=after,
+            limit=limit,
+            did_prefix=did_prefix,
+            name=name,
+            version=version,
+            snapshot=snapshot,
+        )
+        response = json_page(db_schemas, Schema, limit)
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.post("")
@@ -37,25 +114,8 @@ async def register_schema(
 ) -> Schema:
     bound_logger = logger.bind(body={"schema_id": schema_id})
     bound_logger.debug("POST request received: Register schema")
-    schema_attrs_list = _get_schema_attrs(schema_id)
     try:
-        if schema_attrs_list:
-            schema = Schema(
-                did=schema_attrs_list[0],
-                name=schema_attrs_list[2],
-                version=schema_attrs_list[3],
-                id=schema_id.schema_id,
-            )
-        else:
-            # did:cheqd schema
-            cheqd_schema = await resolve_cheqd_schema(schema_id.schema_id)
-            schema = Schema(
-                did=cheqd_schema.get("did"),  # type: ignore
-                name=cheqd_schema.get("name"),  # type: ignore
-                version=cheqd_schema.get("version"),  # type: ignore
-                id=schema_id.schema_id,
-            )
-
+        schema = await _get_schema(schema_id)
         create_schema_res = await crud.create_schema(
             db_session,
             schema=schema,
@@ -67,6 +127,80 @@ async def register_schema(
     return create_schema_res
 
 
+@router.post("/bulk")
+async def register_schemas(
+    schema_ids: SchemaIDs,
+    db_session: AsyncSession = Depends(get_async_db),  # type: ignore
+) -> BulkSchemasResult:
+    """Register schemas in a single transaction.
+
+    Schemas that already exist are reported as conflicts, and invalid schema ids and
+    did:cheqd schemas that could not be resolved as failed, by their index in the
+    request. At most `TRUST_REGISTRY_MAX_BULK_SIZE` schemas can be registered per
+    request.
+    """
+    bound_logger = logger.bind(body={"count": len(schema_ids.schema_ids)})
+    bound_logger.debug("POST request received: Register schemas")
+    if len(schema_ids.schema_ids) > MAX_BULK_SIZE:
+        bound_logger.info("Bad request: Too many schemas.")
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_SIZE} schemas can be registered at once.",
+        )
+
+    semaphore = asyncio.Semaphore(CHEQD_RESOLVE_CONCURRENCY)
+
+    async def get_schema(schema_id: str) -> Schema | str:
+        """Return the schema, or why it could not be resolved."""
+        async with semaphore:
+            try:
+                return await _get_schema(SchemaID(schema_id=schema_id))
+            except HTTPException as e:
+                if e.status_code == 422:
+                    return e.detail  # Invalid schema id
+                return f"Could not resolve schema: {e.detail}"
+            except Exception as e:  # pylint: disable=broad-except
+                return f"Could not resolve schema: {e}"
+
+    results = await asyncio.gather(*map(get_schema, schema_ids.schema_ids))
+    # Indexes in the request of the resolved schemas
+    indexes = [i for i, result in enumerate(results) if isinstance(result, Schema)]
+    failed = [
+        BulkConflict(index=i, detail=result)
+        for i, result in enumerate(results)
+        if isinstance(result, str)
+    ]
+    if failed:
+        bound_logger.info("Could not resolve `{}` schemas.", len(failed))
+    created, conflicts = await crud.create_schemas(
+        db_session,
+        schemas=[result for result in results if isinstance(result, Schema)],
+    )
+
+    return BulkSchemasResult(
+        created=[Schema.model_validate(schema) for schema in created],
+        conflicts=[
+            BulkConflict(index=indexes[index], detail=detail)
+            for index, detail in conflicts.items()
+        ],
+        failed=failed,
+    )
+
+
+@router.post("/exists")
+async def schemas_exist(
+    schema_ids: SchemaIDs,
+    db_session: AsyncSession = Depends(get_async_db),  # type: ignore
+) -> dict[str, bool]:
+    logger.bind(body={"schema_ids": schema_ids}).debug(
+        "POST request received: Check which schemas exist"
+    )
+    existing_ids = await crud.get_existing_schema_ids(
+        db_session, schema_ids=schema_ids.schema_ids
+    )
+    return {schema_id: schema_id in existing_ids for schema_id in schema_ids.schema_ids}
+
+
 @router.put("/{schema_id}")
 async def update_schema(
     schema_id: str,
@@ -146,8 +280,43 @@ async def remove_schema(
         ) from e
 
 
+async def _get_schema(schema_id: SchemaID) -> Schema:
+    schema_attrs_list = _get_schema_attrs(schema_id)
+    if schema_attrs_list:
+        return Schema(
+            did=schema_attrs_list[0],
+            name=schema_attrs_list[2],
+            version=schema_attrs_list[3],
+            id=schema_id.schema_id,
+        )
+
+    # did:cheqd schema
+    cheqd_schema = await resolve_cheqd_schema(schema_id.schema_id)
+    return Schema(
+        did=cheqd_schema.get("did"),  # type: ignore
+        name=cheqd_schema.get("name"),  # type: ignore
+        version=cheqd_schema.get("version"),  # type: ignore
+        id=schema_id.schema_id,
+    )
+
+
 def _get_schema_attrs(schema_id: SchemaID) -> list[str]:
-    # Split from the back because DID may contain a colon
+    """Return the did, `2` marker, name and version of a schema id.
+
+    Returns an empty list for did:cheqd schema ids, which are resolved instead.
+
+    Raises:
+        HTTPException: 422, if the schema id is not of the form `did:2:name:version`.
+
+    """
+    # Split from the front, so only the version may contain a colon
     if schema_id.schema_id.startswith("did:cheqd:"):
         return []
-    return schema_id.schema_id.split(":", 3)
+    schema_attrs_list = schema_id.schema_id.split(":", 3)
+    if len(schema_attrs_list) != 4 or schema_attrs_list[1] != "2":
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid schema id `{schema_id.schema_id}`: expected the format "
+            "`did:2:name:version`.",
+        )
+    return schema_attrs_list
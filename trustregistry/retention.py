@@ -0,0 +1,34 @@
+import asyncio
+import os
+from datetime import timedelta
+
+from shared.log_config import get_logger
+from trustregistry import crud
+from trustregistry.database import AsyncSessionLocal
+
+logger = get_logger(__name__)
+
+# Seconds that registry changes are kept, for clients to sync with `/registry/changes`
+TRUST_REGISTRY_CHANGES_RETENTION = float(
+    os.getenv("TRUST_REGISTRY_CHANGES_RETENTION", str(7 * 24 * 60 * 60))
+)
+# Seconds between deletions of the changes older than the retention period
+TRUST_REGISTRY_CHANGES_PRUNE_INTERVAL = float(
+    os.getenv("TRUST_REGISTRY_CHANGES_PRUNE_INTERVAL", "3600")
+)
+
+
+async def prune_changes_periodically() -> None:
+    """Delete the registry changes older than the retention period, until cancelled.
+
+    Clients synced to a version whose changes were deleted get a 410 from
+    `/registry/changes`, and fetch the whole registry instead.
+    """
+    retention = timedelta(seconds=TRUST_REGISTRY_CHANGES_RETENTION)
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                await crud.prune_changes(session, retention)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not prune registry changes")
+        await asyncio.sleep(TRUST_REGISTRY_CHANGES_PRUNE_INTERVAL)
@@ -0,0 +1,393 @@
+import asyncio
+import copy
+import os
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Collection, Coroutine
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from shared.log_config import get_logger
+from trustregistry import db
+from trustregistry.database import AsyncSessionLocal, async_engine
+
+logger = get_logger(__name__)
+
+# Serve reads from an in-memory snapshot of the registry, instead of Postgres
+TRUST_REGISTRY_SNAPSHOT = os.getenv("TRUST_REGISTRY_SNAPSHOT", "true").lower() == "true"
+# Seconds between version checks, in case a change notification was missed
+TRUST_REGISTRY_SNAPSHOT_REFRESH_INTERVAL = float(
+    os.getenv("TRUST_REGISTRY_SNAPSHOT_REFRESH_INTERVAL", "30")
+)
+# Changed rows above which the snapshot is reloaded, instead of updated in place
+TRUST_REGISTRY_SNAPSHOT_MAX_DELTA = int(
+    os.getenv("TRUST_REGISTRY_SNAPSHOT_MAX_DELTA", "1000")
+)
+
+LISTEN_RECONNECT_DELAY = 1  # Seconds before listening again on a new connection
+MAX_LISTEN_RECONNECT_DELAY = 30
+
+
+def _page(
+    rows: list[Any],
+    ids: list[str],
+    after: str | None,
+    limit: int,
+    include: Callable[[Any], bool],
+) -> list[Any]:
+    page = []
+    for row in rows[bisect_right(ids, after) if after is not None else 0 :]:
+        if include(row):
+            page.append(row)
+            if len(page) == limit:
+                break
+    return page
+
+
+def _remove(rows: list[Any], ids: list[str], row_id: str) -> None:
+    index = bisect_left(ids, row_id)
+    if index < len(ids) and ids[index] == row_id:
+        del ids[index]
+        del rows[index]
+
+
+def _insert(rows: list[Any], ids: list[str], row_id: str, row: object) -> None:
+    index = bisect_left(ids, row_id)
+    ids.insert(index, row_id)
+    rows.insert(index, row)
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Immutable snapshot of all actors and schemas at a registry version.
+
+    Rows are detached from their session, so they can be shared between requests.
+    """
+
+    version: int
+    actors: list[db.Actor]  # Sorted by id
+    schemas: list[db.Schema]  # Sorted by id
+    actor_ids: list[str] = field(init=False)
+    actors_by_id: dict[str, db.Actor] = field(init=False)
+    actors_by_did: dict[str, db.Actor] = field(init=False)
+    actors_by_name: dict[str, db.Actor] = field(init=False)
+    schema_ids: list[str] = field(init=False)
+    schemas_by_id: dict[str, db.Schema] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Index the rows."""
+        set_field = object.__setattr__  # The dataclass is frozen
+        set_field(self, "actor_ids", [actor.id for actor in self.actors])
+        set_field(self, "actors_by_id", {actor.id: actor for actor in self.actors})
+        set_field(self, "actors_by_did", {actor.did: actor for actor in self.actors})
+        set_field(self, "actors_by_name", {actor.name: actor for actor in self.actors})
+        set_field(self, "schema_ids", [schema.id for schema in self.schemas])
+        set_field(self, "schemas_by_id", {schema.id: schema for schema in self.schemas})
+
+    def apply(
+        self,
+        *,
+        version: int,
+        changed_actor_ids: Collection[str],
+        actors: list[db.Actor],
+        changed_schema_ids: Collection[str],
+        schemas: list[db.Schema],
+    ) -> "RegistrySnapshot":
+        """Return the snapshot at a newer version, given the rows that changed since.
+
+        The changed ids include deleted rows, which are missing from `actors` and
+        `schemas`. Only the changed rows are indexed, the others are shared with this
+        snapshot.
+        """
+        snapshot = copy.copy(self)  # Without indexing all rows again
+        set_field = object.__setattr__  # The dataclass is frozen
+        set_field(snapshot, "version", version)
+
+        new_actors, actor_ids = list(self.actors), list(self.actor_ids)
+        actors_by_id = dict(self.actors_by_id)
+        actors_by_did = dict(self.actors_by_did)
+        actors_by_name = dict(self.actors_by_name)
+        for actor_id in changed_actor_ids:
+            old_actor = actors_by_id.pop(actor_id, None)
+            if old_actor is not None:
+                _remove(new_actors, actor_ids, actor_id)
+                del actors_by_did[old_actor.did]
+                del actors_by_name[old_actor.name]
+        for actor in actors:
+            _insert(new_actors, actor_ids, actor.id, actor)
+            actors_by_id[actor.id] = actor
+            actors_by_did[actor.did] = actor
+            actors_by_name[actor.name] = actor
+        set_field(snapshot, "actors", new_actors)
+        set_field(snapshot, "actor_ids", actor_ids)
+        set_field(snapshot, "actors_by_id", actors_by_id)
+        set_field(snapshot, "actors_by_did", actors_by_did)
+        set_field(snapshot, "actors_by_name", actors_by_name)
+
+        new_schemas, schema_ids = list(self.schemas), list(self.schema_ids)
+        schemas_by_id = dict(self.schemas_by_id)
+        for schema_id in changed_schema_ids:
+            if schemas_by_id.pop(schema_id, None) is not None:
+                _remove(new_schemas, schema_ids, schema_id)
+        for schema in schemas:
+            _insert(new_schemas, schema_ids, schema.id, schema)
+            schemas_by_id[schema.id] = schema
+        set_field(snapshot, "schemas", new_schemas)
+        set_field(snapshot, "schema_ids", schema_ids)
+        set_field(snapshot, "schemas_by_id", schemas_by_id)
+        return snapshot
+
+    def actors_page(
+        self,
+        *,
+        after: str | None,
+        limit: int,
+        role: str | None = None,
+        did_prefix: str | None = None,
+    ) -> list[db.Actor]:
+        return _page(
+            self.actors,
+            self.actor_ids,
+            after,
+            limit,
+            lambda actor: (not role or role in actor.roles)
+            and (not did_prefix or actor.did.startswith(did_prefix)),
+        )
+
+    def schemas_page(
+        self,
+        *,
+        after: str | None,
+        limit: int,
+        did_prefix: str | None = None,
+        name: str | None = None,
+        version: str | None = None,
+    ) -> list[db.Schema]:
+        return _page(
+            self.schemas,
+            self.schema_ids,
+            after,
+            limit,
+            lambda schema: (not did_prefix or schema.did.startswith(did_prefix))
+            and (not name or schema.name == name)
+            and (not version or schema.version == version),
+        )
+
+
+class RegistryCache:
+    """Keeps an in-memory snapshot of the registry up to date.
+
+    The snapshot is refreshed after writes through `crud`, when another replica
+    notifies a change through Postgres `LISTEN/NOTIFY`, and when a periodic check
+    finds a newer registry version (e.g. after a missed notification). A refresh
+    applies the recorded registry changes to the snapshot, and only reloads the
+    whole registry when those are not available. Until it is started, `snapshot`
+    is None and reads go to the database.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a cache without snapshot."""
+        self.snapshot: RegistrySnapshot | None = None
+        self._started = False
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_requested = False
+        self._listen_connection: AsyncConnection | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._started = True
+        await self.refresh()
+        try:
+            await self._listen()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not listen for registry changes, retrying")
+            self._spawn(self._reconnect())
+        self._spawn(self._check_periodically())
+        logger.info(
+            "Registry snapshot started at version {}",
+            self.snapshot.version if self.snapshot else None,
+        )
+
+    async def stop(self) -> None:
+        self._started = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._listen_connection is not None:
+            await self._listen_connection.close()
+            self._listen_connection = None
+        self.snapshot = None
+
+    def request_refresh(self) -> None:
+        """Refresh the snapshot in the background."""
+        if self._started:
+            self._spawn(self.refresh())
+
+    async def refresh(self) -> None:
+        """Update the snapshot if the registry version changed.
+
+        Concurrent calls are coalesced: a call returns once an update that started
+        after the call has completed. If the update fails, the previous snapshot is
+        kept until the next refresh.
+        """
+        if not self._started:
+            return
+        self._refresh_requested = True
+        async with self._refresh_lock:
+            if not self._refresh_requested:
+                return  # Covered by the update of a concurrent call
+            self._refresh_requested = False
+            try:
+                self.snapshot = await self._load()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Could not refresh registry snapshot")
+
+    async def _load(self) -> RegistrySnapshot:
+        async with AsyncSessionLocal() as session:
+            # Read the version, the changes and the rows from the same database snapshot
+            await session.connection(
+                execution_options={"isolation_level": "REPEATABLE READ"}
+            )
+            version = await session.scalar(select(db.RegistryVersion.version)) or 0
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+
+            if snapshot is not None and snapshot.version < version:
+                updated = await self._load_changes(session, snapshot, version)
+                if updated is not None:
+                    return updated
+
+            actors = list(
+                await session.scalars(select(db.Actor).order_by(db.ACTOR_ID_ORDER))
+            )
+            schemas = list(
+                await session.scalars(select(db.Schema).order_by(db.SCHEMA_ID_ORDER))
+            )
+            session.expunge_all()
+
+        logger.debug(
+            "Loaded registry snapshot at version {}: {} actors, {} schemas",
+            version,
+            len(actors),
+            len(schemas),
+        )
+        return RegistrySnapshot(version=version, actors=actors, schemas=schemas)
+
+    async def _load_changes(
+        self, session: AsyncSession, snapshot: RegistrySnapshot, version: int
+    ) -> RegistrySnapshot | None:
+        """Apply the changes since the snapshot's version, if they are available."""
+        pruned_version = await session.scalar(select(db.RegistryVersion.pruned_version))
+        if snapshot.version < (pruned_version or 0):
+            return None
+
+        result = await session.execute(
+            select(db.RegistryChange.table_name, db.RegistryChange.entity_id)
+            .where(db.RegistryChange.version > snapshot.version)
+            .where(db.RegistryChange.version <= version)
+            .distinct()
+        )
+        changed_ids: dict[str, set[str]] = {"actors": set(), "schemas": set()}
+        for table_name, entity_id in result:
+            if entity_id is None:
+                return None  # Truncated
+            changed_ids[table_name].add(entity_id)
+        if sum(map(len, changed_ids.values())) > TRUST_REGISTRY_SNAPSHOT_MAX_DELTA:
+            return None
+
+        actors: list[db.Actor] = []
+        if changed_ids["actors"]:
+            actors = list(
+                await session.scalars(
+                    select(db.Actor).where(db.Actor.id.in_(changed_ids["actors"]))
+                )
+            )
+        schemas: list[db.Schema] = []
+        if changed_ids["schemas"]:
+            schemas = list(
+                await session.scalars(
+                    select(db.Schema).where(db.Schema.id.in_(changed_ids["schemas"]))
+                )
+            )
+        session.expunge_all()
+
+        logger.debug(
+            "Updated registry snapshot from version {} to {}: {} actors, {} schemas",
+            snapshot.version,
+            version,
+            len(changed_ids["actors"]),
+            len(changed_ids["schemas"]),
+        )
+        return snapshot.apply(
+            version=version,
+            changed_actor_ids=changed_ids["actors"],
+            actors=actors,
+            changed_schema_ids=changed_ids["schemas"],
+            schemas=schemas,
+        )
+
+    async def _listen(self) -> None:
+        connection = await async_engine.connect()
+        try:
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+            await driver_connection.add_listener(  # type: ignore[union-attr]
+                db.REGISTRY_CHANNEL, self._on_notification
+            )
+            driver_connection.add_termination_listener(  # type: ignore[union-attr]
+                self._on_listen_terminated
+            )
+        except Exception:
+            await connection.invalidate()
+            raise
+        self._listen_connection = connection
+
+    def _on_notification(
+        self, _connection: object, _pid: int, _channel: str, payload: str
+    ) -> None:
+        logger.debug("Registry changed to version {}", payload)
+        self.request_refresh()
+
+    def _on_listen_terminated(self, _connection: object) -> None:
+        if not self._started:
+            return  # Closed by stop
+        logger.warning("Connection listening for registry changes was closed")
+        self._spawn(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Listen on a new connection, and catch up on changes missed meanwhile."""
+        if self._listen_connection is not None:
+            with suppress(Exception):
+                await self._listen_connection.invalidate()
+            self._listen_connection = None
+
+        delay = LISTEN_RECONNECT_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._listen()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning("Could not listen for registry changes: {}", e)
+                delay = min(delay * 2, MAX_LISTEN_RECONNECT_DELAY)
+                continue
+
+            logger.info("Listening for registry changes again")
+            await self.refresh()
+            return
+
+    async def _check_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(TRUST_REGISTRY_SNAPSHOT_REFRESH_INTERVAL)
+            await self.refresh()
+
+    def _spawn(self, coroutine: Coroutine[None, None, None]) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+registry_cache = RegistryCache()
@@ -37,3 +37,40 @@ async def test_registry():
     assert response.status_code == 200
     json_response = response.json()
     assert all(key in json_response for key in ["actors", "schemas"])
+
+
+@pytest.mark.anyio
+async def test_registry_not_modified():
+    async with RichAsyncClient(raise_status_error=False) as client:
+        response = await client.get(f"{TRUST_REGISTRY_URL}/registry")
+        etag = response.headers["ETag"]
+
+        response = await client.get(
+            f"{TRUST_REGISTRY_URL}/registry", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_registry_changes():
+    schema_id = "changes:2:changes:1.0"
+    async with RichAsyncClient(raise_status_error=False) as client:
+        response = await client.get(f"{TRUST_REGISTRY_URL}/registry/version")
+        version = response.json()["version"]
+
+        await client.post(
+            f"{TRUST_REGISTRY_URL}/registry/schemas", json={"schema_id": schema_id}
+        )
+        response = await client.get(
+            f"{TRUST_REGISTRY_URL}/registry/changes", params={"since": version}
+        )
+        changes = response.json()
+        assert changes["version"] > version
+        assert schema_id in [schema["id"] for schema in changes["schemas"]]
+
+        await client.delete(f"{TRUST_REGISTRY_URL}/registry/schemas/{schema_id}")
+        response = await client.get(
+            f"{TRUST_REGISTRY_URL}/registry/changes", params={"since": version}
+        )
+        assert schema_id in response.json()["deleted_schema_ids"]
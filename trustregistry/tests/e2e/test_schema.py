@@ -75,6 +75,27 @@ async def test_get_schema_by_id():
         assert "Schema with id " in response.json()["detail"]
 
 
+@pytest.mark.anyio
+async def test_schemas_exist():
+    async with RichAsyncClient() as client:
+        response = await client.post(
+            f"{TRUST_REGISTRY_URL}/registry/schemas/exists",
+            json={"schema_ids": [schema_id, "i:dont:exist"]},
+        )
+    assert response.json() == {schema_id: True, "i:dont:exist": False}
+
+
+@pytest.mark.anyio
+async def test_get_schemas_filtered_page():
+    async with RichAsyncClient() as client:
+        response = await client.get(
+            f"{TRUST_REGISTRY_URL}/registry/schemas",
+            params={"did_prefix": "string", "name": "string", "limit": 1},
+        )
+    assert [schema["id"] for schema in response.json()] == [schema_id]
+    assert response.headers["X-Next-Cursor"] == schema_id
+
+
 @pytest.mark.anyio
 async def test_update_schema():
     schema_dict = {
@@ -128,3 +149,22 @@ def test__get_schema_attrs():
     res = _get_schema_attrs(schema_id=SchemaID(schema_id="abc:2:Peter Parker:0.4.20"))
 
     assert res == ["abc", "2", "Peter Parker", "0.4.20"]
+
+
+@pytest.mark.anyio
+async def test_register_schemas_bulk():
+    bulk_schema_ids = [f"bulk:2:bulk_{i}:1.0" for i in range(3)]
+    async with RichAsyncClient(raise_status_error=False) as client:
+        response = await client.post(
+            f"{TRUST_REGISTRY_URL}/registry/schemas/bulk",
+            json={"schema_ids": [*bulk_schema_ids, bulk_schema_ids[0]]},
+        )
+        assert response.status_code == 200
+        result = response.json()
+        assert [schema["id"] for schema in result["created"]] == bulk_schema_ids
+        assert result["conflicts"] == [{"index": 3, "detail": "Schema already exists."}]
+
+        for bulk_schema_id in bulk_schema_ids:
+            await client.delete(
+                f"{TRUST_REGISTRY_URL}/registry/schemas/{bulk_schema_id}"
+            )
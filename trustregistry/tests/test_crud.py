@@ -1,6 +1,8 @@
+from datetime import timedelta
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,9 +11,11 @@ from trustregistry import crud, db
 from trustregistry.crud import (
     ActorAlreadyExistsError,
     ActorDoesNotExistError,
+    ChangesUnavailableError,
     SchemaAlreadyExistsError,
     SchemaDoesNotExistError,
 )
+from trustregistry.snapshot import RegistryCache, RegistrySnapshot
 
 # pylint: disable=redefined-outer-name
 
@@ -38,30 +42,65 @@ db_schema2 = db.Schema(did="did:123", name="schema2", version="1.0")
 schema1 = Schema(did="did123", name="schema1", version="1.0")
 
 
-@pytest.mark.parametrize(
-    "expected, skip, limit",
-    [
-        ([db_actor1, db_actor2], 0, 1000),
-        ([], 0, 1000),
-        ([db_actor1, db_actor2], 0, 2),
-    ],
-)
+def compiled_sql(db_session_mock: Mock) -> str:
+    query = db_session_mock.scalars.call_args.args[0]
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@pytest.mark.parametrize("expected", [[db_actor1, db_actor2], []])
 @pytest.mark.anyio
-async def test_get_actors(db_session_mock: AsyncSession, expected, skip, limit):
+async def test_get_actors(db_session_mock: AsyncSession, expected):
     # Mock the result object that scalars returns
     mock_result = Mock()
     mock_result.all.return_value = expected
     db_session_mock.scalars.return_value = mock_result
 
-    with patch("trustregistry.crud.select") as select_mock:
-        actors = await crud.get_actors(db_session_mock, skip=skip, limit=limit)
+    actors = await crud.get_actors(db_session_mock, limit=2)
 
-        db_session_mock.scalars.assert_called_once()
-        assert actors == expected
+    db_session_mock.scalars.assert_called_once()
+    assert actors == expected
 
-        select_mock.assert_called_once_with(db.Actor)
-        select_mock(db.Actor).offset.assert_called_once_with(skip)
-        select_mock(db.Actor).offset(skip).limit.assert_called_once_with(limit)
+    sql = compiled_sql(db_session_mock)
+    assert 'ORDER BY actors.id COLLATE "C"' in sql
+    assert "LIMIT 2" in sql
+    assert "WHERE" not in sql
+
+
+@pytest.mark.anyio
+async def test_get_actors_filtered(db_session_mock: AsyncSession):
+    db_session_mock.scalars.return_value = Mock(all=Mock(return_value=[db_actor2]))
+
+    actors = await crud.get_actors(
+        db_session_mock, after="1", limit=10, role="issuer", did_prefix="did:4"
+    )
+
+    assert actors == [db_actor2]
+    sql = compiled_sql(db_session_mock)
+    assert "(actors.id COLLATE \"C\") > '1'" in sql
+    assert "actors.roles @> ARRAY['issuer']" in sql
+    assert "actors.did LIKE 'did:4' || '%%'" in sql
+
+
+@pytest.mark.anyio
+async def test_stream_actors(db_session_mock: AsyncSession):
+    db_actor3 = db.Actor(id="3", name="Carol", roles=["verifier"], did="did:789")
+    pages = [[db_actor1, db_actor2], [db_actor3]]
+
+    with patch("trustregistry.crud.get_actors", side_effect=pages) as mock_get_actors:
+        actors = [
+            actor async for actor in crud.stream_actors(db_session_mock, page_size=2)
+        ]
+
+    assert actors == [db_actor1, db_actor2, db_actor3]
+    # Each page starts after the last actor of the previous one
+    assert [call.kwargs["after"] for call in mock_get_actors.call_args_list] == [
+        None,
+        "2",
+    ]
 
 
 @pytest.mark.parametrize(
@@ -143,7 +182,7 @@ async def test_create_actor(db_session_mock: AsyncSession):
 
     db_session_mock.add.assert_called_once()
     db_session_mock.commit.assert_called_once()
-    db_session_mock.refresh.assert_called_once()
+    db_session_mock.refresh.assert_not_called()
 
     assert result.did == db_actor.did
     assert result.name == db_actor.name
@@ -178,87 +217,122 @@ async def test_create_actor_exception(db_session_mock: AsyncSession):
         await crud.create_actor(db_session_mock, actor1)
 
 
-@pytest.mark.parametrize("actor, actor_id", [(actor1, "1"), (None, "NotInDB")])
+@pytest.mark.parametrize("actor, actor_id", [(db_actor1, "1"), (None, "NotInDB")])
 @pytest.mark.anyio
 async def test_delete_actor(db_session_mock: AsyncSession, actor, actor_id):
     mock_result = Mock()
     mock_result.one_or_none.return_value = actor
     db_session_mock.scalars.return_value = mock_result
 
-    with (
-        patch("trustregistry.crud.select") as select_mock,
-        patch("trustregistry.crud.delete") as delete_mock,
-    ):
-        if actor:
-            result = await crud.delete_actor(db_session_mock, actor_id=actor_id)
-
-            select_mock.assert_called_once_with(db.Actor)
-            select_mock(db.Actor).where.assert_called_once()
+    if actor:
+        result = await crud.delete_actor(db_session_mock, actor_id=actor_id)
 
-            delete_mock.assert_called_once_with(db.Actor)
-            delete_mock(db.Actor).where.assert_called_once()
+        db_session_mock.commit.assert_called_once()
+        assert result == actor
+    else:
+        with pytest.raises(ActorDoesNotExistError):
+            await crud.delete_actor(db_session_mock, actor_id=actor_id)
 
-            db_session_mock.execute.assert_called_once()
-            db_session_mock.commit.assert_called_once()
+        db_session_mock.commit.assert_not_called()
 
-            assert result == actor
-        else:
-            with pytest.raises(ActorDoesNotExistError):
-                await crud.delete_actor(db_session_mock, actor_id=actor_id)
+    # A single statement, that returns the deleted actor
+    db_session_mock.scalars.assert_called_once()
+    assert compiled_sql(db_session_mock) == (
+        f"DELETE FROM actors WHERE actors.id = '{actor_id}' RETURNING actors.id, "
+        "actors.name, actors.roles, actors.didcomm_invitation, actors.did, "
+        "actors.image_url"
+    )
 
 
-@pytest.mark.parametrize("new_actor, old_actor ", [(actor1, db_actor1), (actor1, None)])
+@pytest.mark.parametrize("old_actor", [db_actor1, None])
 @pytest.mark.anyio
-async def test_update_actor(
-    db_session_mock: AsyncSession, new_actor: Actor, old_actor: db.Actor
-):
+async def test_update_actor(db_session_mock: AsyncSession, old_actor: db.Actor):
     mock_result = Mock()
     mock_result.one_or_none.return_value = old_actor
     db_session_mock.scalars.return_value = mock_result
 
     if not old_actor:
         with pytest.raises(ActorDoesNotExistError):
-            await crud.update_actor(db_session_mock, new_actor)
+            await crud.update_actor(db_session_mock, actor1)
+
+        db_session_mock.commit.assert_not_called()
     else:
-        with patch("trustregistry.crud.update") as update_mock:
-            # Mock the result for the update query
-            mock_update_result = Mock()
-            mock_update_result.first.return_value = old_actor
-            # For update operations, we need to mock scalars twice
-            db_session_mock.scalars.side_effect = [mock_result, mock_update_result]
+        result = await crud.update_actor(db_session_mock, actor1)
 
-            await crud.update_actor(db_session_mock, new_actor)
+        db_session_mock.commit.assert_called_once()
+        assert result == old_actor
 
-            update_mock.assert_called_once_with(db.Actor)
-            update_mock(db.Actor).where.assert_called_once()
-            update_mock(db.Actor).where().values.assert_called_once()
+    # A single statement, that returns the updated actor
+    db_session_mock.scalars.assert_called_once()
+    sql = compiled_sql(db_session_mock)
+    assert sql.startswith("UPDATE actors SET")
+    assert "WHERE actors.id = '1' RETURNING" in sql
+    # Without new image URL, the current one is kept
+    assert "image_url=actors.image_url" in sql
 
-            db_session_mock.commit.assert_called_once()
 
+@pytest.mark.anyio
+async def test_update_actor_image_url(db_session_mock: AsyncSession):
+    db_session_mock.scalars.return_value = Mock(
+        one_or_none=Mock(return_value=db_actor1)
+    )
+    actor = actor1.model_copy(update={"image_url": "https://example.com/logo.png"})
 
-@pytest.mark.parametrize(
-    "expected, skip, limit",
-    [
-        ([db_schema1, db_schema2], 0, 1000),
-        ([], 0, 1000),
-        ([db_schema1, db_schema2], 0, 2),
-    ],
-)
+    await crud.update_actor(db_session_mock, actor)
+
+    assert "image_url='https://example.com/logo.png'" in compiled_sql(db_session_mock)
+
+
+@pytest.mark.parametrize("expected", [[db_schema1, db_schema2], []])
 @pytest.mark.anyio
-async def test_get_schemas(db_session_mock: AsyncSession, expected, skip, limit):
+async def test_get_schemas(db_session_mock: AsyncSession, expected):
     mock_result = Mock()
     mock_result.all.return_value = expected
     db_session_mock.scalars.return_value = mock_result
 
-    with patch("trustregistry.crud.select") as select_mock:
-        schemas = await crud.get_schemas(db_session_mock, skip=skip, limit=limit)
+    schemas = await crud.get_schemas(db_session_mock, limit=2)
 
-        db_session_mock.scalars.assert_called_once()
-        assert schemas == expected
+    db_session_mock.scalars.assert_called_once()
+    assert schemas == expected
 
-        select_mock.assert_called_once_with(db.Schema)
-        select_mock(db.Schema).offset.assert_called_once_with(skip)
-        select_mock(db.Schema).offset(skip).limit.assert_called_once_with(limit)
+    sql = compiled_sql(db_session_mock)
+    assert 'ORDER BY schemas.id COLLATE "C"' in sql
+    assert "LIMIT 2" in sql
+    assert "WHERE" not in sql
+
+
+@pytest.mark.anyio
+async def test_get_schemas_filtered(db_session_mock: AsyncSession):
+    db_session_mock.scalars.return_value = Mock(all=Mock(return_value=[db_schema2]))
+
+    schemas = await crud.get_schemas(
+        db_session_mock,
+        after="did:123:2:schema1:1.0",
+        limit=10,
+        did_prefix="did:1",
+        name="schema2",
+        version="1.0",
+    )
+
+    assert schemas == [db_schema2]
+    sql = compiled_sql(db_session_mock)
+    assert "(schemas.id COLLATE \"C\") > 'did:123:2:schema1:1.0'" in sql
+    assert "schemas.did LIKE 'did:1' || '%%'" in sql
+    assert "schemas.name = 'schema2'" in sql
+    assert "schemas.version = '1.0'" in sql
+
+
+@pytest.mark.anyio
+async def test_stream_schemas(db_session_mock: AsyncSession):
+    with patch(
+        "trustregistry.crud.get_schemas", side_effect=[[db_schema1], []]
+    ) as mock_get_schemas:
+        schemas = [
+            schema async for schema in crud.stream_schemas(db_session_mock, page_size=1)
+        ]
+
+    assert schemas == [db_schema1]
+    assert mock_get_schemas.call_count == 2
 
 
 @pytest.mark.parametrize(
@@ -285,6 +359,24 @@ async def test_get_schema_by_id(db_session_mock: AsyncSession, expected, schema_
         select_mock(db.Schema).where.assert_called_once()
 
 
+@pytest.mark.anyio
+async def test_get_existing_schema_ids(db_session_mock: AsyncSession):
+    mock_result = Mock()
+    mock_result.all.return_value = ["123"]
+    db_session_mock.scalars.return_value = mock_result
+
+    with patch("trustregistry.crud.select") as select_mock:
+        existing_ids = await crud.get_existing_schema_ids(
+            db_session_mock, schema_ids=["123", "id_not_in_db"]
+        )
+
+        db_session_mock.scalars.assert_called_once()
+        assert existing_ids == {"123"}
+
+        select_mock.assert_called_once_with(db.Schema.id)
+        select_mock(db.Schema.id).where.assert_called_once()
+
+
 @pytest.mark.parametrize("should_raise_integrity_error", [False, True])
 @pytest.mark.anyio
 async def test_create_schema(
@@ -306,7 +398,7 @@ async def test_create_schema(
         result = await crud.create_schema(db_session_mock, new_schema)
         db_session_mock.add.assert_called_once()
         db_session_mock.commit.assert_called_once()
-        db_session_mock.refresh.assert_called_once()
+        db_session_mock.refresh.assert_not_called()
 
         assert result.id == schema.id
         assert result.did == schema.did
@@ -314,45 +406,30 @@ async def test_create_schema(
         assert result.version == schema.version
 
 
-@pytest.mark.parametrize(
-    "new_schema, old_schema",
-    [
-        (
-            Schema(
-                did="did123",
-                name="schema_new",
-                version="1.0",
-                id="did123:2:schema_new:1.0",
-            ),
-            db_schema1,
-        ),
-        (schema1, None),
-    ],
-)
+@pytest.mark.parametrize("old_schema", [db_schema1, None])
 @pytest.mark.anyio
-async def test_update_schema(db_session_mock: AsyncSession, new_schema, old_schema):
+async def test_update_schema(db_session_mock: AsyncSession, old_schema):
+    new_schema = Schema(did="did123", name="schema_new", version="1.0")
     mock_result = Mock()
     mock_result.one_or_none.return_value = old_schema
     db_session_mock.scalars.return_value = mock_result
 
     if not old_schema:
         with pytest.raises(SchemaDoesNotExistError):
-            await crud.update_schema(db_session_mock, new_schema, new_schema.id)
-    else:
-        with patch("trustregistry.crud.update") as update_mock:
-            # Mock the result for the update query
-            mock_update_result = Mock()
-            mock_update_result.first.return_value = old_schema
-            # For update operations, we need to mock scalars twice
-            db_session_mock.scalars.side_effect = [mock_result, mock_update_result]
+            await crud.update_schema(db_session_mock, new_schema, schema1.id)
 
-            await crud.update_schema(db_session_mock, new_schema, new_schema.id)
+        db_session_mock.commit.assert_not_called()
+    else:
+        result = await crud.update_schema(db_session_mock, new_schema, schema1.id)
 
-            update_mock.assert_called_once_with(db.Schema)
-            update_mock(db.Schema).where.assert_called_once()
-            update_mock(db.Schema).where().values.assert_called_once()
+        db_session_mock.commit.assert_called_once()
+        assert result == old_schema
 
-            db_session_mock.commit.assert_called_once()
+    # A single statement, that returns the updated schema
+    db_session_mock.scalars.assert_called_once()
+    sql = compiled_sql(db_session_mock)
+    assert sql.startswith("UPDATE schemas SET")
+    assert f"WHERE schemas.id = '{schema1.id}' RETURNING" in sql
 
 
 @pytest.mark.parametrize(
@@ -364,23 +441,315 @@ async def test_delete_schema(db_session_mock: AsyncSession, schema, schema_id):
     mock_result.one_or_none.return_value = schema
     db_session_mock.scalars.return_value = mock_result
 
+    if schema:
+        result = await crud.delete_schema(db_session_mock, schema_id)
+
+        db_session_mock.commit.assert_called_once()
+        assert result == schema
+    else:
+        with pytest.raises(SchemaDoesNotExistError):
+            await crud.delete_schema(db_session_mock, schema_id)
+
+        db_session_mock.commit.assert_not_called()
+
+    # A single statement, that returns the deleted schema
+    db_session_mock.scalars.assert_called_once()
+    assert compiled_sql(db_session_mock) == (
+        f"DELETE FROM schemas WHERE schemas.id = '{schema_id}' RETURNING schemas.id, "
+        "schemas.did, schemas.name, schemas.version"
+    )
+
+
+@pytest.fixture
+def registry_snapshot() -> RegistrySnapshot:
+    snapshot = RegistrySnapshot(
+        version=3,
+        actors=[db_actor1, db_actor2],
+        schemas=[
+            db.Schema(id="did123:2:s1:1.0", did="did123", name="s1", version="1.0")
+        ],
+    )
+    with patch("trustregistry.crud.registry_cache.snapshot", snapshot):
+        yield snapshot
+
+
+@pytest.mark.anyio
+async def test_reads_from_snapshot(
+    db_session_mock: AsyncSession, registry_snapshot: RegistrySnapshot
+):
+    assert await crud.get_actors(db_session_mock, after="1") == [db_actor2]
+    assert await crud.get_actor_by_did(db_session_mock, "did:456") is db_actor2
+    assert await crud.get_actor_by_id(db_session_mock, "1") is db_actor1
+    assert await crud.get_actor_by_name(db_session_mock, "Bob") is db_actor2
+    with pytest.raises(ActorDoesNotExistError):
+        await crud.get_actor_by_did(db_session_mock, "did:789")
+
+    assert await crud.get_schemas(db_session_mock) == registry_snapshot.schemas
+    assert (
+        await crud.get_schema_by_id(db_session_mock, "did123:2:s1:1.0")
+        is (registry_snapshot.schemas[0])
+    )
+    with pytest.raises(SchemaDoesNotExistError):
+        await crud.get_schema_by_id(db_session_mock, "s2")
+    assert await crud.get_existing_schema_ids(
+        db_session_mock, ["did123:2:s1:1.0", "s2"]
+    ) == {"did123:2:s1:1.0"}
+
+    assert await crud.get_registry_version(db_session_mock) == 3
+    db_session_mock.scalars.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_stream_reads_from_one_snapshot(
+    db_session_mock: AsyncSession, registry_snapshot: RegistrySnapshot
+):
+    newer_snapshot = RegistrySnapshot(version=4, actors=[], schemas=[])
+    streamed = []
+    async for actor in crud.stream_actors(db_session_mock, page_size=1):
+        streamed.append(actor)
+        # The cache moves on to a newer snapshot while the stream is being read
+        crud.registry_cache.snapshot = newer_snapshot
+
+    assert streamed == registry_snapshot.actors
+    assert [
+        schema
+        async for schema in crud.stream_schemas(
+            db_session_mock, snapshot=registry_snapshot
+        )
+    ] == registry_snapshot.schemas
+
+
+@pytest.mark.anyio
+async def test_read_snapshot(
+    db_session_mock: AsyncSession, registry_snapshot: RegistrySnapshot
+):
+    assert await crud.read_snapshot(db_session_mock) is registry_snapshot
+    db_session_mock.connection.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_read_snapshot_from_database(db_session_mock: AsyncSession):
+    assert await crud.read_snapshot(db_session_mock) is None
+    db_session_mock.connection.assert_awaited_once_with(
+        execution_options={"isolation_level": "REPEATABLE READ"}
+    )
+
+
+@pytest.mark.anyio
+async def test_get_registry_version_from_database(db_session_mock: AsyncSession):
+    db_session_mock.scalar = AsyncMock(return_value=5)
+
+    assert await crud.get_registry_version(db_session_mock) == 5
+    db_session_mock.scalar.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_writes_refresh_snapshot(db_session_mock: AsyncSession):
+    with patch(
+        "trustregistry.crud.registry_cache.refresh", new_callable=AsyncMock
+    ) as mock_refresh:
+        await crud.create_actor(db_session_mock, actor1)
+        await crud.create_schema(db_session_mock, schema1)
+
+    assert mock_refresh.await_count == 2
+
+
+@pytest.mark.anyio
+async def test_create_then_get_from_snapshot(db_session_mock: AsyncSession):
+    cache = RegistryCache()
+    cache._started = True  # pylint: disable=protected-access
+    cache.snapshot = RegistrySnapshot(version=3, actors=[db_actor2], schemas=[])
+
+    async def load() -> RegistrySnapshot:
+        # The refresh runs after the write was committed
+        db_session_mock.commit.assert_awaited()
+        return RegistrySnapshot(version=4, actors=[db_actor1, db_actor2], schemas=[])
+
     with (
-        patch("trustregistry.crud.select") as select_mock,
-        patch("trustregistry.crud.delete") as delete_mock,
+        patch("trustregistry.crud.registry_cache", cache),
+        patch.object(cache, "_load", AsyncMock(side_effect=load)),
     ):
-        if schema:
-            result = await crud.delete_schema(db_session_mock, schema_id)
+        await crud.create_actor(db_session_mock, actor1)
 
-            select_mock.assert_called_once_with(db.Schema)
-            select_mock(db.Schema).where.assert_called_once()
+        # Read from the snapshot, as soon as the write returned
+        assert await crud.get_actor_by_id(db_session_mock, "1") is db_actor1
+        assert await crud.get_actor_by_did(db_session_mock, "did:123") is db_actor1
+        assert await crud.get_actor_by_name(db_session_mock, "Alice") is db_actor1
+    db_session_mock.scalars.assert_not_called()
 
-            delete_mock.assert_called_once_with(db.Schema)
-            delete_mock(db.Schema).where.assert_called_once()
 
-            db_session_mock.execute.assert_called_once()
-            db_session_mock.commit.assert_called_once()
+@pytest.mark.anyio
+async def test_get_changes_from_snapshot(
+    db_session_mock: AsyncSession, registry_snapshot: RegistrySnapshot
+):
+    db_session_mock.execute.return_value = [
+        ("actors", "2"),
+        ("actors", "3"),
+        ("schemas", "did123:2:s1:1.0"),
+    ]
+    db_session_mock.scalar = AsyncMock(return_value=0)
 
-            assert result == schema
-        else:
-            with pytest.raises(SchemaDoesNotExistError):
-                await crud.delete_schema(db_session_mock, schema_id)
+    changes = await crud.get_changes(db_session_mock, 1)
+
+    assert changes.version == 3
+    assert changes.actors == [actor2]
+    assert changes.deleted_actor_ids == ["3"]
+    assert [schema.id for schema in changes.schemas] == ["did123:2:s1:1.0"]
+    assert changes.deleted_schema_ids == []
+    db_session_mock.scalars.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_get_changes_from_database(db_session_mock: AsyncSession):
+    db_session_mock.connection = AsyncMock()
+    db_session_mock.scalar = AsyncMock(side_effect=[5, 1])
+    db_session_mock.execute.return_value = [("actors", "1"), ("schemas", "s1")]
+    db_session_mock.scalars.side_effect = [[db_actor1], []]
+
+    changes = await crud.get_changes(db_session_mock, 2)
+
+    assert changes.version == 5
+    assert changes.actors == [actor1]
+    assert changes.deleted_actor_ids == []
+    assert changes.schemas == []
+    assert changes.deleted_schema_ids == ["s1"]
+    db_session_mock.connection.assert_awaited_once_with(
+        execution_options={"isolation_level": "REPEATABLE READ"}
+    )
+    changes_query = db_session_mock.execute.call_args.args[0]
+    assert "registry_changes.version > 2" in str(
+        changes_query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("since", [6, -1])
+async def test_get_changes_unknown_version(db_session_mock: AsyncSession, since):
+    db_session_mock.connection = AsyncMock()
+    db_session_mock.scalar = AsyncMock(return_value=5)
+
+    with pytest.raises(ChangesUnavailableError):
+        await crud.get_changes(db_session_mock, since)
+
+
+@pytest.mark.anyio
+async def test_get_changes_after_truncate(
+    db_session_mock: AsyncSession,
+    registry_snapshot: RegistrySnapshot,  # pylint: disable=unused-argument
+):
+    db_session_mock.execute.return_value = [("actors", "1"), ("schemas", None)]
+
+    with pytest.raises(ChangesUnavailableError):
+        await crud.get_changes(db_session_mock, 1)
+
+
+@pytest.mark.anyio
+async def test_get_changes_pruned(
+    db_session_mock: AsyncSession,
+    registry_snapshot: RegistrySnapshot,  # pylint: disable=unused-argument
+):
+    db_session_mock.execute.return_value = [("actors", "2")]
+    db_session_mock.scalar = AsyncMock(return_value=2)
+
+    with pytest.raises(ChangesUnavailableError):
+        await crud.get_changes(db_session_mock, 1)
+
+
+@pytest.mark.anyio
+async def test_prune_changes(db_session_mock: AsyncSession):
+    db_session_mock.scalar = AsyncMock(return_value=7)
+    db_session_mock.execute.return_value = Mock(rowcount=12)
+
+    assert await crud.prune_changes(db_session_mock, timedelta(days=7)) == 12
+
+    delete_query, update_query = [
+        str(
+            call.args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        for call in db_session_mock.execute.call_args_list
+    ]
+    assert "DELETE FROM registry_changes WHERE registry_changes.version <= 7" in (
+        delete_query
+    )
+    assert "pruned_version=greatest(registry_version.pruned_version, 7)" in (
+        update_query
+    )
+    db_session_mock.commit.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_prune_changes_nothing_to_prune(db_session_mock: AsyncSession):
+    db_session_mock.scalar = AsyncMock(return_value=None)
+
+    assert await crud.prune_changes(db_session_mock, timedelta(days=7)) == 0
+
+    db_session_mock.execute.assert_not_called()
+    db_session_mock.commit.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_create_actors(db_session_mock: AsyncSession):
+    actor3 = Actor(id="3", name="Carol", roles=["verifier"], did="did:789")
+    duplicate_name = Actor(id="4", name="Alice", roles=["issuer"], did="did:000")
+    inserted = Mock()
+    inserted.all.return_value = [db_actor1, db_actor2]
+    db_session_mock.scalars.return_value = inserted
+    # actor3 was skipped: its DID is taken by an actor in the database
+    db_session_mock.execute.return_value = [
+        Mock(id="9", name="Dave", didcomm_invitation=None, did="did:789")
+    ]
+
+    with patch("trustregistry.crud.registry_cache.refresh", new_callable=AsyncMock):
+        created, conflicts = await crud.create_actors(
+            db_session_mock, [actor1, duplicate_name, actor2, actor3]
+        )
+
+    assert created == [db_actor1, db_actor2]
+    assert conflicts == {
+        1: "Bad request: An actor with name: `Alice` already exists in database.",
+        3: "Bad request: An actor with DID: `did:789` already exists in database.",
+    }
+    insert_query = db_session_mock.scalars.call_args.args[0]
+    sql = str(insert_query.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT DO NOTHING" in sql
+    assert "RETURNING" in sql
+    db_session_mock.scalars.assert_awaited_once()  # One statement for all actors
+    db_session_mock.commit.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_create_actors_rolls_back_on_error(db_session_mock: AsyncSession):
+    db_session_mock.scalars.side_effect = RuntimeError("Some error")
+
+    with pytest.raises(RuntimeError):
+        await crud.create_actors(db_session_mock, [actor1])
+
+    db_session_mock.rollback.assert_awaited_once()
+    db_session_mock.commit.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_create_schemas(db_session_mock: AsyncSession):
+    schema2 = Schema(did="did123", name="schema2", version="1.0")
+    db_schema = db.Schema(**schema2.model_dump())
+    first_batch, second_batch = Mock(), Mock()
+    first_batch.all.return_value = [db_schema]  # schema1 already exists
+    second_batch.all.return_value = []  # Duplicate of schema2
+    db_session_mock.scalars.side_effect = [first_batch, second_batch]
+
+    with (
+        patch("trustregistry.crud.BULK_INSERT_SIZE", 2),
+        patch("trustregistry.crud.registry_cache.refresh", new_callable=AsyncMock),
+    ):
+        created, conflicts = await crud.create_schemas(
+            db_session_mock, [schema1, schema2, schema2]
+        )
+
+    assert created == [db_schema]
+    assert conflicts == {0: "Schema already exists.", 2: "Schema already exists."}
+    assert db_session_mock.scalars.await_count == 2  # Batches of 2 schemas
+    db_session_mock.commit.assert_awaited_once()
@@ -1,13 +1,23 @@
+import json
+from collections.abc import AsyncGenerator, Callable
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from alembic.config import Config
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from sqlalchemy import Engine
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from trustregistry import db
-from trustregistry.main import check_migrations, create_app, lifespan, root
+from shared.models.trustregistry import RegistryChanges
+from trustregistry import crud, db
+from trustregistry.main import (
+    check_migrations,
+    create_app,
+    lifespan,
+    registry_changes,
+    registry_version,
+    root,
+)
 
 
 @pytest.fixture
@@ -19,6 +29,7 @@ def db_session_mock():
     session.rollback = AsyncMock()
     session.refresh = AsyncMock()
     session.execute = AsyncMock()
+    session.scalar = AsyncMock(return_value=7)  # Registry version
     return session
 
 
@@ -117,7 +128,13 @@ async def test_lifespan_no_migrations_needed():
         patch("trustregistry.main.async_engine") as mock_async_engine,
         patch("trustregistry.main.inspect") as mock_inspect,
         patch("trustregistry.main.Config"),
+        patch("trustregistry.main.registry_cache") as mock_registry_cache,
+        patch(
+            "trustregistry.main.prune_changes_periodically", new_callable=AsyncMock
+        ) as mock_prune_changes,
     ):
+        mock_registry_cache.start = AsyncMock()
+        mock_registry_cache.stop = AsyncMock()
         mock_check_migrations.return_value = True
         mock_connection = Mock()
         mock_engine.connect.return_value.__enter__.return_value = mock_connection
@@ -132,6 +149,9 @@ async def test_lifespan_no_migrations_needed():
             pass
 
         mock_check_migrations.assert_called_once()
+        mock_registry_cache.start.assert_awaited_once()
+        mock_registry_cache.stop.assert_awaited_once()
+        mock_prune_changes.assert_called_once()
         mock_async_engine.dispose.assert_called_once()
 
 
@@ -144,7 +164,13 @@ async def test_lifespan_migrations_needed():
         patch("trustregistry.main.async_engine") as mock_async_engine,
         patch("trustregistry.main.inspect") as mock_inspect,
         patch("trustregistry.main.Config"),
+        patch("trustregistry.main.registry_cache") as mock_registry_cache,
+        patch(
+            "trustregistry.main.prune_changes_periodically", new_callable=AsyncMock
+        ) as mock_prune_changes,
     ):
+        mock_registry_cache.start = AsyncMock()
+        mock_registry_cache.stop = AsyncMock()
         mock_check_migrations.return_value = False
         mock_connection = Mock()
         mock_engine.connect.return_value.__enter__.return_value = mock_connection
@@ -160,6 +186,9 @@ async def test_lifespan_migrations_needed():
 
         mock_check_migrations.assert_called_once()
         mock_command.upgrade.assert_called_once()
+        mock_registry_cache.start.assert_awaited_once()
+        mock_registry_cache.stop.assert_awaited_once()
+        mock_prune_changes.assert_called_once()
         mock_async_engine.dispose.assert_called_once()
 
 
@@ -169,17 +198,114 @@ async def test_root(db_session_mock):  # pylint: disable=redefined-outer-name
         db.Schema(id="123", did="did:123", name="schema1", version="1.0"),
         db.Schema(id="456", did="did:123", name="schema2", version="1.0"),
     ]
-    actors = [db.Actor(id="1", name="Alice"), db.Actor(id="2", name="Bob")]
+    actors = [
+        db.Actor(id="1", name="Alice", roles=["issuer"], did="did:123"),
+        db.Actor(id="2", name="Bob", roles=["verifier"], did="did:456"),
+    ]
+
+    def stream(rows: list) -> Callable[..., AsyncGenerator]:
+        async def generator(*_, **__) -> AsyncGenerator:
+            for row in rows:
+                yield row
+
+        return generator
+
+    with (
+        patch(
+            "trustregistry.main.crud.stream_schemas", side_effect=stream(schemas)
+        ) as mock_stream_schemas,
+        patch(
+            "trustregistry.main.crud.stream_actors", side_effect=stream(actors)
+        ) as mock_stream_actors,
+    ):
+        response = await root(Mock(headers={}), db_session_mock)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+    assert json.loads(body) == {
+        "actors": [
+            {
+                "id": "1",
+                "name": "Alice",
+                "roles": ["issuer"],
+                "did": "did:123",
+                "didcomm_invitation": None,
+                "image_url": None,
+            },
+            {
+                "id": "2",
+                "name": "Bob",
+                "roles": ["verifier"],
+                "did": "did:456",
+                "didcomm_invitation": None,
+                "image_url": None,
+            },
+        ],
+        "schemas": ["123", "456"],
+    }
+
+    mock_stream_schemas.assert_called_once_with(db_session_mock, snapshot=None)
+    mock_stream_actors.assert_called_once_with(db_session_mock, snapshot=None)
+    assert response.headers["ETag"] == '"7"'
+
+
+@pytest.mark.anyio
+async def test_root_empty(db_session_mock):  # pylint: disable=redefined-outer-name
+    async def empty(*_, **__) -> AsyncGenerator:
+        for row in ():
+            yield row
+
     with (
-        patch("trustregistry.main.crud.get_schemas") as mock_get_schemas,
-        patch("trustregistry.main.crud.get_actors") as mock_get_actors,
+        patch("trustregistry.main.crud.stream_schemas", side_effect=empty),
+        patch("trustregistry.main.crud.stream_actors", side_effect=empty),
     ):
-        mock_get_schemas.return_value = schemas
-        mock_get_actors.return_value = actors
+        response = await root(Mock(headers={}), db_session_mock)
+        body = b"".join([chunk async for chunk in response.body_iterator])
 
-        response = await root(db_session_mock)
+    assert json.loads(body) == {"actors": [], "schemas": []}
+
+
+@pytest.mark.anyio
+async def test_registry_version(db_session_mock):  # pylint: disable=redefined-outer-name
+    with patch(
+        "trustregistry.main.crud.get_registry_version", return_value=42
+    ) as mock_get_registry_version:
+        assert await registry_version(db_session_mock) == {"version": 42}
 
-        assert response == {"actors": actors, "schemas": ["123", "456"]}
+    mock_get_registry_version.assert_awaited_once_with(db_session_mock)
+
+
+@pytest.mark.anyio
+async def test_root_not_modified(db_session_mock):  # pylint: disable=redefined-outer-name
+    with patch("trustregistry.main.crud.stream_actors") as mock_stream_actors:
+        response = await root(Mock(headers={"if-none-match": '"7"'}), db_session_mock)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"7"'
+    mock_stream_actors.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_registry_changes(db_session_mock):  # pylint: disable=redefined-outer-name
+    changes = RegistryChanges(
+        version=9, actors=[], deleted_actor_ids=["1"], schemas=[], deleted_schema_ids=[]
+    )
+    with patch(
+        "trustregistry.main.crud.get_changes", return_value=changes
+    ) as mock_get_changes:
+        assert await registry_changes(since=7, db_session=db_session_mock) == changes
+
+    mock_get_changes.assert_awaited_once_with(db_session_mock, 7)
+
+
+@pytest.mark.anyio
+async def test_registry_changes_unavailable(db_session_mock):  # pylint: disable=redefined-outer-name
+    with (
+        patch(
+            "trustregistry.main.crud.get_changes",
+            side_effect=crud.ChangesUnavailableError,
+        ),
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await registry_changes(since=7, db_session=db_session_mock)
 
-        mock_get_schemas.assert_called_once_with(db_session_mock)
-        mock_get_actors.assert_called_once_with(db_session_mock)
+    assert exc_info.value.status_code == 410
@@ -43,14 +43,14 @@ def test_db_actor():
     actor = db.Actor(
         id="mickey-mouse",
         name="Mickey Mouse",
-        roles="verifier, issuer",
+        roles=["verifier", "issuer"],
         didcomm_invitation="xyz",
         did="abc",
     )
 
     assert actor.id == "mickey-mouse"
     assert actor.name == "Mickey Mouse"
-    assert actor.roles == "verifier, issuer"
+    assert actor.roles == ["verifier", "issuer"]
     assert actor.didcomm_invitation == "xyz"
     assert actor.did == "abc"
 
@@ -1,10 +1,13 @@
+import json
+from collections.abc import AsyncGenerator
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.models.trustregistry import Actor
+from shared.models.trustregistry import Actor, BulkActorsResult, BulkConflict
 from trustregistry.crud import ActorAlreadyExistsError, ActorDoesNotExistError
 from trustregistry.registry import registry_actors
 
@@ -18,22 +21,96 @@ def db_session_mock():
     session.rollback = AsyncMock()
     session.refresh = AsyncMock()
     session.execute = AsyncMock()
+    session.scalar = AsyncMock(return_value=7)  # Registry version
     return session
 
 
+async def read_body(response: StreamingResponse) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
 @pytest.mark.anyio
 async def test_get_actors(db_session_mock):
-    with patch("trustregistry.registry.registry_actors.crud.get_actors") as mock_crud:
-        actor = Actor(
-            id="1",
-            name="Alice",
-            roles=["issuer"],
-            did="did:123",
+    actors = [
+        Actor(id="1", name="Alice", roles=["issuer"], did="did:123"),
+        Actor(id="2", name="Bob", roles=["verifier"], did="did:456"),
+    ]
+
+    async def stream_actors(*_, **__) -> AsyncGenerator:
+        for actor in actors:
+            yield actor
+
+    with patch(
+        "trustregistry.registry.registry_actors.crud.stream_actors",
+        side_effect=stream_actors,
+    ) as mock_crud:
+        response = await registry_actors.get_actors(
+            request=Mock(headers={}),
+            role=None,
+            did_prefix=None,
+            after=None,
+            limit=None,
+            db_session=db_session_mock,
         )
+        body = await read_body(response)
+
+    mock_crud.assert_called_once_with(
+        db_session_mock, after=None, role=None, did_prefix=None, snapshot=None
+    )
+    db_session_mock.connection.assert_awaited_once_with(
+        execution_options={"isolation_level": "REPEATABLE READ"}
+    )
+    assert json.loads(body) == [actor.model_dump() for actor in actors]
+    assert response.headers["ETag"] == '"7"'
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("if_none_match", ['"7"', 'W/"7"', '"6", "7"', "*"])
+async def test_get_actors_not_modified(db_session_mock, if_none_match):
+    with patch(
+        "trustregistry.registry.registry_actors.crud.stream_actors"
+    ) as mock_crud:
+        response = await registry_actors.get_actors(
+            request=Mock(headers={"if-none-match": if_none_match}),
+            role=None,
+            did_prefix=None,
+            after=None,
+            limit=None,
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_not_called()
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"7"'
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit, next_cursor", [(1, "1"), (2, None)])
+async def test_get_actors_page(db_session_mock, limit, next_cursor):
+    actor = Actor(id="1", name="Alice", roles=["issuer"], did="did:123")
+
+    with patch("trustregistry.registry.registry_actors.crud.get_actors") as mock_crud:
         mock_crud.return_value = [actor]
-        result = await registry_actors.get_actors(db_session_mock)
-        mock_crud.assert_called_once_with(db_session_mock)
-        assert result == [actor]
+        response = await registry_actors.get_actors(
+            request=Mock(headers={}),
+            role="issuer",
+            did_prefix="did:1",
+            after="0",
+            limit=limit,
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_called_once_with(
+        db_session_mock,
+        after="0",
+        limit=limit,
+        role="issuer",
+        did_prefix="did:1",
+        snapshot=None,
+    )
+    assert json.loads(response.body) == [actor.model_dump()]
+    assert response.headers.get("X-Next-Cursor") == next_cursor
+    assert response.headers["ETag"] == '"7"'
 
 
 @pytest.mark.anyio
@@ -209,3 +286,51 @@ async def test_delete_actor_not_found(db_session_mock):
         with pytest.raises(HTTPException) as exc_info:
             await registry_actors.remove_actor("1", db_session_mock)
         assert exc_info.value.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_register_actors(db_session_mock):
+    actor = Actor(id="1", name="Alice", roles=["issuer"], did="did:123")
+    conflict = "Bad request: An actor with ID: `1` already exists in database."
+    with patch(
+        "trustregistry.registry.registry_actors.crud.create_actors",
+        return_value=([actor], {1: conflict}),
+    ) as mock_crud:
+        result = await registry_actors.register_actors(
+            actors=[actor, actor], db_session=db_session_mock
+        )
+
+    mock_crud.assert_awaited_once_with(db_session_mock, actors=[actor, actor])
+    assert result == BulkActorsResult(
+        created=[actor], conflicts=[BulkConflict(index=1, detail=conflict)]
+    )
+
+
+@pytest.mark.anyio
+async def test_register_actors_too_many(db_session_mock):
+    actor = Actor(id="1", name="Alice", roles=["issuer"], did="did:123")
+    with (
+        patch("trustregistry.registry.registry_actors.MAX_BULK_SIZE", 1),
+        patch("trustregistry.registry.registry_actors.crud.create_actors") as mock_crud,
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await registry_actors.register_actors(
+            actors=[actor, actor], db_session=db_session_mock
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_crud.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_register_actors_exception(db_session_mock):
+    with (
+        patch(
+            "trustregistry.registry.registry_actors.crud.create_actors",
+            side_effect=RuntimeError("Some error"),
+        ),
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await registry_actors.register_actors(actors=[], db_session=db_session_mock)
+
+    assert exc_info.value.status_code == 500
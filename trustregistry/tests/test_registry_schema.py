@@ -1,10 +1,13 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi.exceptions import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.models.trustregistry import Schema
+from shared.models.trustregistry import BulkConflict, BulkSchemasResult, Schema
 from trustregistry.crud import SchemaAlreadyExistsError, SchemaDoesNotExistError
 from trustregistry.registry import registry_schemas
 
@@ -18,22 +21,117 @@ def db_session_mock():
     session.rollback = AsyncMock()
     session.refresh = AsyncMock()
     session.execute = AsyncMock()
+    session.scalar = AsyncMock(return_value=7)  # Registry version
     return session
 
 
 @pytest.mark.anyio
 async def test_get_schemas(db_session_mock):
-    with patch("trustregistry.registry.registry_schemas.crud.get_schemas") as mock_crud:
-        schema = Schema(
-            did="WgWxqztrNooG92RXvxSTWv",
+    schema = Schema(
+        did="WgWxqztrNooG92RXvxSTWv",
+        name="schema_name",
+        version="1.0",
+        id="WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0",
+    )
+
+    async def stream_schemas(*_, **__) -> AsyncGenerator:
+        yield schema
+
+    with patch(
+        "trustregistry.registry.registry_schemas.crud.stream_schemas",
+        side_effect=stream_schemas,
+    ) as mock_crud:
+        response = await registry_schemas.get_schemas(
+            request=Mock(headers={}),
+            did_prefix=None,
             name="schema_name",
-            version="1.0",
-            id="WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0",
+            version=None,
+            after=None,
+            limit=None,
+            db_session=db_session_mock,
         )
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+    mock_crud.assert_called_once_with(
+        db_session_mock,
+        after=None,
+        did_prefix=None,
+        name="schema_name",
+        version=None,
+        snapshot=None,
+    )
+    assert json.loads(body) == [schema.model_dump()]
+    assert response.headers["ETag"] == '"7"'
+
+
+@pytest.mark.anyio
+async def test_get_schemas_page(db_session_mock):
+    schema = Schema(
+        did="WgWxqztrNooG92RXvxSTWv",
+        name="schema_name",
+        version="1.0",
+        id="WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0",
+    )
+
+    with patch("trustregistry.registry.registry_schemas.crud.get_schemas") as mock_crud:
         mock_crud.return_value = [schema]
-        result = await registry_schemas.get_schemas(db_session_mock)
-        mock_crud.assert_called_once_with(db_session_mock)
-        assert result == [schema]
+        response = await registry_schemas.get_schemas(
+            request=Mock(headers={}),
+            did_prefix="WgWx",
+            name=None,
+            version="1.0",
+            after=None,
+            limit=1,
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_called_once_with(
+        db_session_mock,
+        after=None,
+        limit=1,
+        did_prefix="WgWx",
+        name=None,
+        version="1.0",
+        snapshot=None,
+    )
+    assert json.loads(response.body) == [schema.model_dump()]
+    assert response.headers["X-Next-Cursor"] == schema.id
+    assert response.headers["ETag"] == '"7"'
+
+
+@pytest.mark.anyio
+async def test_get_schemas_not_modified(db_session_mock):
+    with patch("trustregistry.registry.registry_schemas.crud.get_schemas") as mock_crud:
+        response = await registry_schemas.get_schemas(
+            request=Mock(headers={"if-none-match": '"7"'}),
+            did_prefix=None,
+            name=None,
+            version=None,
+            after=None,
+            limit=1,
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_not_called()
+    assert response.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_get_schemas_modified(db_session_mock):
+    with patch("trustregistry.registry.registry_schemas.crud.get_schemas") as mock_crud:
+        mock_crud.return_value = []
+        response = await registry_schemas.get_schemas(
+            request=Mock(headers={"if-none-match": '"6"'}),
+            did_prefix=None,
+            name=None,
+            version=None,
+            after=None,
+            limit=1,
+            db_session=db_session_mock,
+        )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"7"'
 
 
 @pytest.mark.anyio
@@ -194,6 +292,28 @@ async def test_get_schema_not_found(db_session_mock):
         assert exc_info.value.status_code == 404
 
 
+@pytest.mark.anyio
+async def test_schemas_exist(db_session_mock):
+    with patch(
+        "trustregistry.registry.registry_schemas.crud.get_existing_schema_ids"
+    ) as mock_crud:
+        mock_crud.return_value = {"WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0"}
+        schema_ids = [
+            "WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0",
+            "WgWxqztrNooG92RXvxSTWv:2:other_schema:1.0",
+        ]
+
+        result = await registry_schemas.schemas_exist(
+            registry_schemas.SchemaIDs(schema_ids=schema_ids), db_session_mock
+        )
+
+        mock_crud.assert_called_once_with(db_session_mock, schema_ids=schema_ids)
+        assert result == {
+            "WgWxqztrNooG92RXvxSTWv:2:schema_name:1.0": True,
+            "WgWxqztrNooG92RXvxSTWv:2:other_schema:1.0": False,
+        }
+
+
 @pytest.mark.anyio
 async def test_remove_schema(db_session_mock):
     with patch(
@@ -236,3 +356,141 @@ def test_get_schema_attrs():
     )
     result = registry_schemas._get_schema_attrs(cheqd_schema_id)
     assert result == []
+
+
+@pytest.mark.parametrize(
+    "schema_id", ["schema_name", "did:schema_name:1.0", "did:3:schema_name:1.0"]
+)
+def test_get_schema_attrs_invalid(schema_id):
+    with pytest.raises(HTTPException) as exc_info:
+        registry_schemas._get_schema_attrs(
+            registry_schemas.SchemaID(schema_id=schema_id)
+        )
+
+    assert exc_info.value.status_code == 422
+    assert schema_id in exc_info.value.detail
+
+
+@pytest.mark.anyio
+async def test_register_schema_invalid_id(db_session_mock):
+    with (
+        patch(
+            "trustregistry.registry.registry_schemas.crud.create_schema"
+        ) as mock_crud,
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await registry_schemas.register_schema(
+            registry_schemas.SchemaID(schema_id="did:schema_name:1.0"), db_session_mock
+        )
+
+    assert exc_info.value.status_code == 422
+    mock_crud.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_register_schemas_invalid_id(db_session_mock):
+    schema = Schema(did="did", name="name", version="1.0")
+    with patch(
+        "trustregistry.registry.registry_schemas.crud.create_schemas",
+        return_value=([schema], {}),
+    ) as mock_crud:
+        result = await registry_schemas.register_schemas(
+            schema_ids=registry_schemas.SchemaIDs(schema_ids=["bad_id", schema.id]),
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_awaited_once_with(db_session_mock, schemas=[schema])
+    assert result.failed == [
+        BulkConflict(
+            index=0,
+            detail="Invalid schema id `bad_id`: expected the format "
+            "`did:2:name:version`.",
+        )
+    ]
+
+
+@pytest.mark.anyio
+async def test_register_schemas(db_session_mock):
+    schema = Schema(did="did", name="name", version="1.0")
+    with patch(
+        "trustregistry.registry.registry_schemas.crud.create_schemas",
+        return_value=([schema], {1: "Schema already exists."}),
+    ) as mock_crud:
+        result = await registry_schemas.register_schemas(
+            schema_ids=registry_schemas.SchemaIDs(schema_ids=[schema.id, schema.id]),
+            db_session=db_session_mock,
+        )
+
+    mock_crud.assert_awaited_once_with(db_session_mock, schemas=[schema, schema])
+    assert result == BulkSchemasResult(
+        created=[schema],
+        conflicts=[BulkConflict(index=1, detail="Schema already exists.")],
+    )
+
+
+@pytest.mark.anyio
+async def test_register_schemas_cheqd(db_session_mock):
+    schema = Schema(did="did", name="name", version="1.0")
+    cheqd_ids = [f"did:cheqd:testnet:{i}" for i in range(4)]
+    resolving = 0
+    max_resolving = 0
+
+    async def resolve(schema_id: str) -> dict:
+        nonlocal resolving, max_resolving
+        resolving += 1
+        max_resolving = max(max_resolving, resolving)
+        await asyncio.sleep(0)
+        resolving -= 1
+        if schema_id == cheqd_ids[1]:
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"did": schema_id, "name": "cheqd", "version": "1.0"}
+
+    with (
+        patch(
+            "trustregistry.registry.registry_schemas.resolve_cheqd_schema",
+            side_effect=resolve,
+        ),
+        patch("trustregistry.registry.registry_schemas.CHEQD_RESOLVE_CONCURRENCY", 2),
+        patch(
+            "trustregistry.registry.registry_schemas.crud.create_schemas",
+            return_value=([schema], {2: "Schema already exists."}),
+        ) as mock_crud,
+    ):
+        result = await registry_schemas.register_schemas(
+            schema_ids=registry_schemas.SchemaIDs(schema_ids=[schema.id, *cheqd_ids]),
+            db_session=db_session_mock,
+        )
+
+    assert max_resolving == 2
+    resolved = mock_crud.call_args.kwargs["schemas"]
+    assert [schema.id for schema in resolved] == [
+        schema.id,
+        cheqd_ids[0],
+        cheqd_ids[2],
+        cheqd_ids[3],
+    ]
+    # Indexes are those of the request
+    assert result.conflicts == [BulkConflict(index=3, detail="Schema already exists.")]
+    assert result.failed == [
+        BulkConflict(index=2, detail="Could not resolve schema: Not found")
+    ]
+
+
+@pytest.mark.anyio
+async def test_register_schemas_too_many(db_session_mock):
+    with (
+        patch("trustregistry.registry.registry_schemas.MAX_BULK_SIZE", 1),
+        patch(
+            "trustregistry.registry.registry_schemas.crud.create_schemas"
+        ) as mock_crud,
+        pytest.raises(HTTPException) as exc_info,
+    ):
+        await registry_schemas.register_schemas(
+            schema_ids=registry_schemas.SchemaIDs(
+                schema_ids=["a:2:s:1.0", "b:2:s:1.0"]
+            ),
+            db_session=db_session_mock,
+        )
+
+    assert exc_info.value.status_code == 400
+    mock_crud.assert_not_called()
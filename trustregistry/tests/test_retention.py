@@ -0,0 +1,32 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from trustregistry.retention import prune_changes_periodically
+
+
+@pytest.mark.anyio
+async def test_prune_changes_periodically():
+    with (
+        patch("trustregistry.retention.AsyncSessionLocal"),
+        patch(
+            "trustregistry.retention.crud.prune_changes",
+            new_callable=AsyncMock,
+            side_effect=[Exception("Database unavailable"), 3],
+        ) as mock_prune_changes,
+        patch("trustregistry.retention.TRUST_REGISTRY_CHANGES_RETENTION", 60),
+        patch(
+            "trustregistry.retention.asyncio.sleep",
+            new_callable=AsyncMock,
+            side_effect=[None, asyncio.CancelledError],
+        ) as mock_sleep,
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            await prune_changes_periodically()
+
+    # Pruning goes on after an error
+    assert mock_prune_changes.await_count == 2
+    assert mock_prune_changes.call_args.args[1] == timedelta(seconds=60)
+    assert mock_sleep.await_count == 2
@@ -0,0 +1,238 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from trustregistry import db
+from trustregistry.snapshot import RegistryCache, RegistrySnapshot
+
+# pylint: disable=redefined-outer-name
+
+actors = [
+    db.Actor(id="1", name="Alice", roles=["issuer"], did="did:cheqd:1"),
+    db.Actor(id="2", name="Bob", roles=["verifier"], did="did:sov:2"),
+    db.Actor(id="3", name="Carol", roles=["issuer", "verifier"], did="did:cheqd:3"),
+]
+schemas = [
+    db.Schema(id="did:cheqd:1:2:a:1.0", did="did:cheqd:1", name="a", version="1.0"),
+    db.Schema(id="did:cheqd:1:2:a:2.0", did="did:cheqd:1", name="a", version="2.0"),
+    db.Schema(id="did:sov:2:2:b:1.0", did="did:sov:2", name="b", version="1.0"),
+]
+
+
+@pytest.fixture
+def snapshot() -> RegistrySnapshot:
+    return RegistrySnapshot(version=7, actors=actors, schemas=schemas)
+
+
+def test_snapshot_indexes(snapshot: RegistrySnapshot):
+    assert snapshot.actors_by_id["2"] is actors[1]
+    assert snapshot.actors_by_did["did:cheqd:3"] is actors[2]
+    assert snapshot.actors_by_name["Alice"] is actors[0]
+    assert snapshot.schemas_by_id["did:sov:2:2:b:1.0"] is schemas[2]
+
+
+def test_snapshot_actors_page(snapshot: RegistrySnapshot):
+    assert snapshot.actors_page(after=None, limit=2) == actors[:2]
+    assert snapshot.actors_page(after="2", limit=2) == actors[2:]
+    assert snapshot.actors_page(after="1", limit=10, role="issuer") == [actors[2]]
+    assert snapshot.actors_page(after=None, limit=10, did_prefix="did:sov:") == [
+        actors[1]
+    ]
+
+
+def test_snapshot_schemas_page(snapshot: RegistrySnapshot):
+    assert snapshot.schemas_page(after=None, limit=1) == schemas[:1]
+    assert snapshot.schemas_page(after=schemas[0].id, limit=10) == schemas[1:]
+    assert snapshot.schemas_page(after=None, limit=10, name="a", version="2.0") == [
+        schemas[1]
+    ]
+    assert snapshot.schemas_page(after=None, limit=10, did_prefix="did:sov:") == [
+        schemas[2]
+    ]
+
+
+def test_snapshot_apply(snapshot: RegistrySnapshot):
+    renamed = db.Actor(id="2", name="Bobby", roles=["verifier"], did="did:sov:22")
+    added = db.Actor(id="15", name="Dave", roles=["issuer"], did="did:cheqd:15")
+    added_schema = db.Schema(
+        id="did:cheqd:1:2:a:1.5", did="did:cheqd:1", name="a", version="1.5"
+    )
+
+    updated = snapshot.apply(
+        version=9,
+        changed_actor_ids={"2", "3", "15"},
+        actors=[renamed, added],
+        changed_schema_ids={"did:sov:2:2:b:1.0", added_schema.id},
+        schemas=[added_schema],
+    )
+
+    assert updated.version == 9
+    assert updated.actors == [actors[0], added, renamed]
+    assert updated.actor_ids == ["1", "15", "2"]
+    assert updated.actors_by_id == {"1": actors[0], "15": added, "2": renamed}
+    assert set(updated.actors_by_did) == {"did:cheqd:1", "did:cheqd:15", "did:sov:22"}
+    assert set(updated.actors_by_name) == {"Alice", "Dave", "Bobby"}
+    assert updated.schemas == [schemas[0], added_schema, schemas[1]]
+    assert list(updated.schemas_by_id) == [
+        schemas[0].id,
+        schemas[1].id,
+        added_schema.id,
+    ]
+    # The previous snapshot is unchanged
+    assert snapshot.version == 7
+    assert snapshot.actors == actors
+    assert snapshot.actors_by_did["did:sov:2"] is actors[1]
+    assert snapshot.schemas == schemas
+
+
+def mock_session_factory(session: Mock) -> Mock:
+    session.connection = AsyncMock()
+    factory = Mock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    factory.return_value.__aexit__ = AsyncMock(return_value=None)
+    return factory
+
+
+@pytest.mark.anyio
+async def test_load_applies_changes(snapshot: RegistrySnapshot):
+    removed = db.Actor(id="4", name="Eve", roles=["issuer"], did="did:cheqd:4")
+    cache = RegistryCache()
+    cache.snapshot = snapshot.apply(
+        version=7,
+        changed_actor_ids=set(),
+        actors=[removed],
+        changed_schema_ids=set(),
+        schemas=[],
+    )
+    renamed = db.Actor(id="2", name="Bobby", roles=["verifier"], did="did:sov:2")
+    session = Mock()
+    session.scalar = AsyncMock(side_effect=[9, 3])  # Version and pruned version
+    session.execute = AsyncMock(return_value=[("actors", "2"), ("actors", "4")])
+    session.scalars = AsyncMock(return_value=[renamed])
+
+    with patch(
+        "trustregistry.snapshot.AsyncSessionLocal", mock_session_factory(session)
+    ):
+        updated = await cache._load()  # pylint: disable=protected-access
+
+    assert updated.version == 9
+    assert updated.actors == [actors[0], renamed, actors[2]]
+    assert updated.schemas == schemas
+    # Only the changed actors are read
+    session.scalars.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "pruned_version, changes",
+    [(8, [("actors", "2")]), (0, [("actors", "2"), ("schemas", None)])],
+)
+async def test_load_reloads_without_changes(
+    snapshot: RegistrySnapshot, pruned_version, changes
+):
+    cache = RegistryCache()
+    cache.snapshot = snapshot
+    session = Mock()
+    session.scalar = AsyncMock(side_effect=[9, pruned_version])
+    session.execute = AsyncMock(return_value=changes)
+    session.scalars = AsyncMock(side_effect=[actors[:1], schemas[:1]])
+
+    with patch(
+        "trustregistry.snapshot.AsyncSessionLocal", mock_session_factory(session)
+    ):
+        reloaded = await cache._load()  # pylint: disable=protected-access
+
+    assert reloaded.version == 9
+    assert reloaded.actors == actors[:1]
+    assert reloaded.schemas == schemas[:1]
+
+
+@pytest.mark.anyio
+async def test_listen_reconnects_after_termination():
+    cache = RegistryCache()
+    cache._started = True  # pylint: disable=protected-access
+    listen_connection = AsyncMock()
+    cache._listen_connection = listen_connection  # pylint: disable=protected-access
+
+    with (
+        patch.object(
+            cache, "_listen", AsyncMock(side_effect=[Exception("down"), None])
+        ) as mock_listen,
+        patch.object(cache, "refresh", AsyncMock()) as mock_refresh,
+        patch(
+            "trustregistry.snapshot.asyncio.sleep", new_callable=AsyncMock
+        ) as mock_sleep,
+    ):
+        cache._on_listen_terminated(Mock())  # pylint: disable=protected-access
+        await asyncio.gather(*cache._tasks)  # pylint: disable=protected-access
+
+    listen_connection.invalidate.assert_awaited_once()
+    assert mock_listen.await_count == 2
+    assert [call.args[0] for call in mock_sleep.await_args_list] == [1, 2]
+    # Changes may have been missed while not listening
+    mock_refresh.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_refresh_not_started():
+    cache = RegistryCache()
+    with patch.object(cache, "_load", AsyncMock()) as mock_load:
+        await cache.refresh()
+
+    mock_load.assert_not_awaited()
+    assert cache.snapshot is None
+
+
+@pytest.mark.anyio
+async def test_refresh_coalesces_concurrent_calls(snapshot: RegistrySnapshot):
+    cache = RegistryCache()
+    cache._started = True  # pylint: disable=protected-access
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load() -> RegistrySnapshot:
+        loading.set()
+        await release.wait()
+        return snapshot
+
+    with patch.object(cache, "_load", AsyncMock(side_effect=load)) as mock_load:
+        first = asyncio.create_task(cache.refresh())
+        await loading.wait()
+        # Requested while the first reload is running: needs one more reload
+        waiting = [asyncio.create_task(cache.refresh()) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *waiting)
+
+    assert mock_load.await_count == 2
+    assert cache.snapshot is snapshot
+
+
+@pytest.mark.anyio
+async def test_refresh_keeps_snapshot_on_error(snapshot: RegistrySnapshot):
+    cache = RegistryCache()
+    cache._started = True  # pylint: disable=protected-access
+    cache.snapshot = snapshot
+
+    with patch.object(cache, "_load", AsyncMock(side_effect=Exception("down"))):
+        await cache.refresh()
+
+    assert cache.snapshot is snapshot
+
+
+@pytest.mark.anyio
+async def test_start_and_stop(snapshot: RegistrySnapshot):
+    cache = RegistryCache()
+
+    with (
+        patch.object(cache, "_load", AsyncMock(return_value=snapshot)),
+        patch.object(cache, "_listen", AsyncMock(side_effect=Exception("no listen"))),
+    ):
+        await cache.start()
+        assert cache.snapshot is snapshot
+
+        await cache.stop()
+
+    assert cache.snapshot is None
+    assert not cache._tasks  # pylint: disable=protected-access
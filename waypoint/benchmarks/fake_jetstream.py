@@ -0,0 +1,280 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import SimpleNamespace
+
+from nats.js.api import ConsumerConfig, DeliverPolicy
+from nats.js.errors import FetchTimeoutError
+
+
+def subject_matches(filter_subject: str, subject: str) -> bool:
+    """Match a subject against a NATS filter subject with `*` and `>` wildcards."""
+    filter_tokens = filter_subject.split(".")
+    tokens = subject.split(".")
+    for i, filter_token in enumerate(filter_tokens):
+        if filter_token == ">":
+            return len(tokens) > i
+        if i >= len(tokens) or filter_token not in ("*", tokens[i]):
+            return False
+    return len(tokens) == len(filter_tokens)
+
+
+class _Node:
+    __slots__ = ("children", "subscriptions", "tail_subscriptions")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.subscriptions: set[FakePullSubscription] = set()
+        self.tail_subscriptions: set[FakePullSubscription] = set()  # `>` filters
+
+
+class Sublist:
+    """Trie of filter subjects, to find the consumers of a subject without
+    matching it against every filter (like the sublist of nats-server).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty sublist."""
+        self._root = _Node()
+
+    def insert(self, filter_subject: str, subscription: "FakePullSubscription") -> None:
+        node = self._root
+        for token in filter_subject.split("."):
+            if token == ">":
+                node.tail_subscriptions.add(subscription)
+                return
+            node = node.children.setdefault(token, _Node())
+        node.subscriptions.add(subscription)
+
+    def remove(self, filter_subject: str, subscription: "FakePullSubscription") -> None:
+        node: _Node | None = self._root
+        for token in filter_subject.split("."):
+            if node is None:
+                return
+            if token == ">":
+                node.tail_subscriptions.discard(subscription)
+                return
+            node = node.children.get(token)
+        if node is not None:
+            node.subscriptions.discard(subscription)
+
+    def match(self, subject: str) -> set["FakePullSubscription"]:
+        result: set[FakePullSubscription] = set()
+        self._match(self._root, subject.split("."), 0, result)
+        return result
+
+    def _match(
+        self,
+        node: _Node,
+        tokens: list[str],
+        i: int,
+        result: set["FakePullSubscription"],
+    ) -> None:
+        if i == len(tokens):
+            result.update(node.subscriptions)
+            return
+        result.update(node.tail_subscriptions)
+        for token in (tokens[i], "*"):
+            child = node.children.get(token)
+            if child is not None:
+                self._match(child, tokens, i + 1, result)
+
+
+@dataclass
+class FakeSequencePair:
+    consumer: int
+    stream: int
+
+
+@dataclass
+class FakeMetadata:
+    sequence: FakeSequencePair
+    num_pending: int
+    timestamp: float
+
+
+@dataclass
+class FakeMsg:
+    """A stored message, as returned by a fetch."""
+
+    subject: str
+    data: bytes
+    headers: dict[str, str] | None
+    metadata: FakeMetadata
+
+    async def ack(self) -> None:
+        pass
+
+
+@dataclass
+class _StoredMessage:
+    sequence: int
+    subject: str
+    data: bytes
+    headers: dict[str, str] | None
+    timestamp: float = field(default_factory=time.time)
+
+
+class FakeStream:
+    """An in-memory stream, holding messages published on its subjects."""
+
+    def __init__(self, name: str, subjects: list[str]) -> None:
+        """Initialize an empty stream."""
+        self.name = name
+        self.subjects = subjects
+        self.messages: list[_StoredMessage] = []
+
+    def first_index(self, config: ConsumerConfig) -> int:
+        """Index of the first message to deliver for a consumer's deliver policy."""
+        if config.deliver_policy == DeliverPolicy.NEW:
+            return len(self.messages)
+        if config.deliver_policy == DeliverPolicy.BY_START_SEQUENCE:
+            return max((config.opt_start_seq or 1) - 1, 0)
+        if config.deliver_policy == DeliverPolicy.BY_START_TIME:
+            start_time = datetime.fromisoformat(
+                str(config.opt_start_time).rstrip("Z")
+            ).timestamp()
+            for i, message in enumerate(self.messages):
+                if message.timestamp >= start_time:
+                    return i
+            return len(self.messages)
+        return 0
+
+
+class FakePullSubscription:
+    """A pull consumer on a FakeStream.
+
+    Messages matching the filter subjects are queued on the consumer when they
+    are published, so fetching does not scan the messages of other subjects.
+    """
+
+    def __init__(
+        self,
+        jetstream: "FakeJetStream",
+        stream: FakeStream,
+        filter_subjects: list[str],
+        config: ConsumerConfig,
+    ) -> None:
+        """Initialize a consumer at the position given by its deliver policy."""
+        self._jetstream = jetstream
+        self.stream = stream
+        self.filter_subjects = filter_subjects
+        self._pending: deque[_StoredMessage] = deque(
+            message
+            for message in stream.messages[stream.first_index(config) :]
+            if self.matches(message.subject)
+        )
+        self._delivered = 0
+        self._new_messages = asyncio.Event()
+
+    def matches(self, subject: str) -> bool:
+        return any(subject_matches(f, subject) for f in self.filter_subjects)
+
+    def deliver(self, message: _StoredMessage) -> None:
+        self._pending.append(message)
+        self._new_messages.set()
+
+    async def fetch(
+        self,
+        batch: int = 1,
+        timeout: float | None = 5,  # noqa: ASYNC109 (as in PullSubscription.fetch)
+        heartbeat: float | None = None,
+    ) -> list[FakeMsg]:
+        if not self._pending:
+            self._new_messages.clear()
+            try:
+                await asyncio.wait_for(self._new_messages.wait(), timeout or 5)
+            except TimeoutError as e:
+                raise FetchTimeoutError from e
+
+        messages: list[FakeMsg] = []
+        while self._pending and len(messages) < batch:
+            message = self._pending.popleft()
+            self._delivered += 1
+            messages.append(
+                FakeMsg(
+                    subject=message.subject,
+                    data=message.data,
+                    headers=message.headers,
+                    metadata=FakeMetadata(
+                        sequence=FakeSequencePair(
+                            consumer=self._delivered, stream=message.sequence
+                        ),
+                        num_pending=0,  # Set below, once the batch is complete
+                        timestamp=message.timestamp,
+                    ),
+                )
+            )
+        for i, fake_msg in enumerate(reversed(messages)):
+            fake_msg.metadata.num_pending = len(self._pending) + i
+        return messages
+
+    async def unsubscribe(self) -> None:
+        self._jetstream.remove_subscription(self)
+
+
+class FakeJetStream:
+    """In-memory stand-in for the parts of JetStreamContext used by waypoint.
+
+    Messages published on a stream's subjects are stored, and pull consumers
+    read them according to their deliver policy and filter subjects. Waiting
+    fetches are woken up when a matching message is published.
+    """
+
+    def __init__(self, streams: dict[str, list[str]]) -> None:
+        """Initialize the streams, as a mapping of stream name to subjects."""
+        self.streams = {
+            name: FakeStream(name, subjects) for name, subjects in streams.items()
+        }
+        self.subscriptions: set[FakePullSubscription] = set()
+        self.consumers_created = 0
+        self._sublist = Sublist()
+
+    async def pull_subscribe(
+        self,
+        subject: str,
+        durable: str | None = None,
+        stream: str | None = None,
+        config: ConsumerConfig | None = None,
+    ) -> FakePullSubscription:
+        config = config or ConsumerConfig()
+        fake_stream = self.streams[stream] if stream else self._find_stream(subject)
+        subscription = FakePullSubscription(
+            self, fake_stream, config.filter_subjects or [subject], config
+        )
+        self.subscriptions.add(subscription)
+        for filter_subject in subscription.filter_subjects:
+            self._sublist.insert(filter_subject, subscription)
+        self.consumers_created += 1
+        return subscription
+
+    def remove_subscription(self, subscription: FakePullSubscription) -> None:
+        self.subscriptions.discard(subscription)
+        for filter_subject in subscription.filter_subjects:
+            self._sublist.remove(filter_subject, subscription)
+
+    def publish(
+        self, subject: str, data: bytes, headers: dict[str, str] | None = None
+    ) -> int:
+        """Store a message and wake up the consumers it matches."""
+        fake_stream = self._find_stream(subject)
+        sequence = len(fake_stream.messages) + 1
+        message = _StoredMessage(sequence, subject, data, headers)
+        fake_stream.messages.append(message)
+        for subscription in self._sublist.match(subject):
+            if subscription.stream is fake_stream:
+                subscription.deliver(message)
+        return sequence
+
+    async def account_info(self) -> SimpleNamespace:
+        return SimpleNamespace(
+            streams=len(self.streams), consumers=len(self.subscriptions)
+        )
+
+    def _find_stream(self, subject: str) -> FakeStream:
+        for fake_stream in self.streams.values():
+            if any(subject_matches(s, subject) for s in fake_stream.subjects):
+                return fake_stream
+        raise ValueError(f"No stream for subject {subject}")
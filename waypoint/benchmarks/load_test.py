@@ -0,0 +1,229 @@
+"""Load test waypoint against an in-process fake JetStream.
+
+Opens N concurrent SSE waiters through the router's event stream generator,
+publishes a short lifecycle of state events for each waiter, and reports
+events/sec, time-to-match percentiles, consumer creation rate and memory per
+open stream.
+
+Usage:
+    LOG_LEVEL=WARNING python -m waypoint.benchmarks.load_test --waiters 100 1000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+import orjson
+from uuid_utils import uuid4
+
+from shared.constants import NATS_STATE_STREAM, NATS_STATE_SUBJECT
+from waypoint.benchmarks.fake_jetstream import FakeJetStream
+from waypoint.routers.sse import nats_event_stream_generator
+from waypoint.services.nats_dispatcher import NatsEventsDispatcher
+from waypoint.services.nats_service import NatsEventsProcessor
+
+GROUP_ID = "benchmark"
+TOPIC = "credentials"
+FIELD = "thread_id"
+DESIRED_STATE = "done"
+LIFECYCLE = ("offer-sent", "request-received", DESIRED_STATE)
+LOOK_BACK = 5
+
+
+@dataclass
+class LoadTestResult:
+    mode: str
+    waiters: int
+    consumers_created: int
+    setup_seconds: float
+    events_published: int
+    run_seconds: float
+    time_to_match: list[float] = field(default_factory=list)
+    memory_per_stream: float | None = None
+
+    @property
+    def matched(self) -> int:
+        return len(self.time_to_match)
+
+    @property
+    def consumer_creation_rate(self) -> float:
+        return self.consumers_created / self.setup_seconds if self.setup_seconds else 0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events_published / self.run_seconds if self.run_seconds else 0
+
+    def percentile(self, pct: float) -> float:
+        if not self.time_to_match:
+            return float("nan")
+        values = sorted(self.time_to_match)
+        return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+    def summary(self) -> str:
+        memory = (
+            f"{self.memory_per_stream / 1024:.1f} KiB"
+            if self.memory_per_stream is not None
+            else "-"
+        )
+        return (
+            f"{self.mode:<12} {self.waiters:>7} {self.matched:>7} "
+            f"{self.consumers_created:>9} "
+            f"{self.events_per_second:>12.0f} "
+            f"{self.percentile(50) * 1000:>9.2f} {self.percentile(99) * 1000:>9.2f} "
+            f"{self.consumer_creation_rate:>12.0f} {memory:>12}"
+        )
+
+
+SUMMARY_HEADER = (
+    f"{'mode':<12} {'waiters':>7} {'matched':>7} {'consumers':>9} {'events/s':>12} "
+    f"{'p50 ms':>9} {'p99 ms':>9} {'consumers/s':>12} {'mem/stream':>12}"
+)
+
+
+def state_event(wallet_id: str, thread_id: str, state: str) -> tuple[str, bytes, dict]:
+    """Return the subject, data and headers of a state monitoring event."""
+    data = orjson.dumps(
+        {
+            "wallet_id": wallet_id,
+            "group_id": GROUP_ID,
+            "origin": "multitenant",
+            "topic": TOPIC,
+            "payload": {FIELD: thread_id, "state": state},
+        }
+    )
+    headers = {"event_topic": TOPIC, "event_payload_state": state}
+    subject = f"{NATS_STATE_SUBJECT}.{GROUP_ID}.{wallet_id}.{TOPIC}.{state}"
+    return subject, data, headers
+
+
+async def run_load_test(
+    waiters: int,
+    *,
+    fanout: bool = False,
+    measure_memory: bool = True,
+    max_duration: float = 120,
+) -> LoadTestResult:
+    """Open `waiters` concurrent streams and publish a lifecycle for each."""
+    jetstream = FakeJetStream({NATS_STATE_STREAM: [f"{NATS_STATE_SUBJECT}.*.*.>"]})
+    dispatcher = None
+    if fanout:
+        dispatcher = NatsEventsDispatcher(jetstream)  # type: ignore[arg-type]
+        await dispatcher.start()
+        # Nothing was published before, so the cache covers the look-back window
+        dispatcher.replay_cache.start(now=time.time() - LOOK_BACK)
+    processor = NatsEventsProcessor(jetstream, dispatcher=dispatcher)  # type: ignore[arg-type]
+
+    wallet_ids = [str(uuid4()) for _ in range(waiters)]
+    thread_ids = [str(uuid4()) for _ in range(waiters)]
+    published_at: dict[int, float] = {}
+    matched_at: dict[int, float] = {}
+
+    async def wait_for_event(i: int) -> None:
+        async for _ in nats_event_stream_generator(
+            nats_processor=processor,
+            stop_event=asyncio.Event(),
+            wallet_id=wallet_ids[i],
+            topic=TOPIC,
+            field=FIELD,
+            field_id=thread_ids[i],
+            desired_state=DESIRED_STATE,
+            group_id=GROUP_ID,
+            look_back=LOOK_BACK,
+        ):
+            matched_at[i] = time.perf_counter()
+
+    def ready() -> bool:
+        if dispatcher:
+            return dispatcher.waiters_count >= waiters
+        return jetstream.consumers_created >= waiters
+
+    if measure_memory:
+        tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+
+    consumers_before = jetstream.consumers_created
+    setup_started = time.perf_counter()
+    tasks = [asyncio.create_task(wait_for_event(i)) for i in range(waiters)]
+    while not ready():  # noqa: ASYNC110 (waiters don't signal that they are ready)
+        await asyncio.sleep(0.001)
+    setup_seconds = time.perf_counter() - setup_started
+    consumers_created = jetstream.consumers_created - consumers_before
+
+    memory_per_stream = None
+    if measure_memory:
+        memory_per_stream = (tracemalloc.get_traced_memory()[0] - memory_before) / (
+            waiters
+        )
+        tracemalloc.stop()
+
+    events_published = 0
+    run_started = time.perf_counter()
+    for state in LIFECYCLE:
+        for i in range(waiters):
+            subject, data, headers = state_event(wallet_ids[i], thread_ids[i], state)
+            jetstream.publish(subject, data, headers)
+            events_published += 1
+            if state == DESIRED_STATE:
+                published_at[i] = time.perf_counter()
+            if events_published % 100 == 0:
+                await asyncio.sleep(0)  # Let waiters consume while publishing
+
+    _, pending = await asyncio.wait(tasks, timeout=max_duration)
+    run_seconds = time.perf_counter() - run_started
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if dispatcher:
+        await dispatcher.stop()
+
+    return LoadTestResult(
+        mode="fanout" if fanout else "per-request",
+        waiters=waiters,
+        consumers_created=consumers_created,
+        setup_seconds=setup_seconds,
+        events_published=events_published,
+        run_seconds=run_seconds,
+        time_to_match=[matched_at[i] - published_at[i] for i in matched_at],
+        memory_per_stream=memory_per_stream,
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    sys.stdout.write(SUMMARY_HEADER + "\n")
+    for mode in args.mode:
+        for waiters in args.waiters:
+            result = await run_load_test(
+                waiters,
+                fanout=mode == "fanout",
+                measure_memory=not args.no_memory,
+                max_duration=args.max_duration,
+            )
+            sys.stdout.write(result.summary() + "\n")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--waiters", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--mode",
+        nargs="+",
+        choices=["per-request", "fanout"],
+        default=["per-request", "fanout"],
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip memory tracing, which slows down consumer creation",
+    )
+    parser.add_argument(
+        "--max-duration",
+        type=float,
+        default=120,
+        help="Seconds to wait for all waiters to match, per run",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -6,7 +6,8 @@ from typing import Any
 
 from dependency_injector.wiring import Provide, inject
 from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from scalar_fastapi import get_scalar_api_reference
 
 from shared.constants import PROJECT_VERSION
@@ -30,7 +31,8 @@ async def app_lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
 
     container.wire(modules=[__name__, sse])
 
-    await container.nats_events_processor()  # type: ignore
+    nats_events_processor = await container.nats_events_processor()  # type: ignore
+    await nats_events_processor.check_state_index()
 
     yield
 
@@ -78,6 +80,11 @@ async def health_live() -> dict[str, str]:
     return {"status": "live"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/health/ready")
 @inject
 async def health_ready(
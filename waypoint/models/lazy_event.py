@@ -0,0 +1,126 @@
+from typing import Any
+
+import orjson
+
+from shared.constants import (
+    NATS_STATE_INDEX_SUBJECT,
+    NATS_STATE_PARTITION_SUBJECT,
+    NATS_STATE_SUBJECT,
+)
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from waypoint.services.metrics import EVENTS_DECODED
+
+# The event pipelines publish "None" for payload fields that are not set
+ABSENT_HEADER_VALUE = "None"
+
+# State subjects are `<prefix>.<group_id>.<wallet_id>.<topic>.<state>[...]`. The
+# partition subject has a partition token in front of the group id.
+SUBJECT_PREFIXES = {
+    f"{NATS_STATE_SUBJECT}.": 0,
+    f"{NATS_STATE_INDEX_SUBJECT}.": 0,
+    f"{NATS_STATE_PARTITION_SUBJECT}.": 1,
+}
+
+
+def subject_routing_fields(subject: str | None) -> tuple[str, str, str] | None:
+    """Return the group_id, wallet_id and topic tokens of a state subject."""
+    if not subject:
+        return None
+    for prefix, offset in SUBJECT_PREFIXES.items():
+        if subject.startswith(prefix):
+            tokens = subject[len(prefix) :].split(".")
+            if len(tokens) < offset + 4:
+                return None
+            group_id, wallet_id, topic = tokens[offset : offset + 3]
+            return group_id, wallet_id, topic
+    return None
+
+
+class LazyEvent:
+    """A NATS state event that is only decoded as far as needed.
+
+    Matching an event only needs a few routing fields. The group_id, wallet_id and
+    topic are read from the subject, and payload fields that are published as
+    `event_payload_<field>` headers from the headers, without decoding the body at
+    all. Otherwise the body is parsed once with orjson, and the pydantic model is
+    only built on request. Matched events are forwarded as the original JSON,
+    without a `model_dump_json()` round trip.
+    """
+
+    __slots__ = ("_decoded", "_model", "_routing", "data", "headers", "sequence")
+
+    def __init__(
+        self,
+        data: bytes,
+        headers: dict[str, str] | None = None,
+        sequence: int | None = None,
+        subject: str | None = None,
+    ) -> None:
+        """Wrap the raw data, headers, stream sequence and subject of a NATS message."""
+        self.data = data
+        self.headers = headers
+        self.sequence = sequence
+        self._routing = subject_routing_fields(subject)
+        self._decoded: dict[str, Any] | None = None
+        self._model: CloudApiWebhookEventGeneric | None = None
+
+    @classmethod
+    def from_model(cls, event: CloudApiWebhookEventGeneric) -> "LazyEvent":
+        lazy_event = cls(event.model_dump_json().encode())
+        lazy_event._model = event
+        return lazy_event
+
+    @property
+    def decoded(self) -> dict[str, Any]:
+        if self._decoded is None:
+            self._decoded = orjson.loads(self.data)
+            EVENTS_DECODED.inc()
+        return self._decoded
+
+    @property
+    def wallet_id(self) -> str:
+        if self._routing is not None:
+            return self._routing[1]
+        return self.decoded["wallet_id"]
+
+    @property
+    def topic(self) -> str:
+        if self._routing is not None:
+            return self._routing[2]
+        if self.headers and self.headers.get("event_topic"):
+            return self.headers["event_topic"]
+        return self.decoded["topic"]
+
+    @property
+    def group_id(self) -> str | None:
+        if self._routing is not None:
+            return self._routing[0]
+        return self.decoded.get("group_id")
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        return self.decoded.get("payload") or {}
+
+    def payload_value(self, field: str) -> object:
+        """Return a payload field, preferring the header published alongside it."""
+        if self.headers:
+            value = self.headers.get(f"event_payload_{field}")
+            if value and value != ABSENT_HEADER_VALUE:
+                return value
+        return self.payload.get(field)
+
+    def model(self) -> CloudApiWebhookEventGeneric:
+        if self._model is None:
+            self._model = CloudApiWebhookEventGeneric(**self.decoded)
+        return self._model
+
+    def json(self) -> str:
+        return self.data.decode()
+
+    def __eq__(self, other: object) -> bool:
+        """Compare events by their raw data."""
+        return isinstance(other, LazyEvent) and self.data == other.data
+
+    def __hash__(self) -> int:
+        """Hash events by their raw data."""
+        return hash(self.data)
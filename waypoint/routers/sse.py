@@ -1,14 +1,23 @@
 import asyncio
+import time
 from collections.abc import AsyncGenerator
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import BackgroundTasks, Depends, Query, Request
-from sse_starlette.sse import EventSourceResponse
+from fastapi import Depends, Header, Query
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
+from starlette.types import Message
 
 from shared import APIRouter
-from shared.constants import DISCONNECT_CHECK_PERIOD, SSE_LOOK_BACK
+from shared.constants import SSE_LOOK_BACK
 from shared.log_config import get_logger
 from waypoint.services.dependency_injection.container import Container
+from waypoint.services.metrics import (
+    EVENTS_MATCHED,
+    SSE_STREAMS_ACTIVE,
+    STREAM_ENDPOINT,
+    TIME_TO_FIRST_EVENT,
+    WAIT_ENDPOINT,
+)
 from waypoint.services.nats_service import NatsEventsProcessor
 
 logger = get_logger(__name__)
@@ -19,20 +28,28 @@ router = APIRouter(
 )
 
 
-async def check_disconnect(request: Request, stop_event: asyncio.Event) -> None:
-    """Check if the client has disconnected"""
-    while not stop_event.is_set():
-        if await request.is_disconnected():
-            logger.debug("Waypoint client disconnected")
-            stop_event.set()
-        await asyncio.sleep(DISCONNECT_CHECK_PERIOD)
+def event_source_response(
+    event_stream: AsyncGenerator, stop_event: asyncio.Event
+) -> EventSourceResponse:
+    """Stream events, setting `stop_event` when the client disconnects.
+
+    The response already listens for the ASGI `http.disconnect` message, so no
+    polling is needed to detect that a client has gone.
+    """
+
+    async def on_client_close(_: Message) -> None:
+        logger.debug("Waypoint client disconnected")
+        stop_event.set()
+
+    return EventSourceResponse(
+        event_stream, client_close_handler_callable=on_client_close
+    )
 
 
 async def nats_event_stream_generator(
     *,
     nats_processor: NatsEventsProcessor,
-    request: Request,
-    background_tasks: BackgroundTasks,
+    stop_event: asyncio.Event,
     wallet_id: str,
     topic: str,
     field: str,
@@ -43,30 +60,77 @@ async def nats_event_stream_generator(
 ) -> AsyncGenerator[str, None]:
     """Generator for NATS events."""
     logger.debug("Starting NATS event stream generator")
-    stop_event = asyncio.Event()
+    started = time.perf_counter()
 
-    async with nats_processor.process_events(
-        group_id=group_id,
-        wallet_id=wallet_id,
-        topic=topic,
-        state=desired_state,
-        stop_event=stop_event,
-        look_back=look_back,
-    ) as event_generator:
-        background_tasks.add_task(check_disconnect, request, stop_event)
+    with SSE_STREAMS_ACTIVE.labels(WAIT_ENDPOINT).track_inprogress():
+        async with nats_processor.process_events(
+            group_id=group_id,
+            wallet_id=wallet_id,
+            topic=topic,
+            state=desired_state,
+            stop_event=stop_event,
+            look_back=look_back,
+            field=field,
+            field_id=field_id,
+        ) as event_generator:
+            async for event in event_generator:
+                if event.payload_value(field) == field_id:
+                    TIME_TO_FIRST_EVENT.labels(WAIT_ENDPOINT).observe(
+                        time.perf_counter() - started
+                    )
+                    EVENTS_MATCHED.labels(WAIT_ENDPOINT).inc()
+                    event_json = event.json()
+                    logger.trace("Event found yielding event {}", event_json)
+                    yield event_json
+                    stop_event.set()
+                    break
+
+
+async def nats_event_stream(
+    *,
+    nats_processor: NatsEventsProcessor,
+    stop_event: asyncio.Event,
+    wallet_id: str,
+    topic: str,
+    field: str | None = None,
+    field_ids: list[str] | None = None,
+    group_id: str | None = None,
+    look_back: int | None = None,
+    last_event_id: int | None = None,
+) -> AsyncGenerator[ServerSentEvent, None]:
+    """Generator for all NATS events of a wallet and topic, until disconnected."""
+    logger.debug("Starting NATS event stream")
+    wanted_ids = set(field_ids or ())
+    started: float | None = time.perf_counter()
 
-        async for event in event_generator:
-            if await request.is_disconnected():
-                logger.debug("Client disconnected")
-                stop_event.set()
-                break
+    with SSE_STREAMS_ACTIVE.labels(STREAM_ENDPOINT).track_inprogress():
+        async with nats_processor.stream_events(
+            group_id=group_id,
+            wallet_id=wallet_id,
+            topic=topic,
+            stop_event=stop_event,
+            look_back=look_back,
+            last_sequence=last_event_id,
+            # A single id can be filtered on by NATS, using the state index
+            field=field if len(wanted_ids) == 1 else None,
+            field_id=next(iter(wanted_ids)) if len(wanted_ids) == 1 else None,
+        ) as event_generator:
+            async for event in event_generator:
+                if (
+                    field
+                    and wanted_ids
+                    and event.payload_value(field) not in wanted_ids
+                ):
+                    continue
 
-            payload = event.payload
-            if payload.get(field) == field_id:
-                logger.trace("Event found yielding event {}", event)
-                yield event.model_dump_json()
-                stop_event.set()
-                break
+                if started is not None:
+                    TIME_TO_FIRST_EVENT.labels(STREAM_ENDPOINT).observe(
+                        time.perf_counter() - started
+                    )
+                    started = None
+                EVENTS_MATCHED.labels(STREAM_ENDPOINT).inc()
+                logger.trace("Streaming event {}", event.sequence)
+                yield ServerSentEvent(data=event.json(), id=str(event.sequence))
 
 
 @router.get(
@@ -83,8 +147,6 @@ async def nats_event_stream_generator(
 )
 @inject
 async def sse_wait_for_event_with_field_and_state(
-    request: Request,
-    background_tasks: BackgroundTasks,
     wallet_id: str,
     topic: str,
     field: str,
@@ -115,10 +177,10 @@ async def sse_wait_for_event_with_field_and_state(
         "waiting for payload with field-id pair and specific state"
     )
 
+    stop_event = asyncio.Event()
     event_stream = nats_event_stream_generator(
         nats_processor=nats_processor,
-        request=request,
-        background_tasks=background_tasks,
+        stop_event=stop_event,
         wallet_id=wallet_id,
         topic=topic,
         field=field,
@@ -128,4 +190,69 @@ async def sse_wait_for_event_with_field_and_state(
         look_back=look_back,
     )
 
-    return EventSourceResponse(event_stream)
+    return event_source_response(event_stream, stop_event)
+
+
+@router.get(
+    "/{wallet_id}/{topic}",
+    response_class=EventSourceResponse,
+    summary="Stream all state changes for this wallet and topic.",
+    description="""
+    The stream stays open until the client disconnects. Use `field` and one or more
+    `field_id` values to only receive events for those ids, e.g. `thread_id`.
+    Each event has the JetStream sequence as its id. Reconnect with the
+    `Last-Event-ID` header to resume after the last event received.
+    """,
+)
+@inject
+async def sse_stream_events(
+    wallet_id: str,
+    topic: str,
+    field: str | None = Query(
+        default=None, description="Payload field to filter events on"
+    ),
+    field_id: list[str] | None = Query(
+        default=None, description="Values of `field` to receive events for"
+    ),
+    group_id: str | None = Query(
+        default=None, description="Group ID to which the wallet belongs"
+    ),
+    look_back: int | None = Query(
+        default=SSE_LOOK_BACK,
+        description="Number of seconds to look back for events before subscribing",
+    ),
+    last_event_id: int | None = Header(
+        default=None,
+        alias="Last-Event-ID",
+        description="Sequence of the last event received, to resume the stream",
+    ),
+    nats_processor: NatsEventsProcessor = Depends(
+        Provide[Container.nats_events_processor]
+    ),
+) -> EventSourceResponse:
+    bound_logger = logger.bind(
+        body={
+            "wallet_id": wallet_id,
+            "group_id": group_id,
+            "topic": topic,
+            "field": field,
+            "field_id": field_id,
+            "last_event_id": last_event_id,
+        }
+    )
+    bound_logger.debug("Waypoint: GET request received: Stream wallet events by topic")
+
+    stop_event = asyncio.Event()
+    event_stream = nats_event_stream(
+        nats_processor=nats_processor,
+        stop_event=stop_event,
+        wallet_id=wallet_id,
+        topic=topic,
+        field=field,
+        field_ids=field_id,
+        group_id=group_id,
+        look_back=look_back,
+        last_event_id=last_event_id,
+    )
+
+    return event_source_response(event_stream, stop_event)
@@ -0,0 +1,124 @@
+import time
+from dataclasses import dataclass
+
+from nats.aio.msg import Msg
+from nats.errors import NotJSMessageError
+from nats.js.client import JetStreamContext
+from nats.js.errors import FetchTimeoutError
+
+from waypoint.services.metrics import (
+    FETCH_DURATION,
+    MESSAGES_RECEIVED,
+    REQUEST_CONSUMER,
+)
+
+
+@dataclass
+class FetchMetrics:
+    """Per-subscription fetch statistics."""
+
+    fetches: int = 0
+    empty_fetches: int = 0
+    messages: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    max_batch_size: int = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.fetches if self.fetches else 0.0
+
+    def record(self, *, latency: float, batch_size: int, num_messages: int) -> None:
+        self.fetches += 1
+        self.messages += num_messages
+        if not num_messages:
+            self.empty_fetches += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.max_batch_size = max(self.max_batch_size, batch_size)
+
+
+class AdaptiveFetcher:
+    """Fetch messages from a pull subscription, adapting to the backlog.
+
+    While messages are pending (e.g. replaying the look-back window), the batch
+    size grows up to `max_batch_size`. Once the subject is idle, a single-message
+    long-poll fetch is used, so new messages are returned as soon as they are
+    published, without a fixed sleep between fetches.
+    """
+
+    def __init__(
+        self,
+        subscription: JetStreamContext.PullSubscription,
+        *,
+        min_batch_size: int,
+        max_batch_size: int,
+        timeout: float,
+        long_poll_timeout: float,
+        heartbeat: float,
+    ) -> None:
+        """Initialize the adaptive fetcher."""
+        self.subscription = subscription
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max(max_batch_size, min_batch_size)
+        self.timeout = timeout
+        self.long_poll_timeout = long_poll_timeout
+        self.heartbeat = heartbeat
+        self.batch_size = min_batch_size
+        self.idle = False
+        self.metrics = FetchMetrics()
+
+    async def fetch(self, max_wait: float | None = None) -> list[Msg]:
+        """Fetch the next batch, waiting at most `max_wait` seconds.
+
+        Raises FetchTimeoutError if no messages arrived in time.
+        """
+        if self.idle:
+            batch_size, timeout = 1, self.long_poll_timeout
+        else:
+            batch_size, timeout = self.batch_size, self.timeout
+        if max_wait is not None:
+            timeout = max(min(timeout, max_wait), 0.001)
+        # NATS requires the heartbeat to be less than half the fetch timeout
+        heartbeat = self.heartbeat if self.heartbeat < timeout / 2 else None
+
+        started = time.perf_counter()
+        try:
+            messages = await self.subscription.fetch(
+                batch=batch_size, timeout=timeout, heartbeat=heartbeat
+            )
+        except FetchTimeoutError:
+            latency = time.perf_counter() - started
+            self.metrics.record(latency=latency, batch_size=batch_size, num_messages=0)
+            FETCH_DURATION.labels(REQUEST_CONSUMER, "timeout").observe(latency)
+            self.idle = True
+            self.batch_size = self.min_batch_size
+            raise
+
+        latency = time.perf_counter() - started
+        self.metrics.record(
+            latency=latency, batch_size=batch_size, num_messages=len(messages)
+        )
+        FETCH_DURATION.labels(REQUEST_CONSUMER, "messages").observe(latency)
+        MESSAGES_RECEIVED.labels(REQUEST_CONSUMER).inc(len(messages))
+        self._adapt(messages, batch_size)
+        return messages
+
+    def _adapt(self, messages: list[Msg], batch_size: int) -> None:
+        if not messages:
+            return
+        self.idle = False
+
+        try:
+            num_pending = messages[-1].metadata.num_pending
+        except NotJSMessageError:
+            num_pending = None
+
+        if isinstance(num_pending, int):
+            target = num_pending
+        elif len(messages) >= batch_size:
+            target = batch_size * 2  # Full batch, assume there is more
+        else:
+            target = self.min_batch_size
+
+        self.batch_size = min(max(target, self.min_batch_size), self.max_batch_size)
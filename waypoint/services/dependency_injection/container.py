@@ -1,7 +1,9 @@
 from dependency_injector import containers, providers
 
 from shared.services.nats_jetstream import init_nats_client
+from waypoint.services.nats_dispatcher import init_nats_events_dispatcher
 from waypoint.services.nats_service import NatsEventsProcessor
+from waypoint.services.timer_wheel import TimerWheel
 
 
 class Container(containers.DeclarativeContainer):
@@ -9,7 +11,16 @@ class Container(containers.DeclarativeContainer):
 
     jetstream = providers.Resource(init_nats_client)
 
+    nats_events_dispatcher = providers.Resource(
+        init_nats_events_dispatcher,
+        jetstream=jetstream,
+    )
+
+    timer_wheel = providers.Singleton(TimerWheel)
+
     nats_events_processor = providers.Singleton(
         NatsEventsProcessor,
         jetstream=jetstream,
+        dispatcher=nats_events_dispatcher,
+        timer_wheel=timer_wheel,
     )
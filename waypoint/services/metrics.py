@@ -0,0 +1,51 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Label values of the `endpoint` label
+WAIT_ENDPOINT = "wait"  # Wait for a desired state
+STREAM_ENDPOINT = "stream"  # Stream all state changes
+
+# Label values of the `consumer` label
+REQUEST_CONSUMER = "request"  # Ephemeral consumer of a single SSE request
+SHARED_CONSUMER = "shared"  # Durable fan-out consumer of the replica
+
+SSE_STREAMS_ACTIVE = Gauge(
+    "waypoint_sse_streams_active",
+    "Number of open SSE streams",
+    ["endpoint"],
+)
+SUBSCRIPTIONS_ACTIVE = Gauge(
+    "waypoint_jetstream_subscriptions_active",
+    "Number of open JetStream pull subscriptions",
+    ["consumer"],
+)
+FETCH_DURATION = Histogram(
+    "waypoint_jetstream_fetch_duration_seconds",
+    "Round-trip time of JetStream fetches, including long-poll waits",
+    ["consumer", "outcome"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+MESSAGES_RECEIVED = Counter(
+    "waypoint_messages_received",
+    "Number of messages fetched from JetStream",
+    ["consumer"],
+)
+EVENTS_DECODED = Counter(
+    "waypoint_events_decoded",
+    "Number of state events whose JSON body was parsed",
+)
+EVENTS_MATCHED = Counter(
+    "waypoint_events_matched",
+    "Number of state events sent to SSE clients",
+    ["endpoint"],
+)
+RESUBSCRIBES = Counter(
+    "waypoint_resubscribes",
+    "Number of resubscriptions after too many missed heartbeats",
+    ["endpoint"],
+)
+TIME_TO_FIRST_EVENT = Histogram(
+    "waypoint_time_to_first_event_seconds",
+    "Time from opening an SSE stream to sending its first event",
+    ["endpoint"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
@@ -0,0 +1,278 @@
+import asyncio
+import os
+import socket
+import time
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from nats.errors import BadSubscriptionError, ConnectionClosedError, Error
+from nats.js.api import AckPolicy, ConsumerConfig, DeliverPolicy
+from nats.js.client import JetStreamContext
+from nats.js.errors import APIError, FetchTimeoutError, NotFoundError
+
+from shared.constants import (
+    NATS_STATE_PARTITION_STREAM,
+    NATS_STATE_PARTITION_SUBJECT,
+    NATS_STATE_STREAM,
+    NATS_STATE_SUBJECT,
+    WAYPOINT_SHARDS,
+)
+from shared.log_config import get_logger
+from shared.util.sharding import shard_partitions, wallet_shard
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.metrics import (
+    FETCH_DURATION,
+    MESSAGES_RECEIVED,
+    SHARED_CONSUMER,
+    SUBSCRIPTIONS_ACTIVE,
+)
+from waypoint.services.replay_cache import ReplayCache
+from waypoint.services.waiter_registry import Waiter, WaiterRegistry
+
+logger = get_logger(__name__)
+
+# Read fan-out config from environment variables
+FANOUT_ENABLED = os.getenv("NATS_FANOUT_ENABLED", "false").lower() == "true"
+FANOUT_CONSUMER_NAME = os.getenv(
+    "NATS_FANOUT_CONSUMER_NAME", f"waypoint-{socket.gethostname()}"
+)
+FANOUT_BATCH_SIZE = int(os.getenv("NATS_FANOUT_BATCH_SIZE", "100"))
+FANOUT_FETCH_TIMEOUT = float(os.getenv("NATS_FANOUT_FETCH_TIMEOUT", "5"))
+FANOUT_INACTIVE_THRESHOLD = float(
+    os.getenv("NATS_FANOUT_INACTIVE_THRESHOLD", "300")
+)  # Seconds before NATS removes the consumer of a replica that went away
+FANOUT_MAX_FETCH_ERRORS = int(
+    os.getenv("NATS_FANOUT_MAX_FETCH_ERRORS", "3")
+)  # Consecutive fetch errors before the shared consumer is subscribed again
+SHARD_INDEX = int(
+    os.getenv("WAYPOINT_SHARD_INDEX", "0")
+)  # Shard served by this replica, when WAYPOINT_SHARDS is set
+
+
+class NatsEventsDispatcher:
+    """Class to fan out NATS state events to in-process waiters.
+
+    A single durable pull consumer per waypoint replica reads the state subject,
+    and every event releases the waiters registered for its
+    (wallet_id, topic, state) key whose field-id pair matches the payload.
+
+    Events are also kept in a replay cache, so that look-back windows can be
+    served from memory instead of replaying them from JetStream per request.
+
+    When sharded, the consumer only reads the partitions of the state stream
+    owned by this replica's shard, and only waits for events of those wallets.
+    """
+
+    def __init__(
+        self,
+        jetstream: JetStreamContext,
+        shards: int = WAYPOINT_SHARDS,
+        shard_index: int = SHARD_INDEX,
+    ) -> None:
+        """Initialize the NATS events dispatcher."""
+        self.js_context: JetStreamContext = jetstream
+        self.shards = shards
+        self.shard_index = shard_index
+        self._registry = WaiterRegistry()
+        self.replay_cache = ReplayCache()
+        self._subscription: JetStreamContext.PullSubscription | None = None
+        self._subscribe_kwargs: dict[str, Any] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def waiters_count(self) -> int:
+        return len(self._registry)
+
+    def owns(self, wallet_id: str) -> bool:
+        """Whether events of this wallet are read by the shared consumer."""
+        if not self.shards:
+            return True
+        return wallet_shard(wallet_id, self.shards) == self.shard_index
+
+    async def start(self) -> None:
+        logger.info("Starting shared consumer `{}`", FANOUT_CONSUMER_NAME)
+        config = ConsumerConfig(
+            deliver_policy=DeliverPolicy.NEW,
+            ack_policy=AckPolicy.NONE,
+            inactive_threshold=FANOUT_INACTIVE_THRESHOLD,
+        )
+        if self.shards:
+            partitions = shard_partitions(self.shard_index, self.shards)
+            if not partitions:
+                logger.warning(
+                    "Shard {} of {} owns no partitions, not starting shared consumer",
+                    self.shard_index,
+                    self.shards,
+                )
+                return
+            logger.info(
+                "Reading partitions {} for shard {} of {}",
+                partitions,
+                self.shard_index,
+                self.shards,
+            )
+            config.filter_subjects = [
+                f"{NATS_STATE_PARTITION_SUBJECT}.{partition}.>"
+                for partition in partitions
+            ]
+            subject = f"{NATS_STATE_PARTITION_SUBJECT}.>"
+            stream = NATS_STATE_PARTITION_STREAM
+        else:
+            subject = f"{NATS_STATE_SUBJECT}.>"
+            stream = NATS_STATE_STREAM
+
+        self._subscribe_kwargs = {
+            "subject": subject,
+            "durable": FANOUT_CONSUMER_NAME,
+            "stream": stream,
+            "config": config,
+        }
+        self._subscription = await self.js_context.pull_subscribe(
+            **self._subscribe_kwargs
+        )
+        SUBSCRIPTIONS_ACTIVE.labels(SHARED_CONSUMER).inc()
+        self.replay_cache.start()
+        self._task = asyncio.create_task(self._run(self._subscription))
+
+    async def stop(self) -> None:
+        logger.info("Stopping shared consumer `{}`", FANOUT_CONSUMER_NAME)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._subscription:
+            try:
+                await self._subscription.unsubscribe()
+            except (BadSubscriptionError, ConnectionClosedError) as e:
+                logger.warning("Error unsubscribing shared consumer: {}", e)
+            SUBSCRIPTIONS_ACTIVE.labels(SHARED_CONSUMER).dec()
+            self._subscription = None
+
+    async def _run(self, subscription: JetStreamContext.PullSubscription) -> None:
+        num_errors = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                messages = await subscription.fetch(
+                    batch=FANOUT_BATCH_SIZE, timeout=FANOUT_FETCH_TIMEOUT
+                )
+            except (FetchTimeoutError, TimeoutError):
+                FETCH_DURATION.labels(SHARED_CONSUMER, "timeout").observe(
+                    time.perf_counter() - started
+                )
+                continue  # Nothing published on the state subject, fetch again
+            except Error as e:
+                logger.error("Nats error in shared consumer: {}", e)
+                # Events may have been missed, so the cache can't serve older windows
+                self.replay_cache.reset()
+                self.replay_cache.start()
+                num_errors += 1
+                if num_errors >= FANOUT_MAX_FETCH_ERRORS or _consumer_deleted(e):
+                    # The consumer may be gone (e.g. removed after its inactive
+                    # threshold, or its stream was recreated), so create it again
+                    subscription = await self._resubscribe(subscription)
+                    num_errors = 0
+                await asyncio.sleep(1)
+                continue
+
+            num_errors = 0
+            FETCH_DURATION.labels(SHARED_CONSUMER, "messages").observe(
+                time.perf_counter() - started
+            )
+            MESSAGES_RECEIVED.labels(SHARED_CONSUMER).inc(len(messages))
+            for message in messages:
+                try:
+                    self.dispatch(
+                        LazyEvent(
+                            message.data, message.headers, subject=message.subject
+                        )
+                    )
+                except Exception:  # pylint: disable=W0718
+                    logger.exception("Could not dispatch message on shared consumer")
+
+    async def _resubscribe(
+        self, subscription: JetStreamContext.PullSubscription
+    ) -> JetStreamContext.PullSubscription:
+        """Subscribe to the shared consumer again, creating it if it was deleted.
+
+        Returns the previous subscription if subscribing failed, to retry later.
+        """
+        logger.warning(
+            "Subscribing to shared consumer `{}` again", FANOUT_CONSUMER_NAME
+        )
+        try:
+            new_subscription = await self.js_context.pull_subscribe(
+                **self._subscribe_kwargs
+            )
+        except Error as e:
+            logger.error("Could not subscribe to shared consumer again: {}", e)
+            return subscription
+
+        try:
+            await subscription.unsubscribe()
+        except (BadSubscriptionError, ConnectionClosedError) as e:
+            logger.warning("Error unsubscribing shared consumer: {}", e)
+        self._subscription = new_subscription
+        return new_subscription
+
+    def dispatch(self, event: LazyEvent) -> None:
+        """Cache an event and release all waiters registered for it."""
+        self.replay_cache.add(event)
+
+        state = event.payload_value("state")
+        if not isinstance(state, str):
+            return
+
+        self._registry.resolve((event.wallet_id, event.topic, state), event)
+
+    def register(
+        self,
+        *,
+        wallet_id: str,
+        topic: str,
+        state: str,
+        group_id: str | None = None,
+        field: str | None = None,
+        field_id: str | None = None,
+    ) -> Waiter:
+        return self._registry.add(
+            (wallet_id, topic, state),
+            group_id=group_id,
+            field=field,
+            field_id=field_id,
+        )
+
+    def unregister(
+        self, *, wallet_id: str, topic: str, state: str, waiter: Waiter
+    ) -> None:
+        self._registry.remove((wallet_id, topic, state), waiter)
+
+
+def _consumer_deleted(error: Error) -> bool:
+    """Whether a fetch error means that the consumer no longer exists."""
+    return isinstance(error, NotFoundError) or (
+        isinstance(error, APIError)
+        and error.code == 409
+        and error.description == "Consumer Deleted"
+    )
+
+
+async def init_nats_events_dispatcher(
+    jetstream: JetStreamContext,
+) -> AsyncGenerator[NatsEventsDispatcher | None, Any]:
+    """Start the shared consumer when fan-out mode is enabled."""
+    if not FANOUT_ENABLED:
+        logger.debug("Fan-out mode disabled, using one consumer per request")
+        yield None
+        return
+
+    dispatcher = NatsEventsDispatcher(jetstream)
+    await dispatcher.start()
+    try:
+        yield dispatcher
+    finally:
+        await dispatcher.stop()
@@ -7,11 +7,11 @@ from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Any
 
-import orjson
+from nats.aio.msg import Msg
 from nats.errors import BadSubscriptionError, ConnectionClosedError, Error
-from nats.js.api import ConsumerConfig, DeliverPolicy
+from nats.js.api import AckPolicy, ConsumerConfig, DeliverPolicy
 from nats.js.client import JetStreamContext
-from nats.js.errors import FetchTimeoutError
+from nats.js.errors import FetchTimeoutError, NotFoundError
 from tenacity import (
     RetryCallState,
     retry,
@@ -22,21 +22,53 @@ from tenacity import (
 from uuid_utils import UUID, uuid4
 
 from shared.constants import (
+    NATS_STATE_INDEX_STREAM,
+    NATS_STATE_INDEX_SUBJECT,
     NATS_STATE_STREAM,
     NATS_STATE_SUBJECT,
     SSE_LOOK_BACK,
     SSE_TIMEOUT,
 )
 from shared.log_config import Logger, get_logger
-from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.adaptive_fetcher import AdaptiveFetcher
+from waypoint.services.metrics import (
+    REQUEST_CONSUMER,
+    RESUBSCRIBES,
+    STREAM_ENDPOINT,
+    SUBSCRIPTIONS_ACTIVE,
+    WAIT_ENDPOINT,
+)
+from waypoint.services.nats_dispatcher import NatsEventsDispatcher
+from waypoint.services.timer_wheel import TimerWheel
+from waypoint.services.waiter_registry import Waiter
 
 logger = get_logger(__name__)
 
 # Read NATS subscription config from environment variables
 BATCH_SIZE = int(os.getenv("NATS_BATCH_SIZE", "5"))
+MAX_BATCH_SIZE = int(os.getenv("NATS_MAX_BATCH_SIZE", "200"))
 TIMEOUT = float(os.getenv("NATS_TIMEOUT", "0.5"))
+LONG_POLL_TIMEOUT = float(os.getenv("NATS_LONG_POLL_TIMEOUT", "5"))
 HEARTBEAT = float(os.getenv("NATS_HEARTBEAT", "0.1"))
 MAX_TIMEOUT_ERRORS = int(os.getenv("NATS_MAX_TIMEOUT_ERRORS", "3"))
+# Waypoint only observes the state stream, so its consumers need not be acked
+ACK_POLICY = AckPolicy(os.getenv("NATS_ACK_POLICY", AckPolicy.NONE.value))
+# Subscribe to the state index stream (subjects that include the correlation id)
+# for the fields that the state-index pipeline publishes. The pipeline has its own
+# STATE_INDEX_ENABLED flag, so the index stream is checked at startup.
+STATE_INDEX_ENABLED = os.getenv("NATS_STATE_INDEX_ENABLED", "false").lower() == "true"
+# Seconds that the last state index event may be older than the last state event,
+# before the state-index pipeline is considered disabled
+STATE_INDEX_MAX_LAG = float(os.getenv("NATS_STATE_INDEX_MAX_LAG", "300"))
+STATE_INDEX_FIELDS = frozenset(
+    os.getenv(
+        "NATS_STATE_INDEX_FIELDS",
+        "connection_id,thread_id,credential_exchange_id,proof_id,transaction_id",
+    ).split(",")
+)
+# Characters that cannot be part of a NATS subject token
+SUBJECT_RESERVED_CHARACTERS = frozenset(".*> \t\r\n")
 
 # Validate heartbeat value to avoid NATS error
 if HEARTBEAT >= TIMEOUT / 2:
@@ -54,11 +86,32 @@ class NatsEventsProcessor:
 
     Calling the process_events method will subscribe to the NATS server and
     return an async generator that will yield events.
+
+    When a dispatcher is provided (fan-out mode), live events are read from the
+    dispatcher's shared consumer, and the per-request consumer is only used to
+    replay the look-back window. Wallets of another shard (e.g. while replicas
+    are rescaled) fall back to a per-request consumer.
+
+    The ack policy of per-request consumers is configurable: `none` (default),
+    `all` (ack the last message of each batch) or `explicit` (ack every message).
     """
 
-    def __init__(self, jetstream: JetStreamContext) -> None:
+    def __init__(
+        self,
+        jetstream: JetStreamContext,
+        dispatcher: NatsEventsDispatcher | None = None,
+        ack_policy: AckPolicy = ACK_POLICY,
+        timer_wheel: TimerWheel | None = None,
+        state_index_enabled: bool = STATE_INDEX_ENABLED,
+    ) -> None:
         """Initialize the NATS events processor."""
         self.js_context: JetStreamContext = jetstream
+        self.dispatcher = dispatcher
+        self.ack_policy = ack_policy
+        self.timer_wheel = timer_wheel or TimerWheel()
+        self.state_index_enabled = state_index_enabled
+        # Subscriptions counted in SUBSCRIPTIONS_ACTIVE, to count each down once
+        self._counted_subscriptions: set[JetStreamContext.PullSubscription] = set()
 
     def _retry_log(self, bound_logger: Logger, retry_state: RetryCallState) -> None:
         """Log retry attempts."""
@@ -71,6 +124,24 @@ class NatsEventsProcessor:
                 exception,
             )
 
+    async def _ack(self, message: Msg, *, last_in_batch: bool) -> None:
+        if self.ack_policy == AckPolicy.EXPLICIT or (
+            self.ack_policy == AckPolicy.ALL and last_in_batch
+        ):
+            await message.ack()
+
+    def _fetcher(
+        self, subscription: JetStreamContext.PullSubscription
+    ) -> AdaptiveFetcher:
+        return AdaptiveFetcher(
+            subscription,
+            min_batch_size=BATCH_SIZE,
+            max_batch_size=MAX_BATCH_SIZE,
+            timeout=TIMEOUT,
+            long_poll_timeout=LONG_POLL_TIMEOUT,
+            heartbeat=HEARTBEAT,
+        )
+
     async def _subscribe(
         self,
         *,
@@ -80,6 +151,9 @@ class NatsEventsProcessor:
         state: str,
         start_time: str,
         request_uuid: UUID,
+        field: str | None = None,
+        field_id: str | None = None,
+        start_sequence: int | None = None,
     ) -> JetStreamContext.PullSubscription:
         bound_logger = logger.bind(
             body={
@@ -87,7 +161,10 @@ class NatsEventsProcessor:
                 "group_id": group_id,
                 "topic": topic,
                 "state": state,
+                "field": field,
+                "field_id": field_id,
                 "start_time": start_time,
+                "start_sequence": start_sequence,
                 "request_uuid": request_uuid,
             }
         )
@@ -95,13 +172,30 @@ class NatsEventsProcessor:
         retry_log_with_bound_logger = functools.partial(self._retry_log, bound_logger)
 
         group_id = group_id or "*"
-        subject = f"{NATS_STATE_SUBJECT}.{group_id}.{wallet_id}.{topic}.{state}"
-        stream = NATS_STATE_STREAM
-
-        config = ConsumerConfig(
-            deliver_policy=DeliverPolicy.BY_START_TIME,
-            opt_start_time=start_time,  # type: ignore
-        )
+        if self.state_index_enabled and is_indexed(field, field_id):
+            # NATS filters on the correlation id, so only matching events are sent
+            subject = (
+                f"{NATS_STATE_INDEX_SUBJECT}.{group_id}.{wallet_id}.{topic}.{state}"
+                f".{field}.{field_id}"
+            )
+            stream = NATS_STATE_INDEX_STREAM
+        else:
+            subject = f"{NATS_STATE_SUBJECT}.{group_id}.{wallet_id}.{topic}.{state}"
+            stream = NATS_STATE_STREAM
+
+        if start_sequence is not None:
+            # Resume a stream after the last event the client received
+            config = ConsumerConfig(
+                deliver_policy=DeliverPolicy.BY_START_SEQUENCE,
+                opt_start_seq=start_sequence,
+                ack_policy=self.ack_policy,
+            )
+        else:
+            config = ConsumerConfig(
+                deliver_policy=DeliverPolicy.BY_START_TIME,
+                opt_start_time=start_time,  # type: ignore
+                ack_policy=self.ack_policy,
+            )
 
         # This is a custom retry decorator that will retry on TimeoutError
         # and wait exponentially up to a max of 16 seconds between retries indefinitely
@@ -119,6 +213,8 @@ class NatsEventsProcessor:
                     stream=stream,
                     config=config,
                 )
+                SUBSCRIPTIONS_ACTIVE.labels(REQUEST_CONSUMER).inc()
+                self._counted_subscriptions.add(subscription)
                 bound_logger.debug("Successfully subscribed to JetStream")
                 return subscription
             except BadSubscriptionError as e:
@@ -145,7 +241,25 @@ class NatsEventsProcessor:
         stop_event: asyncio.Event,
         duration: int | None = None,
         look_back: int | None = None,
-    ) -> AsyncGenerator[AsyncGenerator[CloudApiWebhookEventGeneric, None], None]:
+        field: str | None = None,
+        field_id: str | None = None,
+    ) -> AsyncGenerator[AsyncGenerator[LazyEvent, None], None]:
+        if self.dispatcher and self.dispatcher.owns(wallet_id):
+            async with self._process_events_fanout(
+                dispatcher=self.dispatcher,
+                group_id=group_id,
+                wallet_id=wallet_id,
+                topic=topic,
+                state=state,
+                stop_event=stop_event,
+                duration=duration,
+                look_back=look_back,
+                field=field,
+                field_id=field_id,
+            ) as fanout_event_generator:
+                yield fanout_event_generator
+            return
+
         duration = duration or SSE_TIMEOUT
         look_back = look_back or SSE_LOOK_BACK
         request_uuid = uuid4()
@@ -173,7 +287,10 @@ class NatsEventsProcessor:
 
         async def event_generator(
             *, subscription: JetStreamContext.PullSubscription
-        ) -> AsyncGenerator[CloudApiWebhookEventGeneric, None]:
+        ) -> AsyncGenerator[LazyEvent, None]:
+            fetcher = self._fetcher(subscription)
+            # Stream sequence of the last delivered message, to resubscribe after it
+            last_sequence: int | None = None
             try:
                 num_timeout_errors = 0
                 end_time = time.time() + duration
@@ -186,19 +303,19 @@ class NatsEventsProcessor:
                         break
 
                     try:
-                        messages = await subscription.fetch(
-                            batch=BATCH_SIZE, timeout=TIMEOUT, heartbeat=HEARTBEAT
-                        )
-                        for message in messages:
-                            event = orjson.loads(message.data)
-                            bound_logger.trace("Received event: {}", event)
-                            yield CloudApiWebhookEventGeneric(**event)
-                            await message.ack()
+                        messages = await fetcher.fetch(max_wait=remaining_time)
+                        for i, message in enumerate(messages, start=1):
+                            bound_logger.trace("Received event: {}", message.data)
+                            sequence = message.metadata.sequence.stream
+                            yield LazyEvent(
+                                message.data, message.headers, sequence, message.subject
+                            )
+                            last_sequence = sequence
+                            await self._ack(message, last_in_batch=i == len(messages))
 
                     except FetchTimeoutError:
-                        # Fetch timeout, continue
-                        bound_logger.debug("Timeout fetching messages continuing...")
-                        await asyncio.sleep(0.1)
+                        # Fetch timeout, the fetcher switches to long-polling
+                        bound_logger.trace("Timeout fetching messages continuing...")
 
                     except TimeoutError:
                         bound_logger.warning("No heartbeat received on subscription")
@@ -210,17 +327,13 @@ class NatsEventsProcessor:
                                 "attempting to resubscribe...",
                                 num_timeout_errors,
                             )
+                            RESUBSCRIBES.labels(WAIT_ENDPOINT).inc()
 
-                            try:
-                                await subscription.unsubscribe()
-                                bound_logger.info("Unsubscribed")
-                            except (BadSubscriptionError, ConnectionClosedError) as e:
-                                bound_logger.warning(
-                                    "BadSubscriptionError after connection lost: {}",
-                                    e,
-                                )
+                            await self._unsubscribe(subscription, bound_logger)
+                            bound_logger.info("Unsubscribed")
 
-                            # Attempt to resubscribe
+                            # Resume after the last delivered message, so the
+                            # look-back window is not replayed again
                             subscription = await self._subscribe(
                                 group_id=group_id,
                                 wallet_id=wallet_id,
@@ -228,7 +341,15 @@ class NatsEventsProcessor:
                                 state=state,
                                 start_time=start_time,
                                 request_uuid=request_uuid,
+                                field=field,
+                                field_id=field_id,
+                                start_sequence=(
+                                    last_sequence + 1
+                                    if last_sequence is not None
+                                    else None
+                                ),
                             )
+                            fetcher.subscription = subscription
                             bound_logger.info("Successfully resubscribed to NATS.")
 
                             num_timeout_errors = 0
@@ -251,15 +372,11 @@ class NatsEventsProcessor:
                 stop_event.set()
 
             finally:
+                bound_logger.debug("Fetch metrics: {}", fetcher.metrics)
                 bound_logger.debug("Closing subscription...")
                 if subscription:
-                    try:
-                        await subscription.unsubscribe()
-                        bound_logger.debug("Subscription closed")
-                    except (BadSubscriptionError, ConnectionClosedError) as e:
-                        bound_logger.warning(
-                            "BadSubscriptionError unsubscribing from NATS: {}", e
-                        )
+                    await self._unsubscribe(subscription, bound_logger)
+                    bound_logger.debug("Subscription closed")
 
         subscription = None
         try:
@@ -270,12 +387,346 @@ class NatsEventsProcessor:
                 state=state,
                 start_time=start_time,
                 request_uuid=request_uuid,
+                field=field,
+                field_id=field_id,
             )
             yield event_generator(subscription=subscription)
         except Exception as e:  # pylint: disable=W0718
             bound_logger.exception("Unexpected error processing events")
             raise e
 
+    @asynccontextmanager
+    async def _process_events_fanout(
+        self,
+        *,
+        dispatcher: NatsEventsDispatcher,
+        group_id: str | None = None,
+        wallet_id: str,
+        topic: str,
+        state: str,
+        stop_event: asyncio.Event,
+        duration: int | None = None,
+        look_back: int | None = None,
+        field: str | None = None,
+        field_id: str | None = None,
+    ) -> AsyncGenerator[AsyncGenerator[LazyEvent, None], None]:
+        duration = duration or SSE_TIMEOUT
+        look_back = look_back or SSE_LOOK_BACK
+        request_uuid = uuid4()
+        bound_logger = logger.bind(
+            body={
+                "wallet_id": wallet_id,
+                "group_id": group_id,
+                "topic": topic,
+                "state": state,
+                "duration": duration,
+                "look_back": look_back,
+                "request_uuid": request_uuid,
+            }
+        )
+        bound_logger.debug("Processing events from shared consumer")
+
+        look_back_time = datetime.now() - timedelta(seconds=look_back)
+        start_time = look_back_time.isoformat(timespec="milliseconds") + "Z"
+
+        def is_match(event: LazyEvent) -> bool:
+            # Cached events are indexed by wallet and topic only
+            if event.payload_value("state") != state:
+                return False
+            if group_id and event.group_id != group_id:
+                return False
+            return field is None or event.payload_value(field) == field_id
+
+        async def event_generator(
+            *,
+            subscription: JetStreamContext.PullSubscription | None,
+            cached_events: list[LazyEvent],
+            waiter: Waiter,
+        ) -> AsyncGenerator[LazyEvent, None]:
+            def on_timeout() -> None:
+                bound_logger.debug("Timeout reached")
+                stop_event.set()
+
+            timer = self.timer_wheel.call_later(duration, on_timeout)
+            try:
+                # Serve the look-back window; live events resolve the waiter meanwhile
+                for event in cached_events:
+                    if stop_event.is_set():
+                        return
+                    if is_match(event):
+                        yield event
+
+                if subscription:
+                    async for event in self._replay_events(
+                        subscription=subscription, bound_logger=bound_logger
+                    ):
+                        if stop_event.is_set():
+                            return
+                        if is_match(event):
+                            yield event
+                    await self._unsubscribe(subscription, bound_logger)
+                    subscription = None
+
+                live_event = await _wait_for_waiter(waiter, stop_event)
+                if live_event:
+                    yield live_event
+
+            except asyncio.CancelledError:
+                bound_logger.debug("Event generator cancelled")
+                stop_event.set()
+
+            finally:
+                timer.cancel()
+                if subscription:
+                    await self._unsubscribe(subscription, bound_logger)
+
+        waiter = dispatcher.register(
+            wallet_id=wallet_id,
+            topic=topic,
+            state=state,
+            group_id=group_id,
+            field=field,
+            field_id=field_id,
+        )
+        try:
+            subscription = None
+            cached_events = []
+            since = time.time() - look_back
+            if dispatcher.replay_cache.covers(since):
+                bound_logger.trace("Serving look-back from replay cache")
+                cached_events = dispatcher.replay_cache.get(wallet_id, topic, since)
+            else:
+                bound_logger.debug("Replay cache is cold, replaying from JetStream")
+                subscription = await self._subscribe(
+                    group_id=group_id,
+                    wallet_id=wallet_id,
+                    topic=topic,
+                    state=state,
+                    start_time=start_time,
+                    request_uuid=request_uuid,
+                    field=field,
+                    field_id=field_id,
+                )
+            yield event_generator(
+                subscription=subscription, cached_events=cached_events, waiter=waiter
+            )
+        except Exception as e:  # pylint: disable=W0718
+            bound_logger.exception("Unexpected error processing events")
+            raise e
+        finally:
+            dispatcher.unregister(
+                wallet_id=wallet_id, topic=topic, state=state, waiter=waiter
+            )
+
+    @asynccontextmanager
+    async def stream_events(
+        self,
+        *,
+        group_id: str | None = None,
+        wallet_id: str,
+        topic: str,
+        stop_event: asyncio.Event,
+        look_back: int | None = None,
+        last_sequence: int | None = None,
+        field: str | None = None,
+        field_id: str | None = None,
+    ) -> AsyncGenerator[AsyncGenerator[LazyEvent, None], None]:
+        """Stream every state change for a wallet and topic until stopped.
+
+        Events carry their JetStream sequence, so a client can resume the stream
+        after `last_sequence`. Otherwise, the stream starts `look_back` seconds ago.
+        A single consumer is used for the lifetime of the stream.
+        """
+        look_back = look_back or SSE_LOOK_BACK
+        request_uuid = uuid4()
+        bound_logger = logger.bind(
+            body={
+                "wallet_id": wallet_id,
+                "group_id": group_id,
+                "topic": topic,
+                "field": field,
+                "field_id": field_id,
+                "look_back": look_back,
+                "last_sequence": last_sequence,
+                "request_uuid": request_uuid,
+            }
+        )
+        bound_logger.debug("Streaming events")
+
+        look_back_time = datetime.now() - timedelta(seconds=look_back)
+        start_time = look_back_time.isoformat(timespec="milliseconds") + "Z"
+
+        async def subscribe(
+            start_sequence: int | None,
+        ) -> JetStreamContext.PullSubscription:
+            return await self._subscribe(
+                group_id=group_id,
+                wallet_id=wallet_id,
+                topic=topic,
+                state="*",
+                start_time=start_time,
+                request_uuid=request_uuid,
+                field=field,
+                field_id=field_id,
+                start_sequence=start_sequence,
+            )
+
+        async def event_generator(
+            *, subscription: JetStreamContext.PullSubscription
+        ) -> AsyncGenerator[LazyEvent, None]:
+            nonlocal last_sequence
+            fetcher = self._fetcher(subscription)
+            num_timeout_errors = 0
+            try:
+                while not stop_event.is_set():
+                    try:
+                        messages = await _fetch_until_stopped(fetcher, stop_event)
+                    except FetchTimeoutError:
+                        continue
+                    except TimeoutError:
+                        bound_logger.warning("No heartbeat received on subscription")
+                        num_timeout_errors += 1
+                        if num_timeout_errors < MAX_TIMEOUT_ERRORS:
+                            await asyncio.sleep(0.1)
+                            continue
+
+                        bound_logger.warning(
+                            "Max number of timeout errors reached, resubscribing "
+                            "after sequence {}",
+                            last_sequence,
+                        )
+                        RESUBSCRIBES.labels(STREAM_ENDPOINT).inc()
+                        await self._unsubscribe(subscription, bound_logger)
+                        subscription = await subscribe(
+                            last_sequence + 1 if last_sequence is not None else None
+                        )
+                        fetcher.subscription = subscription
+                        num_timeout_errors = 0
+                        continue
+
+                    if messages is None:
+                        break  # Stopped while waiting for messages
+
+                    for i, message in enumerate(messages, start=1):
+                        sequence = message.metadata.sequence.stream
+                        yield LazyEvent(
+                            message.data, message.headers, sequence, message.subject
+                        )
+                        last_sequence = sequence
+                        await self._ack(message, last_in_batch=i == len(messages))
+
+            except asyncio.CancelledError:
+                bound_logger.debug("Event stream cancelled")
+                stop_event.set()
+
+            except Exception:
+                bound_logger.exception("Unexpected error in event stream")
+                stop_event.set()
+                raise
+
+            finally:
+                bound_logger.debug("Fetch metrics: {}", fetcher.metrics)
+                await self._unsubscribe(subscription, bound_logger)
+
+        try:
+            subscription = await subscribe(
+                last_sequence + 1 if last_sequence is not None else None
+            )
+            yield event_generator(subscription=subscription)
+        except Exception as e:  # pylint: disable=W0718
+            bound_logger.exception("Unexpected error streaming events")
+            raise e
+
+    async def _replay_events(
+        self,
+        *,
+        subscription: JetStreamContext.PullSubscription,
+        bound_logger: Logger,
+    ) -> AsyncGenerator[LazyEvent, None]:
+        """Yield stored events until the subscription has caught up."""
+        fetcher = self._fetcher(subscription)
+        while True:
+            try:
+                messages = await fetcher.fetch()
+            except (FetchTimeoutError, TimeoutError):
+                bound_logger.trace("No more events to replay: {}", fetcher.metrics)
+                return
+
+            for i, message in enumerate(messages, start=1):
+                yield LazyEvent(message.data, message.headers, subject=message.subject)
+                await self._ack(message, last_in_batch=i == len(messages))
+
+            if messages[-1].metadata.num_pending == 0:
+                bound_logger.trace("Replay caught up with stream")
+                return
+
+    async def _unsubscribe(
+        self, subscription: JetStreamContext.PullSubscription, bound_logger: Logger
+    ) -> None:
+        try:
+            await subscription.unsubscribe()
+        except (BadSubscriptionError, ConnectionClosedError) as e:
+            bound_logger.trace("Subscription already closed: {}", e)
+        finally:
+            if subscription in self._counted_subscriptions:
+                self._counted_subscriptions.discard(subscription)
+                SUBSCRIPTIONS_ACTIVE.labels(REQUEST_CONSUMER).dec()
+
+    async def check_state_index(self) -> None:
+        """Fall back to the state stream if the state index stream is not being fed.
+
+        Waiters on the index stream would otherwise never receive an event, when the
+        state-index pipeline is disabled while waypoint has the index enabled.
+        """
+        if not self.state_index_enabled:
+            return
+
+        try:
+            await self.js_context.stream_info(NATS_STATE_INDEX_STREAM)
+        except NotFoundError:
+            logger.warning(
+                "State index stream `{}` does not exist, subscribing to the state "
+                "stream instead. Enable the state-index pipeline, or disable "
+                "NATS_STATE_INDEX_ENABLED",
+                NATS_STATE_INDEX_STREAM,
+            )
+            self.state_index_enabled = False
+            return
+
+        try:
+            last_state = await self._last_message_time(
+                NATS_STATE_STREAM, NATS_STATE_SUBJECT
+            )
+            last_index = await self._last_message_time(
+                NATS_STATE_INDEX_STREAM, NATS_STATE_INDEX_SUBJECT
+            )
+        except Error as e:
+            logger.warning("Could not check the state index stream: {}", e)
+            return
+
+        if last_state is None:
+            return  # No state events yet, so the index can't have fallen behind
+        if last_index is None or last_state - last_index > timedelta(
+            seconds=STATE_INDEX_MAX_LAG
+        ):
+            logger.warning(
+                "State index stream `{}` has no events since {} while the state "
+                "stream has events up to {}, subscribing to the state stream "
+                "instead. Enable the state-index pipeline, or disable "
+                "NATS_STATE_INDEX_ENABLED",
+                NATS_STATE_INDEX_STREAM,
+                last_index,
+                last_state,
+            )
+            self.state_index_enabled = False
+
+    async def _last_message_time(self, stream: str, subject: str) -> datetime | None:
+        try:
+            message = await self.js_context.get_last_msg(stream, f"{subject}.>")
+        except NotFoundError:
+            return None
+        return message.time
+
     async def check_jetstream(self) -> dict[str, Any]:
         try:
             account_info = await self.js_context.account_info()
@@ -289,3 +740,52 @@ class NatsEventsProcessor:
         except Exception:  # pylint: disable=W0718
             logger.exception("Caught exception while checking jetstream status")
             return {"is_working": False}
+
+
+def is_indexed(field: str | None, field_id: str | None) -> bool:
+    """Whether events can be filtered on field_id by the state index subject."""
+    if field not in STATE_INDEX_FIELDS or not field_id:
+        return False
+    return SUBJECT_RESERVED_CHARACTERS.isdisjoint(field_id)
+
+
+async def _fetch_until_stopped(
+    fetcher: AdaptiveFetcher, stop_event: asyncio.Event
+) -> list[Msg] | None:
+    """Fetch the next batch, or return None as soon as the stop event is set.
+
+    A long-poll fetch can otherwise keep a stopped stream open for its whole timeout.
+    """
+    if stop_event.is_set():
+        return None
+    fetch_task = asyncio.ensure_future(fetcher.fetch())
+    stop_task = asyncio.ensure_future(stop_event.wait())
+    try:
+        await asyncio.wait({fetch_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_task.cancel()
+        if not fetch_task.done():
+            fetch_task.cancel()
+            await asyncio.gather(fetch_task, return_exceptions=True)
+
+    if fetch_task.cancelled():
+        return None
+    return fetch_task.result()
+
+
+async def _wait_for_waiter(
+    waiter: Waiter, stop_event: asyncio.Event
+) -> LazyEvent | None:
+    """Wait for the waiter's future to be resolved, or for the stop event."""
+    if stop_event.is_set():
+        return None
+    stop_task = asyncio.ensure_future(stop_event.wait())
+    futures: set[asyncio.Future[Any]] = {waiter.future, stop_task}
+    try:
+        await asyncio.wait(futures, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop_task.cancel()
+
+    if waiter.future.done() and not waiter.future.cancelled():
+        return waiter.future.result()
+    return None
@@ -0,0 +1,87 @@
+import math
+import os
+import time
+from collections import deque
+
+from shared.constants import SSE_LOOK_BACK
+from shared.log_config import get_logger
+from waypoint.models.lazy_event import LazyEvent
+
+logger = get_logger(__name__)
+
+REPLAY_CACHE_MAX_AGE = float(
+    os.getenv("REPLAY_CACHE_MAX_AGE", str(SSE_LOOK_BACK))
+)  # Seconds of state events kept in memory
+REPLAY_CACHE_MAX_EVENTS = int(os.getenv("REPLAY_CACHE_MAX_EVENTS", "100000"))
+
+CacheKey = tuple[str, str]  # (wallet_id, topic)
+
+
+class ReplayCache:
+    """Ring buffer of recent state events, indexed by wallet_id and topic.
+
+    Events are evicted once they are older than `max_age`, or when more than
+    `max_events` are held. The cache tracks since when it has seen every event
+    on the state subject, so callers can tell whether a look-back window can be
+    answered from memory or needs a JetStream replay (cold start or gap).
+    """
+
+    def __init__(
+        self,
+        max_age: float = REPLAY_CACHE_MAX_AGE,
+        max_events: int = REPLAY_CACHE_MAX_EVENTS,
+    ) -> None:
+        """Initialize an empty replay cache."""
+        self.max_age = max_age
+        self.max_events = max_events
+        self._events: deque[tuple[float, CacheKey]] = deque()
+        self._index: dict[CacheKey, deque[tuple[float, LazyEvent]]] = {}
+        self._covered_since: float | None = None
+
+    def __len__(self) -> int:
+        """Return the number of cached events."""
+        return len(self._events)
+
+    def start(self, now: float | None = None) -> None:
+        """Mark the start of a continuous feed of events."""
+        self._covered_since = now if now is not None else time.time()
+
+    def reset(self) -> None:
+        """Drop all events, e.g. after a gap in the feed of events."""
+        logger.debug("Resetting replay cache")
+        self._events.clear()
+        self._index.clear()
+        self._covered_since = None
+
+    def covers(self, since: float) -> bool:
+        """Whether all events received after `since` are held in the cache."""
+        return self._covered_since is not None and self._covered_since <= since
+
+    def add(self, event: LazyEvent, now: float | None = None) -> None:
+        now = now if now is not None else time.time()
+        key = (event.wallet_id, event.topic)
+        self._events.append((now, key))
+        self._index.setdefault(key, deque()).append((now, event))
+        self._evict(now)
+
+    def get(self, wallet_id: str, topic: str, since: float) -> list[LazyEvent]:
+        """Return the events for a wallet and topic received after `since`."""
+        events = self._index.get((wallet_id, topic))
+        if not events:
+            return []
+        return [event for timestamp, event in events if timestamp >= since]
+
+    def _evict(self, now: float) -> None:
+        min_timestamp = now - self.max_age
+        while self._events and (
+            self._events[0][0] < min_timestamp or len(self._events) > self.max_events
+        ):
+            timestamp, key = self._events.popleft()
+            events = self._index[key]
+            events.popleft()
+            if not events:
+                del self._index[key]
+
+            if self._covered_since is not None and self._covered_since <= timestamp:
+                # Events received up to this one are no longer all in the cache
+                self._covered_since = math.nextafter(timestamp, math.inf)
@@ -0,0 +1,93 @@
+import asyncio
+import math
+import os
+import time
+from collections.abc import Callable
+
+from shared.log_config import get_logger
+
+logger = get_logger(__name__)
+
+TIMER_WHEEL_RESOLUTION = float(
+    os.getenv("TIMER_WHEEL_RESOLUTION", "0.25")
+)  # Seconds between ticks of the shared timer
+
+
+class TimerHandle:
+    """A timer scheduled on a TimerWheel, which can be cancelled."""
+
+    __slots__ = ("_wheel", "callback", "deadline", "done")
+
+    def __init__(
+        self, wheel: "TimerWheel", deadline: float, callback: Callable[[], None]
+    ) -> None:
+        """Initialize a pending timer."""
+        self._wheel = wheel
+        self.deadline = deadline
+        self.callback = callback
+        self.done = False
+
+    def cancel(self) -> None:
+        if not self.done:
+            self.done = True
+            self._wheel._pending -= 1  # pylint: disable=protected-access
+
+    def _fire(self) -> None:
+        if self.done:
+            return
+        self.cancel()
+        try:
+            self.callback()
+        except Exception:  # pylint: disable=W0718
+            logger.exception("Error in timer callback")
+
+
+class TimerWheel:
+    """One shared timer for the timeouts of all connections.
+
+    Timers are bucketed by tick. A single task ticks every `resolution` seconds
+    while timers are pending and fires the expired buckets, so timeouts cost no
+    wakeups per connection. The task exits once no timers are left, and is
+    started again by the next `call_later`.
+    """
+
+    def __init__(self, resolution: float = TIMER_WHEEL_RESOLUTION) -> None:
+        """Initialize an empty timer wheel."""
+        self.resolution = resolution
+        self._buckets: dict[int, list[TimerHandle]] = {}
+        self._pending = 0
+        self._tick = -1  # Last tick that has been fired
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of pending timers."""
+        return self._pending
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        """Call `callback` after `delay` seconds, rounded up to the next tick."""
+        deadline = time.monotonic() + delay
+        handle = TimerHandle(self, deadline, callback)
+        tick = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        self._buckets.setdefault(tick, []).append(handle)
+        self._pending += 1
+
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._tick = self._current_tick() - 1
+            self._task = loop.create_task(self._run())
+        return handle
+
+    def _current_tick(self) -> int:
+        return math.floor(time.monotonic() / self.resolution)
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.resolution)
+            current_tick = self._current_tick()
+            while self._tick < current_tick:
+                self._tick += 1
+                for handle in self._buckets.pop(self._tick, ()):
+                    handle._fire()  # pylint: disable=protected-access
+
+        # Only cancelled timers are left
+        self._buckets.clear()
@@ -0,0 +1,112 @@
+import asyncio
+from dataclasses import dataclass
+
+from waypoint.models.lazy_event import LazyEvent
+
+# Waiters are indexed by (wallet_id, topic, state), then by field and field value
+WaiterKey = tuple[str, str, str]
+
+
+@dataclass(eq=False)
+class Waiter:
+    """A single client waiting for an event.
+
+    The waiter is released by resolving its future with the first matching event.
+    """
+
+    group_id: str | None
+    field: str | None
+    field_id: str | None
+    future: asyncio.Future[LazyEvent]
+
+
+class WaiterRegistry:
+    """Index of waiters, so that routing an event does not depend on the number
+    of clients waiting.
+
+    An event is looked up by its (wallet_id, topic, state) key, and then by the
+    value of each field name that waiters on that key filter on. The number of
+    distinct field names per key is small (e.g. `connection_id`, `thread_id`),
+    so routing one event is O(1) in the number of waiters.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty waiter registry."""
+        self._waiters: dict[
+            WaiterKey, dict[str | None, dict[str | None, set[Waiter]]]
+        ] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of registered waiters."""
+        return self._count
+
+    def add(
+        self,
+        key: WaiterKey,
+        *,
+        group_id: str | None = None,
+        field: str | None = None,
+        field_id: str | None = None,
+    ) -> Waiter:
+        waiter = Waiter(
+            group_id=group_id,
+            field=field,
+            field_id=field_id if field else None,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        by_field = self._waiters.setdefault(key, {})
+        by_field.setdefault(waiter.field, {}).setdefault(waiter.field_id, set()).add(
+            waiter
+        )
+        self._count += 1
+        return waiter
+
+    def remove(self, key: WaiterKey, waiter: Waiter) -> None:
+        by_field = self._waiters.get(key)
+        if by_field is None:
+            return
+        by_value = by_field.get(waiter.field)
+        if by_value is None:
+            return
+        waiters = by_value.get(waiter.field_id)
+        if waiters is None or waiter not in waiters:
+            return
+
+        waiters.discard(waiter)
+        self._count -= 1
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+        # Drop empty index levels so the registry does not grow unbounded
+        if not waiters:
+            del by_value[waiter.field_id]
+            if not by_value:
+                del by_field[waiter.field]
+                if not by_field:
+                    del self._waiters[key]
+
+    def resolve(self, key: WaiterKey, event: LazyEvent) -> int:
+        """Release the waiters matching an event. Returns the number released."""
+        by_field = self._waiters.get(key)
+        if not by_field:
+            return 0
+
+        released = 0
+        for field, by_value in by_field.items():
+            if field is None:
+                waiters = by_value.get(None)
+            else:
+                value = event.payload_value(field)
+                if not isinstance(value, str):
+                    continue
+                waiters = by_value.get(value)
+
+            for waiter in waiters or ():
+                if waiter.group_id and event.group_id != waiter.group_id:
+                    continue
+                if not waiter.future.done():
+                    waiter.future.set_result(event)
+                    released += 1
+
+        return released
@@ -0,0 +1,85 @@
+import pytest
+from nats.js.api import ConsumerConfig, DeliverPolicy
+from nats.js.errors import FetchTimeoutError
+
+from waypoint.benchmarks.fake_jetstream import FakeJetStream, subject_matches
+
+
+@pytest.mark.parametrize(
+    "filter_subject,subject,expected",
+    [
+        ("a.b.c", "a.b.c", True),
+        ("a.*.c", "a.b.c", True),
+        ("a.*", "a.b.c", False),
+        ("a.>", "a.b.c", True),
+        ("a.>", "a", False),
+        ("a.b.c.d", "a.b.c", False),
+    ],
+)
+def test_subject_matches(filter_subject, subject, expected):
+    assert subject_matches(filter_subject, subject) is expected
+
+
+@pytest.fixture
+def jetstream() -> FakeJetStream:
+    return FakeJetStream({"stream": ["state.>"]})
+
+
+@pytest.mark.anyio
+async def test_fetch_filtered_messages(
+    jetstream,  # pylint: disable=redefined-outer-name
+):
+    subscription = await jetstream.pull_subscribe(
+        "state.*.wallet_1", stream="stream", config=ConsumerConfig()
+    )
+    jetstream.publish("state.group.wallet_1", b"1")
+    jetstream.publish("state.group.wallet_2", b"2")
+    jetstream.publish("state.group.wallet_1", b"3")
+
+    messages = await subscription.fetch(batch=1, timeout=0.1)
+    assert [m.data for m in messages] == [b"1"]
+    assert messages[0].metadata.num_pending == 1
+    assert messages[0].metadata.sequence.stream == 1
+
+    messages = await subscription.fetch(batch=10, timeout=0.1)
+    assert [m.data for m in messages] == [b"3"]
+    assert messages[0].metadata.sequence.stream == 3
+
+    with pytest.raises(FetchTimeoutError):
+        await subscription.fetch(batch=10, timeout=0.01)
+
+    await subscription.unsubscribe()
+    assert (await jetstream.account_info()).consumers == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "config,expected",
+    [
+        (ConsumerConfig(deliver_policy=DeliverPolicy.ALL), [b"1", b"2"]),
+        (ConsumerConfig(deliver_policy=DeliverPolicy.NEW), []),
+        (
+            ConsumerConfig(
+                deliver_policy=DeliverPolicy.BY_START_SEQUENCE, opt_start_seq=2
+            ),
+            [b"2"],
+        ),
+    ],
+)
+async def test_deliver_policy(
+    jetstream,  # pylint: disable=redefined-outer-name
+    config,
+    expected,
+):
+    jetstream.publish("state.a", b"1")
+    jetstream.publish("state.b", b"2")
+
+    subscription = await jetstream.pull_subscribe(
+        "state.>", stream="stream", config=config
+    )
+    if expected:
+        messages = await subscription.fetch(batch=10, timeout=0.1)
+        assert [m.data for m in messages] == expected
+    else:
+        with pytest.raises(FetchTimeoutError):
+            await subscription.fetch(batch=10, timeout=0.01)
@@ -0,0 +1,17 @@
+import pytest
+
+from waypoint.benchmarks.load_test import run_load_test
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("fanout", [False, True])
+async def test_run_load_test(fanout):
+    result = await run_load_test(20, fanout=fanout, max_duration=10)
+
+    assert result.matched == 20
+    assert result.events_published == 60
+    assert result.consumers_created == (0 if fanout else 20)
+    assert result.events_per_second > 0
+    assert 0 <= result.percentile(50) <= result.percentile(99)
+    assert result.memory_per_stream is not None
+    assert result.summary().startswith("fanout" if fanout else "per-request")
@@ -0,0 +1,116 @@
+import orjson
+import pytest
+
+from shared.constants import (
+    NATS_STATE_INDEX_SUBJECT,
+    NATS_STATE_PARTITION_SUBJECT,
+    NATS_STATE_SUBJECT,
+)
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from waypoint.models.lazy_event import LazyEvent
+
+event_data = {
+    "wallet_id": "wallet_id",
+    "group_id": "group_id",
+    "origin": "multitenant",
+    "topic": "connections",
+    "payload": {"connection_id": "conn_1", "state": "completed"},
+}
+raw_data = orjson.dumps(event_data)
+
+
+def test_routing_fields():
+    event = LazyEvent(raw_data)
+
+    assert event.wallet_id == "wallet_id"
+    assert event.group_id == "group_id"
+    assert event.topic == "connections"
+    assert event.payload_value("connection_id") == "conn_1"
+    assert event.payload_value("unknown") is None
+
+
+@pytest.mark.parametrize(
+    "subject",
+    [
+        f"{NATS_STATE_SUBJECT}.group_id.wallet_id.connections.completed",
+        f"{NATS_STATE_INDEX_SUBJECT}.group_id.wallet_id.connections.completed"
+        ".connection_id.conn_1",
+        f"{NATS_STATE_PARTITION_SUBJECT}.a.group_id.wallet_id.connections.completed",
+    ],
+)
+def test_routing_fields_from_subject_skip_decoding(subject):
+    event = LazyEvent(raw_data, subject=subject)
+
+    assert event.wallet_id == "wallet_id"
+    assert event.group_id == "group_id"
+    assert event.topic == "connections"
+    assert event._decoded is None  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize(
+    "subject", [None, "other.subject.group_id.wallet_id", f"{NATS_STATE_SUBJECT}.a.b"]
+)
+def test_routing_fields_from_unknown_subject(subject):
+    event = LazyEvent(raw_data, subject=subject)
+
+    assert event.wallet_id == "wallet_id"
+    assert event.topic == "connections"
+    assert event._decoded is not None  # pylint: disable=protected-access
+
+
+def test_topic_from_header_skips_decoding():
+    event = LazyEvent(raw_data, headers={"event_topic": "connections"})
+
+    assert event.topic == "connections"
+    assert event._decoded is None  # pylint: disable=protected-access
+
+
+def test_payload_value_from_headers_skips_decoding():
+    event = LazyEvent(
+        raw_data,
+        headers={"event_payload_state": "completed", "event_payload_thread_id": ""},
+    )
+
+    assert event.payload_value("state") == "completed"
+    assert event._decoded is None  # pylint: disable=protected-access
+
+    # Empty headers fall back to the decoded payload
+    assert event.payload_value("thread_id") is None
+
+
+def test_payload_value_ignores_absent_header_value():
+    event = LazyEvent(
+        orjson.dumps({**event_data, "payload": {"state": "request-sent"}}),
+        headers={"event_payload_connection_id": "None"},
+    )
+
+    assert event.payload_value("connection_id") is None
+
+
+def test_decodes_once():
+    event = LazyEvent(raw_data)
+
+    event.payload_value("connection_id")
+    decoded = event._decoded  # pylint: disable=protected-access
+    assert decoded is not None
+
+    event.payload_value("state")
+    assert event.wallet_id == "wallet_id"
+    assert event._decoded is decoded  # pylint: disable=protected-access
+
+
+def test_model_and_json():
+    event = LazyEvent(raw_data)
+
+    assert event.model() == CloudApiWebhookEventGeneric(**event_data)
+    assert event.model() is event.model()
+    assert event.json() == raw_data.decode()
+
+
+def test_from_model():
+    model = CloudApiWebhookEventGeneric(**event_data)
+    event = LazyEvent.from_model(model)
+
+    assert event.model() is model
+    assert event == LazyEvent(model.model_dump_json().encode())
+    assert event.payload == event_data["payload"]
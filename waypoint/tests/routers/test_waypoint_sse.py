@@ -3,14 +3,16 @@ from collections.abc import AsyncGenerator, Callable
 from unittest.mock import ANY, AsyncMock, patch
 
 import pytest
-from fastapi import BackgroundTasks, Request
-from sse_starlette import EventSourceResponse
+from prometheus_client import REGISTRY
+from sse_starlette import EventSourceResponse, ServerSentEvent
 
-from shared.constants import DISCONNECT_CHECK_PERIOD
 from shared.models.webhook_events.payloads import CloudApiWebhookEventGeneric
+from waypoint.models.lazy_event import LazyEvent
 from waypoint.routers.sse import (
-    check_disconnect,
+    event_source_response,
+    nats_event_stream,
     nats_event_stream_generator,
+    sse_stream_events,
     sse_wait_for_event_with_field_and_state,
 )
 from waypoint.services.nats_service import NatsEventsProcessor
@@ -49,13 +51,6 @@ def nats_processor_mock() -> AsyncMock:
     return mock
 
 
-@pytest.fixture
-def request_mock() -> AsyncMock:
-    mock_request = AsyncMock(spec=Request)
-    mock_request.is_disconnected.return_value = False
-    return mock_request
-
-
 @pytest.fixture
 def async_generator_mock() -> Callable[
     [list[CloudApiWebhookEventGeneric]],
@@ -71,28 +66,25 @@ def async_generator_mock() -> Callable[
 
 
 @pytest.mark.anyio
-async def test_check_disconnection():
-    request = AsyncMock(spec=Request)
-    request.is_disconnected.return_value = True
-
+async def test_event_source_response_sets_stop_event_on_disconnect(
+    async_generator_mock,  # pylint: disable=redefined-outer-name
+):
     stop_event = asyncio.Event()
+    response = event_source_response(async_generator_mock([]), stop_event)
 
-    task = asyncio.create_task(check_disconnect(request, stop_event))
-    await asyncio.sleep(DISCONNECT_CHECK_PERIOD * 1.1)
+    assert isinstance(response, EventSourceResponse)
+    assert not stop_event.is_set()
 
+    await response.client_close_handler_callable({"type": "http.disconnect"})
     assert stop_event.is_set()
-    assert task.done() is True
 
 
 @pytest.mark.anyio
 async def test_sse_event_stream_generator_wallet_id_topic_field_desired_state(
     nats_processor_mock,  # pylint: disable=redefined-outer-name
-    request_mock,  # pylint: disable=redefined-outer-name
 ):
-    async def mock_event_generator() -> AsyncGenerator[
-        CloudApiWebhookEventGeneric, None
-    ]:
-        yield expected_cloudapi_event
+    async def mock_event_generator() -> AsyncGenerator[LazyEvent, None]:
+        yield LazyEvent.from_model(expected_cloudapi_event)
 
     nats_processor_mock.process_events.return_value.__aenter__.return_value = (
         mock_event_generator()
@@ -101,8 +93,7 @@ async def test_sse_event_stream_generator_wallet_id_topic_field_desired_state(
     events = [
         event
         async for event in nats_event_stream_generator(
-            request=request_mock,
-            background_tasks=BackgroundTasks(),
+            stop_event=asyncio.Event(),
             wallet_id=wallet_id,
             topic=topic,
             field=field,
@@ -119,47 +110,86 @@ async def test_sse_event_stream_generator_wallet_id_topic_field_desired_state(
 
 
 @pytest.mark.anyio
-async def test_sse_event_stream_generator_disconnects(
+async def test_sse_event_stream_generator_sets_stop_event(
     nats_processor_mock,  # pylint: disable=redefined-outer-name
 ):
-    request = AsyncMock(spec=Request)
-    request.is_disconnected.return_value = True
+    stop_event = asyncio.Event()
 
-    async def mock_event_generator() -> AsyncGenerator[
-        CloudApiWebhookEventGeneric, None
-    ]:
-        yield dummy_cloudapi_event
-        yield expected_cloudapi_event
+    async def mock_event_generator() -> AsyncGenerator[LazyEvent, None]:
+        yield LazyEvent.from_model(dummy_cloudapi_event)
+        yield LazyEvent.from_model(expected_cloudapi_event)
+
+    nats_processor_mock.process_events.return_value.__aenter__.return_value = (
+        mock_event_generator()
+    )
+
+    events = [
+        event
+        async for event in nats_event_stream_generator(
+            stop_event=stop_event,
+            wallet_id=wallet_id,
+            topic=topic,
+            field=field,
+            field_id=field_id,
+            desired_state=desired_state,
+            group_id=group_id,
+            look_back=300,
+            nats_processor=nats_processor_mock,
+        )
+    ]
+
+    assert events == [expected_cloudapi_event.model_dump_json()]
+    assert stop_event.is_set()
+    # The same stop event is set by the response when the client disconnects
+    assert (
+        nats_processor_mock.process_events.call_args.kwargs["stop_event"] is stop_event
+    )
+
+
+@pytest.mark.anyio
+async def test_nats_event_stream_generator_metrics(
+    nats_processor_mock,  # pylint: disable=redefined-outer-name
+):
+    labels = {"endpoint": "wait"}
+    matched_before = REGISTRY.get_sample_value("waypoint_events_matched_total", labels)
+    first_event_before = REGISTRY.get_sample_value(
+        "waypoint_time_to_first_event_seconds_count", labels
+    )
+
+    async def mock_event_generator() -> AsyncGenerator[LazyEvent, None]:
+        # The stream is open while events are being waited for
+        assert REGISTRY.get_sample_value("waypoint_sse_streams_active", labels) == 1
+        yield LazyEvent.from_model(dummy_cloudapi_event)
+        yield LazyEvent.from_model(expected_cloudapi_event)
 
     nats_processor_mock.process_events.return_value.__aenter__.return_value = (
         mock_event_generator()
     )
 
     async for _ in nats_event_stream_generator(
-        request=request,
-        background_tasks=BackgroundTasks(),
+        stop_event=asyncio.Event(),
         wallet_id=wallet_id,
         topic=topic,
         field=field,
         field_id=field_id,
         desired_state=desired_state,
-        group_id=group_id,
-        look_back=300,
         nats_processor=nats_processor_mock,
     ):
         pass
 
-    assert request.is_disconnected.called
-    nats_processor_mock.process_events.assert_called_once()
+    assert REGISTRY.get_sample_value("waypoint_sse_streams_active", labels) == 0
+    assert REGISTRY.get_sample_value("waypoint_events_matched_total", labels) == (
+        (matched_before or 0) + 1
+    )
+    assert REGISTRY.get_sample_value(
+        "waypoint_time_to_first_event_seconds_count", labels
+    ) == ((first_event_before or 0) + 1)
 
 
 @pytest.mark.anyio
 async def test_nats_event_stream_generator_cancelled_error_handling(
     nats_processor_mock,  # pylint: disable=redefined-outer-name
-    request_mock,  # pylint: disable=redefined-outer-name
 ):
-    background_tasks = BackgroundTasks()
-
     async def mock_event_generator():  # noqa: ANN202
         raise asyncio.CancelledError
         yield  # Make this function an asynchronous generator
@@ -169,8 +199,7 @@ async def test_nats_event_stream_generator_cancelled_error_handling(
     )
 
     generator = nats_event_stream_generator(
-        request=request_mock,
-        background_tasks=background_tasks,
+        stop_event=asyncio.Event(),
         wallet_id="wallet123",
         topic="some_topic",
         field="some_field",
@@ -186,14 +215,12 @@ async def test_nats_event_stream_generator_cancelled_error_handling(
             pass
 
     nats_processor_mock.process_events.assert_called_once()
-    request_mock.is_disconnected.assert_not_called()
 
 
 @pytest.mark.anyio
 async def test_sse_event_stream(
     async_generator_mock,  # pylint: disable=redefined-outer-name
     nats_processor_mock,  # pylint: disable=redefined-outer-name
-    request_mock,  # pylint: disable=redefined-outer-name
 ):
     with patch(
         "waypoint.routers.sse.nats_event_stream_generator"
@@ -203,8 +230,6 @@ async def test_sse_event_stream(
         )
 
         event_stream = await sse_wait_for_event_with_field_and_state(
-            request=request_mock,
-            background_tasks=BackgroundTasks(),
             wallet_id=wallet_id,
             topic=topic,
             field=field,
@@ -219,8 +244,7 @@ async def test_sse_event_stream(
         assert event_stream.status_code == 200
 
         nats_event_stream_generator_mock.assert_called_once_with(
-            request=request_mock,
-            background_tasks=ANY,
+            stop_event=ANY,
             wallet_id=wallet_id,
             topic=topic,
             field=field,
@@ -230,3 +254,85 @@ async def test_sse_event_stream(
             look_back=300,
             nats_processor=nats_processor_mock,
         )
+
+
+def _with_sequence(event: CloudApiWebhookEventGeneric, sequence: int) -> LazyEvent:
+    return LazyEvent(event.model_dump_json().encode(), sequence=sequence)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "field_ids,expected_sequences",
+    [(None, [1, 2]), ([field_id], [2]), ([field_id, "some_other_field_id"], [1, 2])],
+)
+async def test_nats_event_stream(
+    nats_processor_mock,  # pylint: disable=redefined-outer-name
+    field_ids,
+    expected_sequences,
+):
+    async def mock_event_generator() -> AsyncGenerator[LazyEvent, None]:
+        yield _with_sequence(dummy_cloudapi_event, 1)
+        yield _with_sequence(expected_cloudapi_event, 2)
+
+    nats_processor_mock.stream_events.return_value.__aenter__.return_value = (
+        mock_event_generator()
+    )
+
+    events = [
+        event
+        async for event in nats_event_stream(
+            nats_processor=nats_processor_mock,
+            stop_event=asyncio.Event(),
+            wallet_id=wallet_id,
+            topic=topic,
+            field=field,
+            field_ids=field_ids,
+            group_id=group_id,
+            look_back=300,
+            last_event_id=0,
+        )
+    ]
+
+    assert all(isinstance(event, ServerSentEvent) for event in events)
+    assert [event.id for event in events] == [str(seq) for seq in expected_sequences]
+
+    call_kwargs = nats_processor_mock.stream_events.call_args.kwargs
+    assert call_kwargs["last_sequence"] == 0
+    # Only a single id is passed on, to be filtered on by NATS
+    if field_ids and len(field_ids) == 1:
+        assert call_kwargs["field_id"] == field_id
+    else:
+        assert call_kwargs["field_id"] is None
+
+
+@pytest.mark.anyio
+async def test_sse_stream_events(
+    async_generator_mock,  # pylint: disable=redefined-outer-name
+    nats_processor_mock,  # pylint: disable=redefined-outer-name
+):
+    with patch("waypoint.routers.sse.nats_event_stream") as nats_event_stream_mock:
+        nats_event_stream_mock.return_value = async_generator_mock([])
+
+        event_stream = await sse_stream_events(
+            wallet_id=wallet_id,
+            topic=topic,
+            field=field,
+            field_id=[field_id],
+            group_id=group_id,
+            look_back=300,
+            last_event_id=42,
+            nats_processor=nats_processor_mock,
+        )
+
+        assert isinstance(event_stream, EventSourceResponse)
+        nats_event_stream_mock.assert_called_once_with(
+            nats_processor=nats_processor_mock,
+            stop_event=ANY,
+            wallet_id=wallet_id,
+            topic=topic,
+            field=field,
+            field_ids=[field_id],
+            group_id=group_id,
+            look_back=300,
+            last_event_id=42,
+        )
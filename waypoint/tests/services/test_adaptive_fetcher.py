@@ -0,0 +1,102 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from nats.errors import NotJSMessageError
+from nats.js.client import JetStreamContext
+from nats.js.errors import FetchTimeoutError
+
+from waypoint.services.adaptive_fetcher import AdaptiveFetcher
+
+
+def make_fetcher(subscription) -> AdaptiveFetcher:
+    return AdaptiveFetcher(
+        subscription,
+        min_batch_size=5,
+        max_batch_size=100,
+        timeout=0.5,
+        long_poll_timeout=5,
+        heartbeat=0.1,
+    )
+
+
+def make_message(num_pending: int) -> Mock:
+    message = Mock()
+    message.metadata.num_pending = num_pending
+    return message
+
+
+@pytest.fixture
+def mock_subscription() -> AsyncMock:
+    return AsyncMock(spec=JetStreamContext.PullSubscription)
+
+
+@pytest.mark.anyio
+async def test_grows_batch_with_backlog(
+    mock_subscription,  # pylint: disable=redefined-outer-name
+):
+    fetcher = make_fetcher(mock_subscription)
+
+    mock_subscription.fetch.return_value = [make_message(50)] * 5
+    await fetcher.fetch()
+    mock_subscription.fetch.assert_awaited_with(batch=5, timeout=0.5, heartbeat=0.1)
+    assert fetcher.batch_size == 50
+
+    mock_subscription.fetch.return_value = [make_message(1000)] * 50
+    await fetcher.fetch()
+    mock_subscription.fetch.assert_awaited_with(batch=50, timeout=0.5, heartbeat=0.1)
+    assert fetcher.batch_size == 100  # Capped at max batch size
+
+    mock_subscription.fetch.return_value = [make_message(0)]
+    await fetcher.fetch()
+    assert fetcher.batch_size == 5
+
+    assert fetcher.metrics.fetches == 3
+    assert fetcher.metrics.messages == 56
+    assert fetcher.metrics.max_batch_size == 100
+
+
+@pytest.mark.anyio
+async def test_long_poll_when_idle(
+    mock_subscription,  # pylint: disable=redefined-outer-name
+):
+    fetcher = make_fetcher(mock_subscription)
+
+    mock_subscription.fetch.side_effect = FetchTimeoutError
+    with pytest.raises(FetchTimeoutError):
+        await fetcher.fetch()
+    assert fetcher.idle
+
+    mock_subscription.fetch.side_effect = None
+    mock_subscription.fetch.return_value = [make_message(0)]
+    await fetcher.fetch(max_wait=2)
+    mock_subscription.fetch.assert_awaited_with(batch=1, timeout=2, heartbeat=0.1)
+    assert not fetcher.idle
+
+    assert fetcher.metrics.fetches == 2
+    assert fetcher.metrics.empty_fetches == 1
+
+
+@pytest.mark.anyio
+async def test_short_max_wait_drops_heartbeat(
+    mock_subscription,  # pylint: disable=redefined-outer-name
+):
+    fetcher = make_fetcher(mock_subscription)
+    mock_subscription.fetch.return_value = []
+
+    await fetcher.fetch(max_wait=0.1)
+
+    mock_subscription.fetch.assert_awaited_with(batch=5, timeout=0.1, heartbeat=None)
+
+
+@pytest.mark.anyio
+async def test_doubles_full_batch_without_metadata(
+    mock_subscription,  # pylint: disable=redefined-outer-name
+):
+    fetcher = make_fetcher(mock_subscription)
+    message = Mock()
+    type(message).metadata = property(Mock(side_effect=NotJSMessageError))
+    mock_subscription.fetch.return_value = [message] * 5
+
+    await fetcher.fetch()
+
+    assert fetcher.batch_size == 10
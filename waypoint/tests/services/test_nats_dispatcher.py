@@ -0,0 +1,308 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from nats.errors import Error
+from nats.js.api import AckPolicy, DeliverPolicy
+from nats.js.client import JetStreamContext
+from nats.js.errors import APIError, FetchTimeoutError
+
+from shared.constants import (
+    NATS_STATE_PARTITION_STREAM,
+    NATS_STATE_PARTITION_SUBJECT,
+    NATS_STATE_STREAM,
+    NATS_STATE_SUBJECT,
+)
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from shared.util.sharding import shard_partitions, wallet_shard
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.nats_dispatcher import (
+    NatsEventsDispatcher,
+    init_nats_events_dispatcher,
+)
+
+sample_event = LazyEvent.from_model(
+    CloudApiWebhookEventGeneric(
+        wallet_id="wallet_id",
+        group_id="group_id",
+        origin="multitenant",
+        topic="credentials",
+        payload={"thread_id": "thread_1", "state": "done"},
+    )
+)
+sample_subject = f"{NATS_STATE_SUBJECT}.group_id.wallet_id.credentials.done"
+
+
+@pytest.fixture
+def mock_jetstream() -> AsyncMock:
+    return AsyncMock(spec=JetStreamContext)
+
+
+@pytest.mark.anyio
+async def test_dispatch_to_matching_waiter(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    matching = dispatcher.register(
+        wallet_id="wallet_id",
+        topic="credentials",
+        state="done",
+        field="thread_id",
+        field_id="thread_1",
+    )
+    other_field_id = dispatcher.register(
+        wallet_id="wallet_id",
+        topic="credentials",
+        state="done",
+        field="thread_id",
+        field_id="thread_2",
+    )
+    other_group = dispatcher.register(
+        wallet_id="wallet_id",
+        topic="credentials",
+        state="done",
+        group_id="other_group",
+    )
+    other_state = dispatcher.register(
+        wallet_id="wallet_id", topic="credentials", state="offer-sent"
+    )
+
+    dispatcher.dispatch(sample_event)
+
+    assert matching.future.result() == sample_event
+    assert not other_field_id.future.done()
+    assert not other_group.future.done()
+    assert not other_state.future.done()
+
+
+@pytest.mark.anyio
+async def test_dispatch_decodes_only_matched_events(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    waiter = dispatcher.register(
+        wallet_id="wallet_id",
+        topic="credentials",
+        state="done",
+        field="thread_id",
+        field_id="thread_1",
+    )
+    headers = {"event_payload_state": "done"}
+
+    unmatched = LazyEvent(
+        sample_event.data,
+        headers,
+        subject=f"{NATS_STATE_SUBJECT}.group_id.other_wallet.credentials.done",
+    )
+    dispatcher.dispatch(unmatched)
+    assert unmatched._decoded is None  # pylint: disable=protected-access
+    assert dispatcher.replay_cache.get("other_wallet", "credentials", 0) == [unmatched]
+
+    matched = LazyEvent(sample_event.data, headers, subject=sample_subject)
+    dispatcher.dispatch(matched)
+    assert waiter.future.result() is matched
+
+
+@pytest.mark.anyio
+async def test_unregister(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    waiter = dispatcher.register(
+        wallet_id="wallet_id", topic="credentials", state="done"
+    )
+    assert dispatcher.waiters_count == 1
+
+    dispatcher.unregister(
+        wallet_id="wallet_id", topic="credentials", state="done", waiter=waiter
+    )
+    assert dispatcher.waiters_count == 0
+    assert waiter.future.cancelled()
+
+    # Unregistering twice is a no-op
+    dispatcher.unregister(
+        wallet_id="wallet_id", topic="credentials", state="done", waiter=waiter
+    )
+
+
+@pytest.mark.anyio
+async def test_start_and_stop(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    mock_subscription = AsyncMock(spec=JetStreamContext.PullSubscription)
+    mock_message = Mock(data=sample_event.data, headers=None, subject=sample_subject)
+    fetched = asyncio.Event()
+
+    async def fetch_side_effect(**_) -> list[Mock]:
+        if fetched.is_set():
+            await asyncio.sleep(0.01)
+            raise FetchTimeoutError
+        fetched.set()
+        return [mock_message]
+
+    mock_subscription.fetch.side_effect = fetch_side_effect
+    mock_jetstream.pull_subscribe.return_value = mock_subscription
+
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    waiter = dispatcher.register(
+        wallet_id="wallet_id",
+        topic="credentials",
+        state="done",
+        field="thread_id",
+        field_id="thread_1",
+    )
+    await dispatcher.start()
+
+    event = await asyncio.wait_for(waiter.future, timeout=1)
+    assert event == sample_event
+    assert dispatcher.replay_cache.get("wallet_id", "credentials", 0) == [event]
+    assert dispatcher.replay_cache.covers(time.time())
+
+    await dispatcher.stop()
+
+    call_kwargs = mock_jetstream.pull_subscribe.call_args.kwargs
+    assert call_kwargs["subject"] == f"{NATS_STATE_SUBJECT}.>"
+    assert call_kwargs["stream"] == NATS_STATE_STREAM
+    assert call_kwargs["config"].deliver_policy == DeliverPolicy.NEW
+    assert call_kwargs["config"].ack_policy == AckPolicy.NONE
+    mock_subscription.unsubscribe.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_start_sharded(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_jetstream, shards=4, shard_index=1)
+    await dispatcher.start()
+    await dispatcher.stop()
+
+    call_kwargs = mock_jetstream.pull_subscribe.call_args.kwargs
+    assert call_kwargs["subject"] == f"{NATS_STATE_PARTITION_SUBJECT}.>"
+    assert call_kwargs["stream"] == NATS_STATE_PARTITION_STREAM
+    assert call_kwargs["config"].filter_subjects == [
+        f"{NATS_STATE_PARTITION_SUBJECT}.{partition}.>"
+        for partition in shard_partitions(1, 4)
+    ]
+
+
+@pytest.mark.anyio
+async def test_start_sharded_without_partitions(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    # More shards than partitions leaves some shards without partitions
+    shard_index = next(i for i in range(32) if not shard_partitions(i, 32))
+    dispatcher = NatsEventsDispatcher(
+        mock_jetstream, shards=32, shard_index=shard_index
+    )
+    await dispatcher.start()
+
+    mock_jetstream.pull_subscribe.assert_not_called()
+
+
+def test_owns(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    wallet_id = "4e0c70fb-f2ad-4f59-81f3-93d8d6b8b0a1"
+    shard = wallet_shard(wallet_id, 4)
+
+    assert NatsEventsDispatcher(mock_jetstream).owns(wallet_id)
+    assert NatsEventsDispatcher(mock_jetstream, shards=4, shard_index=shard).owns(
+        wallet_id
+    )
+    assert not NatsEventsDispatcher(
+        mock_jetstream, shards=4, shard_index=(shard + 1) % 4
+    ).owns(wallet_id)
+    # Wallets without a partition are never read by a sharded consumer
+    assert not NatsEventsDispatcher(mock_jetstream, shards=1, shard_index=0).owns(
+        "governance"
+    )
+
+
+@pytest.mark.anyio
+async def test_run_skips_bad_messages(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+):
+    mock_subscription = AsyncMock(spec=JetStreamContext.PullSubscription)
+    bad_message = Mock(
+        data=json.dumps({"not": "an event"}).encode(), headers=None, subject=None
+    )
+    good_message = Mock(data=sample_event.data, headers=None, subject=sample_subject)
+    mock_subscription.fetch.side_effect = [
+        [bad_message, good_message],
+        asyncio.CancelledError,
+    ]
+
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    waiter = dispatcher.register(
+        wallet_id="wallet_id", topic="credentials", state="done"
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        await dispatcher._run(mock_subscription)  # pylint: disable=protected-access
+
+    assert waiter.future.result() == sample_event
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "errors",
+    [
+        [APIError(code=409, description="Consumer Deleted")],
+        [Error("nats: timeout")] * 3,
+    ],
+)
+async def test_run_resubscribes_when_consumer_is_deleted(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+    errors,
+):
+    deleted_subscription = AsyncMock(spec=JetStreamContext.PullSubscription)
+    deleted_subscription.fetch.side_effect = errors
+    new_subscription = AsyncMock(spec=JetStreamContext.PullSubscription)
+    new_subscription.fetch.side_effect = [
+        [Mock(data=sample_event.data, headers=None, subject=sample_subject)],
+        asyncio.CancelledError,
+    ]
+    mock_jetstream.pull_subscribe.side_effect = [
+        deleted_subscription,
+        new_subscription,
+    ]
+
+    dispatcher = NatsEventsDispatcher(mock_jetstream)
+    waiter = dispatcher.register(
+        wallet_id="wallet_id", topic="credentials", state="done"
+    )
+    with patch("waypoint.services.nats_dispatcher.asyncio.sleep"):
+        await dispatcher.start()
+        with pytest.raises(asyncio.CancelledError):
+            await dispatcher._task  # pylint: disable=protected-access
+
+    assert waiter.future.result() == sample_event
+    first_call, second_call = mock_jetstream.pull_subscribe.call_args_list
+    assert second_call.kwargs == first_call.kwargs
+    deleted_subscription.unsubscribe.assert_awaited_once()
+
+    await dispatcher.stop()
+    new_subscription.unsubscribe.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("fanout_enabled", [True, False])
+async def test_init_nats_events_dispatcher(
+    mock_jetstream,  # pylint: disable=redefined-outer-name
+    fanout_enabled,
+):
+    with (
+        patch("waypoint.services.nats_dispatcher.FANOUT_ENABLED", fanout_enabled),
+        patch.object(NatsEventsDispatcher, "start") as mock_start,
+        patch.object(NatsEventsDispatcher, "stop") as mock_stop,
+    ):
+        async for dispatcher in init_nats_events_dispatcher(mock_jetstream):
+            if fanout_enabled:
+                assert isinstance(dispatcher, NatsEventsDispatcher)
+            else:
+                assert dispatcher is None
+
+        assert mock_start.called is fanout_enabled
+        assert mock_stop.called is fanout_enabled
@@ -1,7 +1,9 @@
 import asyncio
 import importlib
 import json
+import time
 from collections.abc import AsyncGenerator
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
@@ -12,13 +14,21 @@ from nats.errors import (
     Error,
     NoServersError,
 )
-from nats.js.api import ConsumerConfig, DeliverPolicy
+from nats.js.api import AckPolicy, ConsumerConfig, DeliverPolicy
 from nats.js.client import JetStreamContext
-from nats.js.errors import FetchTimeoutError
-
-from shared.constants import NATS_STATE_STREAM, NATS_STATE_SUBJECT
+from nats.js.errors import FetchTimeoutError, NotFoundError
+from prometheus_client import REGISTRY
+
+from shared.constants import (
+    NATS_STATE_INDEX_STREAM,
+    NATS_STATE_INDEX_SUBJECT,
+    NATS_STATE_STREAM,
+    NATS_STATE_SUBJECT,
+)
 from shared.models.webhook_events import CloudApiWebhookEventGeneric
 from shared.services.nats_jetstream import init_nats_client
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.nats_dispatcher import NatsEventsDispatcher
 from waypoint.services.nats_service import MAX_TIMEOUT_ERRORS, NatsEventsProcessor
 
 sample_message_data = {
@@ -28,6 +38,7 @@ sample_message_data = {
     "topic": "some_topic",
     "payload": {"field": "value", "state": "state"},
 }
+sample_subject = f"{NATS_STATE_SUBJECT}.group_id.some_wallet_id.some_topic.state"
 
 
 @pytest.fixture
@@ -95,6 +106,67 @@ async def test_nats_events_processor_subscribe(
         assert isinstance(subscription, JetStreamContext.PullSubscription)
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "index_enabled,field,field_id,expected_subject,expected_stream",
+    [
+        (
+            True,
+            "thread_id",
+            "thread_1",
+            f"{NATS_STATE_INDEX_SUBJECT}.group_id.wallet_id.proofs.done"
+            ".thread_id.thread_1",
+            NATS_STATE_INDEX_STREAM,
+        ),
+        (
+            False,
+            "thread_id",
+            "thread_1",
+            f"{NATS_STATE_SUBJECT}.group_id.wallet_id.proofs.done",
+            NATS_STATE_STREAM,
+        ),
+        (
+            True,
+            "not_indexed",
+            "thread_1",
+            f"{NATS_STATE_SUBJECT}.group_id.wallet_id.proofs.done",
+            NATS_STATE_STREAM,
+        ),
+        (
+            True,
+            "thread_id",
+            "not.a.token",
+            f"{NATS_STATE_SUBJECT}.group_id.wallet_id.proofs.done",
+            NATS_STATE_STREAM,
+        ),
+    ],
+)
+async def test_nats_events_processor_subscribe_state_index(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+    index_enabled,
+    field,
+    field_id,
+    expected_subject,
+    expected_stream,
+):
+    processor = NatsEventsProcessor(mock_nats_client, state_index_enabled=index_enabled)
+
+    await processor._subscribe(  # pylint: disable=protected-access
+        group_id="group_id",
+        wallet_id="wallet_id",
+        topic="proofs",
+        state="done",
+        start_time="2024-10-24T09:17:17.998149541Z",
+        request_uuid="state_uuid",
+        field=field,
+        field_id=field_id,
+    )
+
+    call_kwargs = mock_nats_client.pull_subscribe.call_args.kwargs
+    assert call_kwargs["subject"] == expected_subject
+    assert call_kwargs["stream"] == expected_stream
+
+
 @pytest.mark.anyio
 @pytest.mark.parametrize("exception", [BadSubscriptionError, Error, Exception])
 async def test_nats_events_processor_subscribe_error(
@@ -121,12 +193,13 @@ async def test_process_events(
     mock_nats_client,  # pylint: disable=redefined-outer-name
     group_id,
 ):
-    processor = NatsEventsProcessor(mock_nats_client)
+    processor = NatsEventsProcessor(mock_nats_client, ack_policy=AckPolicy.EXPLICIT)
     mock_subscription = AsyncMock()
     mock_nats_client.pull_subscribe.return_value = mock_subscription
 
     mock_message = AsyncMock()
     mock_message.headers = {"event_topic": "test_topic"}
+    mock_message.subject = sample_subject
     mock_message.data = json.dumps(sample_message_data)
     mock_subscription.fetch.return_value = [mock_message]
 
@@ -145,13 +218,105 @@ async def test_process_events(
             stop_event.set()
 
     assert len(events) == 1
-    assert isinstance(events[0], CloudApiWebhookEventGeneric)
+    assert isinstance(events[0], LazyEvent)
     assert events[0].payload["field"] == "value"
+    assert events[0].model() == CloudApiWebhookEventGeneric(**sample_message_data)
 
     mock_subscription.fetch.assert_called()
     mock_message.ack.assert_called_once()
 
 
+@pytest.mark.anyio
+async def test_process_events_subscription_metrics(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    mock_subscription = AsyncMock()
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+    mock_message = AsyncMock()
+    mock_message.headers = {}
+    mock_message.subject = sample_subject
+    mock_message.data = json.dumps(sample_message_data)
+    mock_subscription.fetch.return_value = [mock_message]
+
+    subscriptions_before = _sample(
+        "waypoint_jetstream_subscriptions_active", consumer="request"
+    )
+    received_before = _sample("waypoint_messages_received_total", consumer="request")
+
+    stop_event = asyncio.Event()
+    async with processor.process_events(
+        wallet_id="wallet_id",
+        topic="test_topic",
+        state="state",
+        stop_event=stop_event,
+        duration=1,
+    ) as event_generator:
+        assert (
+            _sample("waypoint_jetstream_subscriptions_active", consumer="request")
+            == subscriptions_before + 1
+        )
+        async for _ in event_generator:
+            stop_event.set()
+
+    assert (
+        _sample("waypoint_jetstream_subscriptions_active", consumer="request")
+        == subscriptions_before
+    )
+    assert _sample("waypoint_messages_received_total", consumer="request") == (
+        received_before + 1
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "ack_policy, expected_acks",
+    [
+        (AckPolicy.NONE, [0, 0, 0]),
+        (AckPolicy.ALL, [0, 0, 1]),
+        (AckPolicy.EXPLICIT, [1, 1, 1]),
+    ],
+)
+async def test_process_events_ack_policy(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+    ack_policy,
+    expected_acks,
+):
+    processor = NatsEventsProcessor(mock_nats_client, ack_policy=ack_policy)
+    mock_subscription = AsyncMock()
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+
+    mock_messages = [
+        AsyncMock(
+            data=json.dumps(sample_message_data), headers=None, subject=sample_subject
+        )
+        for _ in expected_acks
+    ]
+    mock_subscription.fetch.return_value = mock_messages
+
+    stop_event = asyncio.Event()
+    async with processor.process_events(
+        wallet_id="wallet_id",
+        topic="test_topic",
+        state="state",
+        stop_event=stop_event,
+        duration=1,
+    ) as event_generator:
+        events = []
+        async for event in event_generator:
+            events.append(event)
+            if len(events) == len(mock_messages):
+                # Stop once the whole batch has been consumed
+                stop_event.set()
+
+    assert len(events) == len(mock_messages)
+    assert [m.ack.await_count for m in mock_messages] == expected_acks
+    assert (
+        mock_nats_client.pull_subscribe.call_args.kwargs["config"].ack_policy
+        == ack_policy
+    )
+
+
 @pytest.mark.anyio
 async def test_process_events_cancelled_error(
     mock_nats_client,  # pylint: disable=redefined-outer-name
@@ -217,7 +382,13 @@ async def test_process_events_timeout_error_handling(
         if timeout_error_count < MAX_TIMEOUT_ERRORS:
             timeout_error_count += 1
             raise TimeoutError
-        return [AsyncMock(data=json.dumps(sample_message_data))]
+        return [
+            AsyncMock(
+                data=json.dumps(sample_message_data),
+                headers=None,
+                subject=sample_subject,
+            )
+        ]
 
     # Mock fetch to raise TimeoutError
     mock_subscription.fetch.side_effect = fetch_side_effect
@@ -395,6 +566,68 @@ async def test_check_jetstream_exception(
     mock_nats_client.account_info.assert_called_once()
 
 
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "last_state_age,last_index_age,index_enabled",
+    [
+        (0, 60, True),
+        (None, None, True),
+        (0, None, False),
+        (0, 3600, False),
+    ],
+)
+async def test_check_state_index(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+    last_state_age,
+    last_index_age,
+    index_enabled,
+):
+    now = datetime.now(UTC)
+    last_messages = {
+        NATS_STATE_STREAM: last_state_age,
+        NATS_STATE_INDEX_STREAM: last_index_age,
+    }
+
+    async def get_last_msg(stream: str, subject: str) -> Mock:
+        assert subject.endswith(".>")
+        age = last_messages[stream]
+        if age is None:
+            raise NotFoundError
+        return Mock(time=now - timedelta(seconds=age))
+
+    mock_nats_client.get_last_msg.side_effect = get_last_msg
+    processor = NatsEventsProcessor(mock_nats_client, state_index_enabled=True)
+
+    await processor.check_state_index()
+
+    assert processor.state_index_enabled is index_enabled
+    mock_nats_client.stream_info.assert_awaited_once_with(NATS_STATE_INDEX_STREAM)
+
+
+@pytest.mark.anyio
+async def test_check_state_index_without_stream(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    mock_nats_client.stream_info.side_effect = NotFoundError
+    processor = NatsEventsProcessor(mock_nats_client, state_index_enabled=True)
+
+    await processor.check_state_index()
+
+    assert processor.state_index_enabled is False
+    mock_nats_client.get_last_msg.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_check_state_index_disabled(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client, state_index_enabled=False)
+
+    await processor.check_state_index()
+
+    mock_nats_client.stream_info.assert_not_called()
+
+
 @pytest.mark.anyio
 async def test_retry_logging(
     mock_nats_client,  # pylint: disable=redefined-outer-name
@@ -466,3 +699,345 @@ def test_heartbeat_validation():
         from waypoint.services.nats_service import HEARTBEAT  # noqa: PLC0415, RUF100
 
     assert HEARTBEAT == 0.2  # Should be set to TIMEOUT / 5
+
+
+@pytest.mark.anyio
+async def test_process_events_fanout_replay_and_live(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_nats_client)
+    processor = NatsEventsProcessor(mock_nats_client, dispatcher=dispatcher)
+
+    replayed_message = AsyncMock()
+    replayed_message.data = json.dumps(
+        {**sample_message_data, "payload": {"field": "other", "state": "state"}}
+    )
+    replayed_message.metadata.num_pending = 0
+    replayed_message.headers = None
+    replayed_message.subject = sample_subject
+    mock_subscription = AsyncMock()
+    mock_subscription.fetch.return_value = [replayed_message]
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+
+    live_event = LazyEvent.from_model(
+        CloudApiWebhookEventGeneric(**sample_message_data)
+    )
+
+    stop_event = asyncio.Event()
+    async with processor.process_events(
+        wallet_id="some_wallet_id",
+        topic="some_topic",
+        state="state",
+        stop_event=stop_event,
+        duration=1,
+        field="field",
+        field_id="value",
+    ) as event_generator:
+        assert dispatcher.waiters_count == 1
+        dispatcher.dispatch(live_event)
+
+        events = []
+        async for event in event_generator:
+            events.append(event)
+            stop_event.set()
+
+    # Replayed event does not match the field filter, live event is yielded
+    assert events == [live_event]
+    assert dispatcher.waiters_count == 0
+    mock_subscription.fetch.assert_called_once()
+    mock_subscription.unsubscribe.assert_called()
+
+
+@pytest.mark.anyio
+async def test_process_events_fanout_timeout(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_nats_client)
+    processor = NatsEventsProcessor(mock_nats_client, dispatcher=dispatcher)
+    mock_subscription = AsyncMock()
+    mock_subscription.fetch.side_effect = FetchTimeoutError
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+
+    stop_event = asyncio.Event()
+    async with processor.process_events(
+        wallet_id="some_wallet_id",
+        topic="some_topic",
+        state="state",
+        stop_event=stop_event,
+        duration=0.01,
+    ) as event_generator:
+        events = [event async for event in event_generator]
+
+    assert len(events) == 0
+    assert stop_event.is_set()
+    assert dispatcher.waiters_count == 0
+
+
+@pytest.mark.anyio
+async def test_process_events_fanout_from_replay_cache(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_nats_client)
+    processor = NatsEventsProcessor(mock_nats_client, dispatcher=dispatcher)
+
+    cached_event = LazyEvent.from_model(
+        CloudApiWebhookEventGeneric(**sample_message_data)
+    )
+    dispatcher.replay_cache.start(now=time.time() - 120)
+    dispatcher.replay_cache.add(
+        LazyEvent.from_model(
+            CloudApiWebhookEventGeneric(
+                **{
+                    **sample_message_data,
+                    "payload": {"field": "other", "state": "state"},
+                }
+            )
+        )
+    )
+    dispatcher.replay_cache.add(cached_event)
+
+    stop_event = asyncio.Event()
+    async with processor.process_events(
+        wallet_id="some_wallet_id",
+        topic="some_topic",
+        state="state",
+        stop_event=stop_event,
+        duration=1,
+        look_back=60,
+        field="field",
+        field_id="value",
+    ) as event_generator:
+        events = []
+        async for event in event_generator:
+            events.append(event)
+            stop_event.set()
+
+    assert events == [cached_event]
+    mock_nats_client.pull_subscribe.assert_not_called()
+
+
+def _stream_message(sequence: int, state: str) -> AsyncMock:
+    message = AsyncMock()
+    message.data = json.dumps(
+        {**sample_message_data, "payload": {"field": "value", "state": state}}
+    ).encode()
+    message.headers = None
+    message.subject = sample_subject
+    message.metadata.sequence.stream = sequence
+    message.metadata.num_pending = 0
+    return message
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("last_sequence", [None, 41])
+async def test_stream_events(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+    last_sequence,
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    mock_subscription = AsyncMock()
+    mock_subscription.fetch.side_effect = [
+        [_stream_message(42, "request-sent"), _stream_message(43, "offer-received")],
+        FetchTimeoutError,
+        [_stream_message(44, "done")],
+    ]
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+
+    stop_event = asyncio.Event()
+    async with processor.stream_events(
+        group_id="group_id",
+        wallet_id="some_wallet_id",
+        topic="some_topic",
+        stop_event=stop_event,
+        last_sequence=last_sequence,
+    ) as event_generator:
+        events = []
+        async for event in event_generator:
+            events.append(event)
+            if len(events) == 3:
+                stop_event.set()
+
+    assert [event.sequence for event in events] == [42, 43, 44]
+    assert [event.payload_value("state") for event in events] == [
+        "request-sent",
+        "offer-received",
+        "done",
+    ]
+
+    call_kwargs = mock_nats_client.pull_subscribe.call_args.kwargs
+    assert call_kwargs["subject"] == (
+        f"{NATS_STATE_SUBJECT}.group_id.some_wallet_id.some_topic.*"
+    )
+    if last_sequence is None:
+        assert call_kwargs["config"].deliver_policy == DeliverPolicy.BY_START_TIME
+    else:
+        assert call_kwargs["config"].deliver_policy == DeliverPolicy.BY_START_SEQUENCE
+        assert call_kwargs["config"].opt_start_seq == last_sequence + 1
+    mock_subscription.unsubscribe.assert_awaited()
+
+
+@pytest.mark.anyio
+async def test_stream_events_resubscribes_after_last_sequence(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    first_subscription = AsyncMock()
+    first_subscription.fetch.side_effect = [
+        [_stream_message(7, "request-sent")],
+        *[TimeoutError] * MAX_TIMEOUT_ERRORS,
+    ]
+    second_subscription = AsyncMock()
+    second_subscription.fetch.return_value = [_stream_message(8, "done")]
+    mock_nats_client.pull_subscribe.side_effect = [
+        first_subscription,
+        second_subscription,
+    ]
+    resubscribes_before = _sample("waypoint_resubscribes_total", endpoint="stream")
+
+    stop_event = asyncio.Event()
+    async with processor.stream_events(
+        wallet_id="some_wallet_id", topic="some_topic", stop_event=stop_event
+    ) as event_generator:
+        events = []
+        async for event in event_generator:
+            events.append(event)
+            if len(events) == 2:
+                stop_event.set()
+
+    assert [event.sequence for event in events] == [7, 8]
+    assert _sample("waypoint_resubscribes_total", endpoint="stream") == (
+        resubscribes_before + 1
+    )
+    resubscribe_config = mock_nats_client.pull_subscribe.call_args.kwargs["config"]
+    assert resubscribe_config.deliver_policy == DeliverPolicy.BY_START_SEQUENCE
+    assert resubscribe_config.opt_start_seq == 8
+    first_subscription.unsubscribe.assert_awaited()
+
+
+@pytest.mark.anyio
+async def test_stream_events_stops_during_fetch(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    fetch_cancelled = asyncio.Event()
+
+    async def long_poll(**_: object) -> list[Mock]:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            fetch_cancelled.set()
+            raise
+        return []
+
+    mock_subscription = AsyncMock()
+    mock_subscription.fetch.side_effect = long_poll
+    mock_nats_client.pull_subscribe.return_value = mock_subscription
+
+    stop_event = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.01, stop_event.set)
+    async with processor.stream_events(
+        wallet_id="some_wallet_id", topic="some_topic", stop_event=stop_event
+    ) as event_generator:
+        async with asyncio.timeout(1):
+            events = [event async for event in event_generator]
+
+    assert not events
+    assert fetch_cancelled.is_set()
+    mock_subscription.unsubscribe.assert_awaited()
+
+
+@pytest.mark.anyio
+async def test_process_events_resubscribes_after_last_sequence(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    first_subscription = AsyncMock()
+    first_subscription.fetch.side_effect = [
+        [_stream_message(7, "state")],
+        *[TimeoutError] * MAX_TIMEOUT_ERRORS,
+    ]
+    second_subscription = AsyncMock()
+    second_subscription.fetch.return_value = [_stream_message(8, "state")]
+    mock_nats_client.pull_subscribe.side_effect = [
+        first_subscription,
+        second_subscription,
+    ]
+
+    stop_event = asyncio.Event()
+    with patch("waypoint.services.nats_service.asyncio.sleep"):
+        async with processor.process_events(
+            wallet_id="some_wallet_id",
+            topic="some_topic",
+            state="state",
+            stop_event=stop_event,
+            duration=5,
+        ) as event_generator:
+            events = []
+            async for event in event_generator:
+                events.append(event)
+                if len(events) == 2:
+                    stop_event.set()
+
+    # Events seen before the resubscription are not replayed
+    assert [event.sequence for event in events] == [7, 8]
+    first_config = mock_nats_client.pull_subscribe.call_args_list[0].kwargs["config"]
+    assert first_config.deliver_policy == DeliverPolicy.BY_START_TIME
+    resubscribe_config = mock_nats_client.pull_subscribe.call_args.kwargs["config"]
+    assert resubscribe_config.deliver_policy == DeliverPolicy.BY_START_SEQUENCE
+    assert resubscribe_config.opt_start_seq == 8
+    first_subscription.unsubscribe.assert_awaited()
+
+
+@pytest.mark.anyio
+async def test_process_events_failed_resubscribe_metrics(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    processor = NatsEventsProcessor(mock_nats_client)
+    subscription = AsyncMock()
+    subscription.fetch.side_effect = TimeoutError
+    mock_nats_client.pull_subscribe.side_effect = [subscription, Error("no servers")]
+    subscriptions_before = _sample(
+        "waypoint_jetstream_subscriptions_active", consumer="request"
+    )
+
+    with patch("waypoint.services.nats_service.asyncio.sleep"):
+        async with processor.process_events(
+            wallet_id="some_wallet_id",
+            topic="some_topic",
+            state="state",
+            stop_event=asyncio.Event(),
+            duration=5,
+        ) as event_generator:
+            with pytest.raises(Error):
+                async for _ in event_generator:
+                    pass
+
+    # The subscription is closed twice, but only counted down once
+    assert subscription.unsubscribe.await_count == 2
+    assert (
+        _sample("waypoint_jetstream_subscriptions_active", consumer="request")
+        == subscriptions_before
+    )
+
+
+@pytest.mark.anyio
+async def test_process_events_fanout_falls_back_for_other_shard(
+    mock_nats_client,  # pylint: disable=redefined-outer-name
+):
+    dispatcher = NatsEventsDispatcher(mock_nats_client, shards=2, shard_index=0)
+    processor = NatsEventsProcessor(mock_nats_client, dispatcher=dispatcher)
+
+    with patch.object(dispatcher, "owns", return_value=False):
+        async with processor.process_events(
+            wallet_id="some_wallet_id",
+            topic="some_topic",
+            state="state",
+            stop_event=asyncio.Event(),
+        ):
+            # A per-request consumer is used instead of a waiter
+            assert dispatcher.waiters_count == 0
+            mock_nats_client.pull_subscribe.assert_called_once()
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
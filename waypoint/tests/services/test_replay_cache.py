@@ -0,0 +1,78 @@
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.replay_cache import ReplayCache
+
+
+def make_event(wallet_id: str = "wallet_id", topic: str = "proofs") -> LazyEvent:
+    return LazyEvent.from_model(
+        CloudApiWebhookEventGeneric(
+            wallet_id=wallet_id,
+            origin="multitenant",
+            topic=topic,
+            payload={"state": "done"},
+        )
+    )
+
+
+def test_get_by_wallet_and_topic():
+    cache = ReplayCache(max_age=60, max_events=100)
+    cache.start(now=0)
+
+    proof_event = make_event()
+    cache.add(proof_event, now=10)
+    cache.add(make_event(topic="credentials"), now=11)
+    cache.add(make_event(wallet_id="other_wallet"), now=12)
+    late_proof_event = make_event()
+    cache.add(late_proof_event, now=20)
+
+    assert len(cache) == 4
+    assert cache.get("wallet_id", "proofs", since=5) == [
+        proof_event,
+        late_proof_event,
+    ]
+    assert cache.get("wallet_id", "proofs", since=15) == [late_proof_event]
+    assert cache.get("unknown_wallet", "proofs", since=0) == []
+
+
+def test_covers():
+    cache = ReplayCache(max_age=60, max_events=100)
+    assert not cache.covers(since=0)  # Cold start
+
+    cache.start(now=100)
+    assert cache.covers(since=100)
+    assert not cache.covers(since=99)
+
+    cache.reset()
+    assert not cache.covers(since=100)
+
+
+def test_evict_by_age():
+    cache = ReplayCache(max_age=60, max_events=100)
+    cache.start(now=0)
+
+    cache.add(make_event(), now=10)
+    cache.add(make_event(wallet_id="other_wallet"), now=20)
+    cache.add(make_event(), now=75)
+
+    # First event is older than max age
+    assert len(cache) == 2
+    assert len(cache.get("wallet_id", "proofs", since=0)) == 1
+    assert not cache.covers(since=10)
+    assert cache.covers(since=11)
+
+    cache.add(make_event(), now=200)
+    assert len(cache) == 1
+    assert cache.get("other_wallet", "proofs", since=0) == []
+
+
+def test_evict_by_count():
+    cache = ReplayCache(max_age=60, max_events=2)
+    cache.start(now=0)
+
+    cache.add(make_event(), now=1)
+    cache.add(make_event(), now=2)
+    cache.add(make_event(), now=3)
+
+    assert len(cache) == 2
+    assert not cache.covers(since=1)
+    assert cache.covers(since=1.5)
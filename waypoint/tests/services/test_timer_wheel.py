@@ -0,0 +1,64 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from waypoint.services.timer_wheel import TimerWheel
+
+
+@pytest.mark.anyio
+async def test_call_later_fires_after_delay():
+    wheel = TimerWheel(resolution=0.01)
+    fired = asyncio.Event()
+
+    wheel.call_later(0.03, fired.set)
+    assert len(wheel) == 1
+    assert not fired.is_set()
+
+    await asyncio.wait_for(fired.wait(), timeout=1)
+    assert len(wheel) == 0
+
+
+@pytest.mark.anyio
+async def test_cancel():
+    wheel = TimerWheel(resolution=0.01)
+    callback = Mock()
+
+    handle = wheel.call_later(0.02, callback)
+    handle.cancel()
+    handle.cancel()  # Cancelling twice is a no-op
+    assert len(wheel) == 0
+
+    await asyncio.sleep(0.05)
+    callback.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_one_task_for_all_timers_and_idle_when_empty():
+    wheel = TimerWheel(resolution=0.01)
+    callbacks = [Mock() for _ in range(100)]
+
+    for i, callback in enumerate(callbacks):
+        wheel.call_later(0.01 * (i % 5), callback)
+    task = wheel._task  # pylint: disable=protected-access
+
+    await asyncio.sleep(0.1)
+    for callback in callbacks:
+        callback.assert_called_once()
+
+    # The wheel stops ticking once no timers are pending
+    assert task.done()
+
+    wheel.call_later(0.01, Mock())
+    assert wheel._task is not task  # pylint: disable=protected-access
+
+
+@pytest.mark.anyio
+async def test_callback_error_does_not_stop_wheel():
+    wheel = TimerWheel(resolution=0.01)
+    fired = asyncio.Event()
+
+    wheel.call_later(0, Mock(side_effect=ValueError("boom")))
+    wheel.call_later(0.02, fired.set)
+
+    await asyncio.wait_for(fired.wait(), timeout=1)
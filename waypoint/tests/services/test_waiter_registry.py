@@ -0,0 +1,94 @@
+import pytest
+
+from shared.models.webhook_events import CloudApiWebhookEventGeneric
+from waypoint.models.lazy_event import LazyEvent
+from waypoint.services.waiter_registry import WaiterRegistry
+
+key = ("wallet_id", "proofs", "done")
+
+
+def make_event(**payload) -> LazyEvent:
+    return LazyEvent.from_model(
+        CloudApiWebhookEventGeneric(
+            wallet_id="wallet_id",
+            group_id="group_id",
+            origin="multitenant",
+            topic="proofs",
+            payload={"state": "done", **payload},
+        )
+    )
+
+
+@pytest.mark.anyio
+async def test_resolve_by_field_value():
+    registry = WaiterRegistry()
+    by_thread = registry.add(key, field="thread_id", field_id="thread_1")
+    by_connection = registry.add(key, field="connection_id", field_id="conn_1")
+    other_thread = registry.add(key, field="thread_id", field_id="thread_2")
+    any_event = registry.add(key)
+    assert len(registry) == 4
+
+    event = make_event(thread_id="thread_1", connection_id="conn_1")
+    assert registry.resolve(key, event) == 3
+
+    assert by_thread.future.result() == event
+    assert by_connection.future.result() == event
+    assert any_event.future.result() == event
+    assert not other_thread.future.done()
+
+
+@pytest.mark.anyio
+async def test_resolve_ignores_other_keys_and_groups():
+    registry = WaiterRegistry()
+    other_group = registry.add(
+        key, group_id="other_group", field="thread_id", field_id="thread_1"
+    )
+    other_key = registry.add(
+        ("wallet_id", "proofs", "request-sent"), field="thread_id", field_id="thread_1"
+    )
+
+    event = make_event(thread_id="thread_1")
+    assert registry.resolve(key, event) == 0
+    assert registry.resolve(("unknown", "proofs", "done"), event) == 0
+
+    assert not other_group.future.done()
+    assert not other_key.future.done()
+
+
+@pytest.mark.anyio
+async def test_resolve_unhashable_payload_value():
+    registry = WaiterRegistry()
+    waiter = registry.add(key, field="thread_id", field_id="thread_1")
+
+    assert registry.resolve(key, make_event(thread_id={"nested": "value"})) == 0
+    assert not waiter.future.done()
+
+
+@pytest.mark.anyio
+async def test_resolve_only_once():
+    registry = WaiterRegistry()
+    waiter = registry.add(key, field="thread_id", field_id="thread_1")
+
+    first = make_event(thread_id="thread_1")
+    assert registry.resolve(key, first) == 1
+    assert registry.resolve(key, make_event(thread_id="thread_1")) == 0
+    assert waiter.future.result() == first
+
+
+@pytest.mark.anyio
+async def test_remove():
+    registry = WaiterRegistry()
+    waiter = registry.add(key, field="thread_id", field_id="thread_1")
+    other = registry.add(key, field="thread_id", field_id="thread_2")
+
+    registry.remove(key, waiter)
+    assert len(registry) == 1
+    assert waiter.future.cancelled()
+
+    # Removing twice is a no-op
+    registry.remove(key, waiter)
+    assert len(registry) == 1
+
+    registry.remove(key, other)
+    assert len(registry) == 0
+    assert not registry._waiters  # pylint: disable=protected-access
@@ -3,7 +3,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from fastapi import FastAPI, HTTPException
 
-from waypoint.main import app, app_lifespan, health_live, health_ready
+from waypoint.main import app, app_lifespan, health_live, health_ready, metrics
 from waypoint.routers import sse
 from waypoint.services.nats_service import NatsEventsProcessor
 
@@ -18,6 +18,7 @@ def test_create_app():
     expected_routes = [r.path for r in flattened_routers_list] + [
         "/health/ready",
         "/health/live",
+        "/metrics",
     ]
     for route in expected_routes:
         assert route in routes
@@ -44,6 +45,7 @@ async def test_app_lifespan(
 
         container_mock.wire.assert_called_once()
         container_mock.nats_events_processor.assert_called_once()
+        nats_events_processor_mock.check_state_index.assert_awaited_once()
         container_mock.shutdown_resources.assert_called_once()
 
 
@@ -53,6 +55,15 @@ async def test_health_live():
     assert response == {"status": "live"}
 
 
+@pytest.mark.anyio
+async def test_metrics():
+    response = await metrics()
+    assert response.media_type.startswith("text/plain")
+    body = response.body.decode()
+    assert "waypoint_sse_streams_active" in body
+    assert "waypoint_jetstream_fetch_duration_seconds" in body
+
+
 @pytest.mark.anyio
 async def test_health_ready_success(
     nats_events_processor_mock,  # pylint: disable=redefined-outer-name